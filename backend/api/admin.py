@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import User, UserSettings, Transaction, FinancialGoal, Insight, Category
+from .models import (
+    User, UserSettings, Transaction, FinancialGoal, Insight, Category, DailyRollup,
+    MonthlyCategoryTotal, Job,
+)
 
 
 @admin.register(User)
@@ -21,6 +24,18 @@ class TransactionAdmin(admin.ModelAdmin):
     search_fields = ['category', 'description']
 
 
+@admin.register(DailyRollup)
+class DailyRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'type', 'category', 'total', 'count']
+    list_filter = ['type', 'date']
+
+
+@admin.register(MonthlyCategoryTotal)
+class MonthlyCategoryTotalAdmin(admin.ModelAdmin):
+    list_display = ['user', 'month', 'category', 'total', 'count', 'alert_level']
+    list_filter = ['month', 'alert_level']
+
+
 @admin.register(FinancialGoal)
 class FinancialGoalAdmin(admin.ModelAdmin):
     list_display = ['user', 'title', 'target_amount', 'current_amount', 'status']
@@ -37,4 +52,10 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Insight)
 class InsightAdmin(admin.ModelAdmin):
-    list_display = ['user', 'date', 'daily_limit', 'forecast_balance']
+    list_display = ['user', 'date', 'daily_limit', 'forecast_balance', 'data_version']
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'user', 'status', 'attempts', 'run_at', 'locked_by']
+    list_filter = ['status', 'name']
@@ -0,0 +1,204 @@
+"""
+Агрегации по транзакциям пользователя.
+
+Итоги, разбивка по категориям, дневной ряд и тренды считаются
+сгруппированными запросами с условными Sum(filter=Q(...)) по дневным
+итогам DailyRollup, поэтому стоимость зависит от числа дней в периоде,
+а не от числа транзакций. Ряды группируются по дням, неделям, месяцам
+или годам в БД, пропуски в календаре заполняются в api.series.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import F, Min, Sum, Q
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+from django.utils import timezone
+
+from . import series
+from .models import DailyRollup, Category
+
+ZERO = Decimal('0')
+
+EXPENSE = Q(type='expense')
+INCOME = Q(type='income')
+
+
+class _SQLiteDateStart:
+    """
+    Начало периода встроенной date() SQLite: Trunc* в SQLite вызывает
+    Python-функцию Django на каждую строку, что заметно на многолетних рядах.
+    """
+    sqlite_modifiers = ()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        modifiers = ', '.join(f"'{modifier}'" for modifier in self.sqlite_modifiers)
+        return f'date({sql}, {modifiers})', params
+
+
+class _TruncWeek(_SQLiteDateStart, TruncWeek):
+    # Понедельник не позже даты
+    sqlite_modifiers = ('-6 days', 'weekday 1')
+
+
+class _TruncMonth(_SQLiteDateStart, TruncMonth):
+    sqlite_modifiers = ('start of month',)
+
+
+class _TruncYear(_SQLiteDateStart, TruncYear):
+    sqlite_modifiers = ('start of year',)
+
+
+_TRUNC = {'week': _TruncWeek, 'month': _TruncMonth, 'year': _TruncYear}
+
+
+def _source(user):
+    return DailyRollup.objects.filter(user=user)
+
+
+def _period(start_date=None, end_date=None):
+    period = Q()
+    if start_date:
+        period &= Q(date__gte=start_date)
+    if end_date:
+        period &= Q(date__lte=end_date)
+    return period
+
+
+def month_bounds(today):
+    """Начало текущего месяца и границы предыдущего"""
+    start_of_month = today.replace(day=1)
+    prev_month_end = start_of_month - timedelta(days=1)
+    return start_of_month, prev_month_end.replace(day=1), prev_month_end
+
+
+def summary(user, start_date=None, end_date=None, today=None):
+    """Доходы и расходы за период плюс траты текущего и прошлого месяца одним запросом"""
+    today = today or timezone.localdate()
+    start_of_month, prev_month_start, prev_month_end = month_bounds(today)
+    period = _period(start_date, end_date)
+
+    result = _source(user).aggregate(
+        expenses=Sum('total', filter=period & EXPENSE),
+        incomes=Sum('total', filter=period & INCOME),
+        current_month=Sum('total', filter=EXPENSE & Q(date__gte=start_of_month)),
+        prev_month=Sum(
+            'total',
+            filter=EXPENSE & Q(date__gte=prev_month_start, date__lte=prev_month_end)
+        ),
+    )
+    return {key: value or ZERO for key, value in result.items()}
+
+
+def month_totals(user, today=None):
+    """Доходы и расходы с начала текущего месяца"""
+    today = today or timezone.localdate()
+    period = Q(date__gte=today.replace(day=1))
+
+    result = _source(user).aggregate(
+        incomes=Sum('total', filter=period & INCOME),
+        expenses=Sum('total', filter=period & EXPENSE),
+    )
+    return {key: value or ZERO for key, value in result.items()}
+
+
+def load_month_snapshot(user, today=None, category_ids=()):
+    """
+    Снимок текущего месяца для инсайтов и целей.
+
+    Доходы, расходы и расходы по категориям берутся одним сгруппированным
+    запросом, категории из category_ids разрешаются одним запросом id__in.
+    Расходы доступны по имени категории (categories, для бюджетов)
+    и по id категории (category_spending, для целей).
+    """
+    snapshot = month_spending(user, today)
+    snapshot['category_names'] = category_names(user, category_ids)
+    return snapshot
+
+
+def month_spending(user, today=None):
+    """Доходы, расходы и расходы по категориям (по имени и по id) с начала месяца"""
+    today = today or timezone.localdate()
+    rows = (
+        _source(user)
+        .filter(date__gte=today.replace(day=1))
+        .values('type', 'category', 'category_ref')
+        .annotate(sum_total=Sum('total'))
+        .order_by()
+    )
+
+    snapshot = {'incomes': ZERO, 'expenses': ZERO, 'categories': {}, 'category_spending': {}}
+    for row in rows:
+        total = row['sum_total'] or ZERO
+        if row['type'] == 'income':
+            snapshot['incomes'] += total
+        else:
+            snapshot['expenses'] += total
+            categories = snapshot['categories']
+            categories[row['category']] = categories.get(row['category'], ZERO) + total
+            if row['category_ref'] is not None:
+                spending = snapshot['category_spending']
+                spending[row['category_ref']] = spending.get(row['category_ref'], ZERO) + total
+
+    return snapshot
+
+
+def category_names(user, category_ids):
+    """Имена категорий пользователя по id одним запросом: {str(id): name}"""
+    ids = {str(cat_id) for cat_id in category_ids if str(cat_id).isdigit()}
+    if not ids:
+        return {}
+    return {
+        str(cat_id): name
+        for cat_id, name in Category.objects.filter(user=user, id__in=ids).values_list('id', 'name')
+    }
+
+
+def category_totals(user, start_date=None, end_date=None, type='expense'):
+    """Суммы и количество транзакций по категориям, по убыванию суммы"""
+    rows = (
+        _source(user)
+        .filter(_period(start_date, end_date), type=type)
+        .values('category_ref', 'category')
+        .annotate(sum_total=Sum('total'), sum_count=Sum('count'))
+        .order_by('-sum_total')
+    )
+    return [
+        {'category': row['category'], 'total': row['sum_total'], 'count': row['sum_count']}
+        for row in rows
+    ]
+
+
+def first_date(user):
+    """Дата первых данных пользователя или None"""
+    return _source(user).aggregate(first=Min('date'))['first']
+
+
+def period_rows(user, start_date=None, end_date=None, granularity='day'):
+    """Расходы и доходы по периодам, сгруппированные в БД: [(начало периода, расходы, доходы)]"""
+    rows = _source(user).filter(_period(start_date, end_date))
+    if granularity == 'day':
+        rows = rows.values(bucket=F('date'))
+    else:
+        rows = rows.annotate(bucket=_TRUNC[granularity]('date')).values('bucket')
+    rows = rows.annotate(
+        expenses=Sum('total', filter=EXPENSE),
+        incomes=Sum('total', filter=INCOME),
+    ).order_by('bucket')
+    return [(row['bucket'], row['expenses'] or ZERO, row['incomes'] or ZERO) for row in rows]
+
+
+def daily_series(user, start_date, end_date):
+    """Расходы и доходы по дням от start_date до end_date включительно, без пропусков"""
+    return series.daily(period_rows(user, start_date, end_date), start_date, end_date)
+
+
+def period_series(user, start_date, end_date, granularity):
+    """
+    Ряд по периодам от start_date до end_date со скользящими средними и изменением
+    к предыдущему периоду. Без start_date ряд начинается с первого периода с данными.
+    """
+    rows = period_rows(user, start_date, end_date, granularity)
+    if start_date is None:
+        start_date = rows[0][0] if rows else end_date
+    return series.build(rows, start_date, end_date, granularity)
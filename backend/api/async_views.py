@@ -0,0 +1,166 @@
+"""
+Асинхронные версии analytics и insights для ASGI (uvicorn, daphne).
+
+Независимые запросы к БД выполняются одновременно в ограниченном пуле
+потоков (ANALYTICS_THREADS), у каждого потока свое соединение. Ответ
+собирается теми же функциями reports и рендерится тем же JSON-рендерером,
+что и в синхронных представлениях, поэтому тела ответов совпадают. Токен,
+ETag / 304 и кэш ответов проверяются теми же authentication, conditional
+и response_cache. Browsable API и OPTIONS здесь не поддерживаются.
+
+Представления подключаются в api.urls при ASYNC_VIEWS=True (по умолчанию в asgi.py).
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import Http404
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from rest_framework import exceptions
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from . import aggregation, authentication, conditional, forecasting, metrics, reports, response_cache, routers
+from .models import User, UserSettings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ANALYTICS_THREADS, thread_name_prefix='analytics'
+            )
+    return _executor
+
+
+def _call(timer, func, args, kwargs):
+    # Поток пула живет дольше запроса: соединение закрывается по CONN_MAX_AGE
+    close_old_connections()
+    with metrics.track_queries(timer):
+        return func(*args, **kwargs)
+
+
+async def run(request, func, *args, **kwargs):
+    """Выполняет синхронную функцию в пуле; SQL учитывается в метриках запроса"""
+    timer = getattr(request, 'query_timer', None)
+    loop = asyncio.get_running_loop()
+    # Контекст (в том числе выбор реплики routers.reading_from) переходит в поток пула
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_executor(), context.run, functools.partial(_call, timer, func, args, kwargs)
+    )
+
+
+def render(response):
+    """Рендерит Response тем же рендерером, что у DRF по умолчанию"""
+    renderer = import_string(settings.JSON_RENDERER)()
+    response.accepted_renderer = renderer
+    response.accepted_media_type = renderer.media_type
+    response.renderer_context = {}
+    response['Allow'] = 'GET, HEAD'
+    return response.render()
+
+
+def authenticate(request):
+    """Проверяет Authorization: Bearer, как DRF в синхронных представлениях: ответ 401 или None"""
+    authenticator = authentication.TokenAuthentication()
+    try:
+        authenticator.authenticate(request)
+    except exceptions.AuthenticationFailed as exc:
+        exc.auth_header = authenticator.authenticate_header(request)
+        return api_settings.EXCEPTION_HANDLER(exc, {})
+    return None
+
+
+async def serve(request, user_id, prefix, build):
+    """
+    Аутентификация, условный GET и кэш ответов (те же conditional и
+    response_cache, что у синхронных представлений) вокруг асинхронного
+    build(request, user_id), который возвращает Response.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return render(Response({'detail': exceptions.MethodNotAllowed(request.method).detail}, status=405))
+
+    call = functools.partial(run, request)
+    response = await call(authenticate, request)
+    if response is None:
+        async def compute():
+            try:
+                return await build(request, user_id)
+            except Http404:
+                return Response({'detail': exceptions.NotFound.default_detail}, status=404)
+
+        async def cached():
+            return await response_cache.aget_or_compute(prefix, user_id, request.GET.dict(), compute, call)
+
+        response = await conditional.arespond(request, user_id, cached, call, daily=True, replica=True)
+    return render(response) if isinstance(response, Response) else response
+
+
+async def _build_analytics(request, user_id):
+    now = timezone.localdate()
+    try:
+        date_range = await run(request, reports.analytics_range, request.GET, now, user_id)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    period = request.GET.get('period', 'all')
+    queries = reports.analytics_queries(user_id, period, now, date_range)
+
+    # Проверка пользователя идет параллельно с агрегатами
+    exists, *values = await asyncio.gather(
+        run(request, User.objects.filter(id=user_id).exists),
+        *(run(request, func, *args) for func, args in queries.values()),
+    )
+    if not exists:
+        raise Http404
+    return Response(reports.analytics_result(now, period, date_range, dict(zip(queries, values))))
+
+
+async def _build_insights(request, user_id):
+    now = timezone.localdate()
+    user_settings = await run(
+        request, UserSettings.objects.select_related('user').filter(user_id=user_id).first
+    )
+    if user_settings is None:
+        raise Http404
+    user = user_settings.user
+
+    # Версию уже прочитал serve (и передал в пул потоков через at_version);
+    # она взята до расчета, поэтому данные не окажутся старше версии
+    version = await run(request, response_cache.get_user_version, user.id)
+    stored = await run(request, reports.stored_insights, user, now, version)
+    if stored is not None:
+        return Response(stored)
+
+    goals, snapshot, forecast = await asyncio.gather(
+        run(request, reports.active_goals, user),
+        run(request, aggregation.month_spending, user, now),
+        run(request, forecasting.forecast_user, user.id, now),
+    )
+    snapshot['category_names'] = await run(
+        request, aggregation.category_names, user, reports.goal_category_ids(goals)
+    )
+    payload = reports.build_insights(
+        user, user_settings, now, goals=goals, snapshot=snapshot, forecast=forecast
+    )
+    await run(request, reports.store_insights, user.id, payload, version, now)
+    return Response(payload)
+
+
+async def analytics(request, user_id):
+    """Глубокая аналитика для пользователя"""
+    return await serve(request, user_id, 'analytics', _build_analytics)
+
+
+async def insights(request, user_id):
+    """Расширенные инсайты для пользователя"""
+    return await serve(request, user_id, 'insights', _build_insights)
@@ -0,0 +1,250 @@
+"""
+Пароли и токены доступа.
+
+Пароли хранятся в User.password_hash хешем Django (PASSWORD_HASHERS);
+пароли, сохраненные до хеширования открытым текстом, проверяются как есть
+и перехешируются при первом входе.
+
+Токен — подписанные SECRET_KEY id пользователя, отпечаток хеша пароля и время
+выдачи (django.core.signing), передается в заголовке Authorization: Bearer.
+Подпись и срок (AUTH_TOKEN_TTL) проверяются без БД, а пользователь берется
+из кэша Principal с временем жизни PRINCIPAL_CACHE_TTL: из кэша Django, если
+он общий для процессов (response_cache.is_shared), иначе из LRU в памяти
+процесса на PRINCIPAL_CACHE_SIZE записей. Сохранение и удаление пользователя
+сбрасывают его запись (signals.py); смена пароля меняет отпечаток, и выданные
+раньше токены перестают приниматься. С кэшем процесса сброс виден только
+в своем процессе: другие процессы принимают старый Principal (и отозванные
+токены) до PRINCIPAL_CACHE_TTL секунд.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.core import signing
+from django.core.cache import cache
+from django.http import Http404
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from . import response_cache
+from .models import User
+
+TOKEN_SALT = 'api.authentication.token'
+KEYWORD = b'bearer'
+
+
+class Principal:
+    """Пользователь запроса без обращения к БД"""
+    __slots__ = ('id', 'email', 'password_stamp')
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, id, email, password_stamp):
+        self.id = id
+        self.email = email
+        self.password_stamp = password_stamp
+
+    @property
+    def pk(self):
+        return self.id
+
+    def __repr__(self):
+        return f'<Principal {self.id}>'
+
+
+def password_stamp(password_hash):
+    """Отпечаток хеша пароля: меняется при смене пароля, сам хеш не раскрывает"""
+    return salted_hmac(TOKEN_SALT, password_hash or '').hexdigest()[:16]
+
+
+class PrincipalCache:
+    """
+    Потокобезопасный кэш Principal по id пользователя с временем жизни записей:
+    в общем кэше Django или в LRU процесса
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._max_size = max_size
+        self._ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_size(self):
+        return self._max_size or settings.PRINCIPAL_CACHE_SIZE
+
+    @property
+    def ttl(self):
+        return self._ttl if self._ttl is not None else settings.PRINCIPAL_CACHE_TTL
+
+    @staticmethod
+    def key(user_id):
+        return f'api:principal:{user_id}'
+
+    def _record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, user_id):
+        """Principal пользователя или None, если такого пользователя нет"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+        if response_cache.is_shared():
+            fields = cache.get(self.key(user_id))
+            self._record(fields is not None)
+            if fields is None:
+                fields = self._load(user_id)
+                if fields is None:
+                    return None
+                cache.set(self.key(user_id), fields, timeout=self.ttl)
+            return Principal(*fields)
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        fields = self._load(user_id)
+        if fields is None:
+            return None
+        principal = Principal(*fields)
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return principal
+
+    def _load(self, user_id):
+        row = User.objects.filter(pk=user_id).values_list('id', 'email', 'password_hash').first()
+        if row is None:
+            return None
+        return row[0], row[1], password_stamp(row[2])
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if response_cache.is_shared():
+            cache.delete(self.key(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+principals = PrincipalCache()
+
+
+def issue_token(user):
+    return signing.dumps(
+        {'u': user.pk, 'p': password_stamp(user.password_hash)}, salt=TOKEN_SALT, compress=False
+    )
+
+
+def verify_token(token):
+    """Principal по токену; AuthenticationFailed для неверного, просроченного или отозванного токена"""
+    try:
+        payload = signing.loads(token, salt=TOKEN_SALT, max_age=settings.AUTH_TOKEN_TTL)
+    except signing.SignatureExpired:
+        raise exceptions.AuthenticationFailed('Token expired')
+    except signing.BadSignature:
+        raise exceptions.AuthenticationFailed('Invalid token')
+
+    principal = principals.get(payload.get('u'))
+    if principal is None or not constant_time_compare(principal.password_stamp, payload.get('p', '')):
+        raise exceptions.AuthenticationFailed('Invalid token')
+    return principal
+
+
+class TokenAuthentication(BaseAuthentication):
+    """Authorization: Bearer <token>; без заголовка запрос остается анонимным"""
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != KEYWORD:
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header')
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed('Invalid token header')
+        return verify_token(token), token
+
+    def authenticate_header(self, request):
+        return 'Bearer'
+
+
+def request_user(request, user_id):
+    """
+    Пользователь, от имени которого пишет запрос: из токена или по user_id
+    из запроса (через кэш, без запроса к БД при попадании). None, если
+    пользователь не найден; с токеном чужой user_id дает PermissionDenied.
+    """
+    principal = request.user if isinstance(request.user, Principal) else None
+    if principal is not None:
+        if user_id not in (None, '') and str(user_id) != str(principal.id):
+            raise exceptions.PermissionDenied('user_id does not match the token')
+        return principal
+    if user_id in (None, ''):
+        return None
+    return principals.get(user_id)
+
+
+def request_user_or_404(request, user_id):
+    principal = request_user(request, user_id)
+    if principal is None:
+        raise Http404
+    return principal
+
+
+def set_password(user, password):
+    user.password_hash = make_password(password)
+    if user.pk:
+        user.save(update_fields=['password_hash', 'updated_at'])
+
+
+def authenticate(email, password):
+    """
+    Пользователь с таким email и паролем или None. Для неизвестного email
+    пароль все равно хешируется, чтобы время ответа не зависело от его наличия.
+    """
+    user = User.objects.filter(email=email).first() if email else None
+    if user is None or not password:
+        make_password(password or '')
+        return None
+
+    encoded = user.password_hash or ''
+    try:
+        identify_hasher(encoded)
+    except ValueError:
+        # Пароль сохранен до хеширования: сравниваем как есть и сразу перехешируем
+        if not encoded or not constant_time_compare(password, encoded):
+            make_password(password)
+            return None
+        set_password(user, password)
+        return user
+
+    if not check_password(password, encoded, setter=lambda raw: set_password(user, raw)):
+        return None
+    return user
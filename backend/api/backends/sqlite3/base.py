@@ -0,0 +1,32 @@
+"""
+SQLite для одного узла.
+
+На каждом новом соединении выполняются прагмы из OPTIONS['pragmas']
+(WAL, synchronous=NORMAL, mmap, кэш страниц, busy_timeout, temp_store),
+а транзакции atomic() начинаются с BEGIN IMMEDIATE: блокировка записи
+берется сразу, и транзакция, которой она не досталась, ждет busy_timeout,
+а не получает "database is locked" при первой записи после чтения.
+Подключается в settings вместо django.db.backends.sqlite3 (SQLITE_TUNED).
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # Записи процесса выстраиваются в очередь в api.db.write_transaction
+    serialize_writes = True
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode', 'IMMEDIATE')
+        self.cursor().execute(f'BEGIN {mode}')
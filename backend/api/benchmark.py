@@ -0,0 +1,354 @@
+"""
+Синтетические данные и замеры для бенчмарка API (manage.py benchmark_api).
+"""
+import asyncio
+import json
+import math
+import random
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from .models import User, UserSettings, Category, FinancialGoal, Transaction
+
+CATEGORY_NAMES = [
+    'Еда', 'Транспорт', 'Жилье', 'Связь', 'Здоровье',
+    'Развлечения', 'Одежда', 'Образование', 'Подарки', 'Путешествия',
+]
+
+BENCHMARK_PASSWORD = 'benchmark'
+
+
+def seed(users=10, transactions=1000, categories=8, goals=3, days=365, seed=0, batch_size=5000):
+    """
+    Создает пользователей с настройками, категориями, целями и транзакциями.
+    Возвращает id созданных пользователей.
+    """
+    rnd = random.Random(seed)
+    today = timezone.localdate()
+    names = CATEGORY_NAMES[:max(1, min(categories, len(CATEGORY_NAMES)))]
+    user_ids = []
+    # Один хеш на всех: хеширование для каждого пользователя заняло бы большую часть засева
+    password_hash = make_password(BENCHMARK_PASSWORD)
+
+    for index in range(users):
+        user = User.objects.create(
+            email=f'bench-{seed}-{index}@example.com',
+            password_hash=password_hash,
+            name=f'bench {index}',
+        )
+        user_ids.append(user.id)
+        UserSettings.objects.create(
+            user=user,
+            monthly_income=Decimal(rnd.randint(2000, 9000)),
+            fixed_expenses=Decimal(rnd.randint(200, 1500)),
+            onboarding_completed=True,
+            budgets={name: rnd.randint(100, 800) for name in names[:5]},
+        )
+        user_categories = Category.objects.bulk_create(
+            [Category(user=user, name=name) for name in names]
+        )
+        FinancialGoal.objects.bulk_create([
+            FinancialGoal(
+                user=user,
+                title=f'Цель {number}',
+                target_amount=Decimal(rnd.randint(1000, 50000)),
+                current_amount=Decimal(rnd.randint(0, 500)),
+                deadline=today + timedelta(days=rnd.randint(30, 720)),
+                category_savings={
+                    str(category.id): rnd.randint(10, 200)
+                    for category in rnd.sample(user_categories, min(2, len(user_categories)))
+                },
+            )
+            for number in range(goals)
+        ])
+
+        # Транзакции пишутся пачками через TransactionQuerySet.bulk_create: ссылка
+        # на категорию, дневные и месячные итоги и версия данных — как при обычной записи
+        batch = []
+        for _ in range(transactions):
+            is_expense = rnd.random() < 0.8
+            batch.append(Transaction(
+                user=user,
+                type='expense' if is_expense else 'income',
+                amount=Decimal(rnd.randint(100, 50000)) / 100,
+                category=rnd.choice(names) if is_expense else 'Зарплата',
+                date=today - timedelta(days=rnd.randint(0, days)),
+            ))
+            if len(batch) >= batch_size:
+                Transaction.objects.bulk_create(batch)
+                batch = []
+        Transaction.objects.bulk_create(batch)
+
+    return user_ids
+
+
+def _walk(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns)
+        else:
+            yield pattern
+
+
+# Методы, которые замеряются у каждого маршрута (OPTIONS и HEAD — нет)
+METHODS = ('get', 'post', 'put', 'patch', 'delete')
+
+
+def discover_endpoints(urlconf_module):
+    """
+    Маршруты из urlconf: [(name, method, kwarg_names)] для каждого разрешенного метода.
+    Варианты с суффиксом формата пропускаются.
+    """
+    endpoints = {}
+    for pattern in _walk(urlconf_module.urlpatterns):
+        kwargs = list(pattern.pattern.regex.groupindex)
+        if not pattern.name or 'format' in kwargs or pattern.name in endpoints:
+            continue
+        actions = getattr(pattern.callback, 'actions', None)
+        cls = getattr(pattern.callback, 'cls', None)
+        if actions is not None:
+            methods = [method for method in METHODS if method in actions]
+        elif cls is not None:
+            # Метод разрешен, если у представления есть его обработчик
+            methods = [method for method in METHODS if hasattr(cls, method)]
+        else:
+            methods = ['get']
+        endpoints[pattern.name] = (methods, kwargs)
+    return [
+        (name, method, kwargs) for name, (methods, kwargs) in endpoints.items() for method in methods
+    ]
+
+
+def endpoint_key(name, method):
+    """Ключ маршрута в результатах: имя для GET, имя и метод для остальных"""
+    return name if method == 'get' else f'{name} {method.upper()}'
+
+
+def sample_objects(user_id):
+    """Объекты пользователя для подстановки в pk маршрутов"""
+    return {
+        'user': user_id,
+        'transaction': Transaction.objects.filter(user_id=user_id).values_list('id', flat=True).first(),
+        'settings': UserSettings.objects.filter(user_id=user_id).values_list('id', flat=True).first(),
+        'goal': FinancialGoal.objects.filter(user_id=user_id).values_list('id', flat=True).first(),
+        'category': Category.objects.filter(user_id=user_id).values_list('id', flat=True).first(),
+    }
+
+
+def transaction_payload(iteration):
+    return {
+        'type': 'expense', 'amount': f'{iteration % 5 + 1}.00', 'category': CATEGORY_NAMES[0],
+        'date': timezone.localdate().isoformat(),
+    }
+
+
+def disposable_transactions(user_id, count):
+    """Транзакции, которые запрос удаления может удалить, не трогая засеянные данные"""
+    return Transaction.objects.bulk_create([
+        Transaction(user_id=user_id, type='expense', amount=Decimal('1.00'), category=CATEGORY_NAMES[0],
+                    date=timezone.localdate())
+        for _ in range(count)
+    ])
+
+
+def build_request(name, method, kwarg_names, user_id, objects, iteration):
+    """Путь, данные и формат запроса для маршрута или None, если маршрут нечем вызвать"""
+    kwargs = {}
+    for kwarg in kwarg_names:
+        if kwarg == 'user_id':
+            kwargs[kwarg] = user_id
+        elif kwarg == 'pk':
+            pk = objects.get(name.split('-')[0])
+            if pk is None:
+                return None
+            if (name, method) == ('transaction-detail', 'delete'):
+                pk = disposable_transactions(user_id, 1)[0].pk
+            kwargs[kwarg] = pk
+    path = reverse(name, kwargs=kwargs)
+
+    if method == 'get':
+        return path, {'user_id': user_id}, None
+
+    email = User.objects.filter(id=user_id).values_list('email', flat=True).first()
+    query = f'{path}?{urlencode({"user_id": user_id})}'
+    if (name, method) == ('user-login', 'post'):
+        return path, json.dumps({'email': email, 'password': BENCHMARK_PASSWORD}), 'application/json'
+    if (name, method) == ('user-register', 'post'):
+        payload = {'email': f'register-{user_id}-{iteration}-{time.time_ns()}@example.com', 'password': 'x'}
+        return path, json.dumps(payload), 'application/json'
+    if (name, method) == ('transaction-list', 'post'):
+        return path, json.dumps(dict(transaction_payload(iteration), user_id=user_id)), 'application/json'
+    if name == 'transaction-detail' and method in ('put', 'patch'):
+        return query, json.dumps(transaction_payload(iteration)), 'application/json'
+    if (name, method) == ('transaction-detail', 'delete'):
+        return query, '', 'application/json'
+    if (name, method) == ('transaction-import-file', 'post'):
+        today = timezone.localdate().isoformat()
+        rows = ''.join(f'expense,{i + 1}.00,Еда,,{today}\n' for i in range(10))
+        upload = SimpleUploadedFile('bench.csv', ('type,amount,category,description,date\n' + rows).encode())
+        return path, {'user_id': user_id, 'file': upload}, None
+    if (name, method) == ('transaction-batch', 'patch'):
+        ids = Transaction.objects.filter(user_id=user_id).order_by('id').values_list('id', flat=True)[:10]
+        # Сумма меняется на каждой итерации, чтобы запрос действительно писал
+        payload = [{'id': pk, 'amount': f'{iteration % 5 + 1}.00'} for pk in ids]
+        return query, json.dumps(payload), 'application/json'
+    if (name, method) == ('transaction-batch', 'delete'):
+        ids = [obj.pk for obj in disposable_transactions(user_id, 10)]
+        return query, json.dumps({'ids': ids}), 'application/json'
+    return None
+
+
+def percentile(values, fraction):
+    """Процентиль по ближайшему рангу"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def estimate_rows_scanned(queries):
+    """
+    Оценка числа просмотренных строк по плану PostgreSQL (Plan Rows узлов *Scan).
+    Для других СУБД возвращает None.
+    """
+    if connection.vendor != 'postgresql':
+        return None
+
+    def walk(plan):
+        rows = plan.get('Plan Rows', 0) if 'Scan' in plan.get('Node Type', '') else 0
+        return rows + sum(walk(child) for child in plan.get('Plans', []))
+
+    total = 0
+    with connection.cursor() as cursor:
+        for query in queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            total += walk(plan[0]['Plan'])
+    return total
+
+
+def measure(name, method, kwarg_names, user_id, iterations, warm_cache=False):
+    """Замеры задержки и числа SQL-запросов для одного маршрута"""
+    client = Client()
+    objects = sample_objects(user_id)
+    latencies = []
+    query_counts = []
+    statuses = set()
+    first_queries = None
+
+    for iteration in range(iterations):
+        request = build_request(name, method, kwarg_names, user_id, objects, iteration)
+        if request is None:
+            return None
+        path, data, content_type = request
+        if not warm_cache:
+            cache.clear()
+
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            if method == 'get':
+                response = client.get(path, data, HTTP_ACCEPT='application/json')
+            elif content_type:
+                response = getattr(client, method)(path, data, content_type=content_type)
+            else:
+                response = client.post(path, data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+        statuses.add(response.status_code)
+        # Асинхронные представления выполняют SQL в пуле потоков: их видит только таймер запроса.
+        # Таймер же останавливается до чтения потокового ответа (экспорт), чьи запросы видит captured
+        timer = getattr(response.wsgi_request, 'query_timer', None)
+        query_counts.append(max(timer.queries if timer is not None else 0, len(captured)))
+        if first_queries is None:
+            first_queries = list(captured.captured_queries)
+
+    return {
+        'method': method.upper(),
+        'path': path,
+        'status': sorted(statuses),
+        'iterations': iterations,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'queries': max(query_counts),
+        'rows_scanned': estimate_rows_scanned(first_queries or []),
+    }
+
+
+def measure_concurrent(name, kwarg_names, user_ids, iterations, concurrency, warm_cache=False):
+    """
+    Задержка GET-маршрута под нагрузкой: iterations волн по concurrency
+    одновременных запросов через ASGI-обработчик, пользователи по кругу.
+    """
+    objects = {user_id: sample_objects(user_id) for user_id in user_ids}
+    requests = []
+    for index in range(concurrency):
+        user_id = user_ids[index % len(user_ids)]
+        request = build_request(name, 'get', kwarg_names, user_id, objects[user_id], index)
+        if request is None:
+            return None
+        requests.append(request[:2])
+
+    async def timed(client, path, data):
+        started = time.perf_counter()
+        response = await client.get(path, data, HTTP_ACCEPT='application/json')
+        if response.streaming:
+            async for _ in response.streaming_content:
+                pass
+        return response.status_code, (time.perf_counter() - started) * 1000
+
+    async def run():
+        client = AsyncClient()
+        results = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            if not warm_cache:
+                await asyncio.to_thread(cache.clear)
+            results += await asyncio.gather(*(timed(client, path, data) for path, data in requests))
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+    latencies = [latency for _, latency in results]
+    return {
+        'concurrency': concurrency,
+        'status': sorted({status for status, _ in results}),
+        'requests': len(results),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'throughput_rps': round(len(results) / elapsed, 1),
+    }
+
+
+def compare(results, baseline, max_latency_regression, max_query_increase):
+    """Список регрессий относительно предыдущего прогона"""
+    failures = []
+    for name, current in results['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(name)
+        if not previous:
+            continue
+        if current['queries'] > previous['queries'] + max_query_increase:
+            failures.append(f"{name}: queries {previous['queries']} -> {current['queries']}")
+        limit = previous['p95_ms'] * (1 + max_latency_regression)
+        if current['p95_ms'] > limit:
+            failures.append(f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+    return failures
@@ -0,0 +1,185 @@
+"""
+Бюджеты по категориям на текущих месячных итогах.
+
+Расходы за месяц по (user, category) ведутся в MonthlyCategoryTotal теми же
+дельтами, что и дневные итоги. Пороги бюджета (80% и 100%) проверяются
+при записи только для категорий текущего месяца, у которых есть бюджет:
+при переходе на более высокий порог после коммита отправляется сигнал
+budget_threshold_reached. При BACKGROUND_JOBS пороги проверяет фоновая
+задача после записи (check_user, api.tasks.refresh_user), а запись только
+обновляет итоги. Статус бюджетов читается из месячных итогов одним
+запросом, без просмотра транзакций.
+"""
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.dispatch import Signal
+from django.utils import timezone
+
+from . import counters
+from .models import DailyRollup, MonthlyCategoryTotal, UserSettings
+
+THRESHOLDS = (80, 100)
+
+# Аргументы: user_id, category, threshold, spent, budget, month
+budget_threshold_reached = Signal()
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def budget_limits(budgets):
+    """Положительные лимиты из UserSettings.budgets как Decimal по имени категории"""
+    limits = {}
+    for category, limit in (budgets or {}).items():
+        try:
+            limit = Decimal(str(limit))
+        except (InvalidOperation, ValueError):
+            continue
+        if limit.is_finite() and limit > 0:
+            limits[category] = limit
+    return limits
+
+
+def level(spent, limit):
+    """Старший достигнутый порог, %"""
+    percentage = spent / limit * 100
+    reached = [threshold for threshold in THRESHOLDS if percentage >= threshold]
+    return reached[-1] if reached else 0
+
+
+def apply(deltas):
+    """
+    Применяет дельты расходов {(user_id, date, category): (total, count)}
+    и проверяет пороги бюджетов текущего месяца.
+    """
+    monthly = defaultdict(lambda: [Decimal('0'), 0])
+    for (user_id, date, category), (total, count) in deltas.items():
+        delta = monthly[(user_id, month_start(date), category)]
+        delta[0] += total
+        delta[1] += count
+
+    counters.apply(MonthlyCategoryTotal, ('user_id', 'month', 'category'), monthly)
+
+    current = month_start(timezone.localdate())
+    touched = defaultdict(set)
+    for (user_id, month, category), (total, count) in monthly.items():
+        if (total or count) and month == current:
+            touched[user_id].add(category)
+
+    # С фоновыми задачами пороги проверит задача, которую ставит запись
+    if touched and not settings.BACKGROUND_JOBS:
+        check_thresholds(touched, current)
+
+
+def check_thresholds(categories_by_user, month):
+    """Обновляет alert_level у затронутых категорий и сообщает о новых порогах"""
+    budgets = dict(
+        UserSettings.objects.filter(user_id__in=categories_by_user).values_list('user_id', 'budgets')
+    )
+    for user_id, categories in categories_by_user.items():
+        limits = budget_limits(budgets.get(user_id))
+        _sync(user_id, month, {category: limits[category] for category in categories if category in limits})
+
+
+def check_user(user_id, today=None):
+    """Проверяет пороги всех категорий с бюджетом в текущем месяце"""
+    month = month_start(today or timezone.localdate())
+    user_budgets = UserSettings.objects.filter(user_id=user_id).values_list('budgets', flat=True).first()
+    _sync(user_id, month, budget_limits(user_budgets))
+
+
+def _sync(user_id, month, limits, notify=True):
+    if not limits:
+        return
+    rows = MonthlyCategoryTotal.objects.filter(user_id=user_id, month=month, category__in=list(limits))
+    for pk, category, spent, current_level in rows.values_list('id', 'category', 'total', 'alert_level'):
+        new_level = level(spent, limits[category])
+        if new_level == current_level:
+            continue
+        # Условное обновление: о пороге сообщает только одна из параллельных записей
+        changed = MonthlyCategoryTotal.objects.filter(pk=pk, alert_level=current_level).update(
+            alert_level=new_level
+        )
+        if changed and notify and new_level > current_level:
+            _notify(user_id, category, new_level, spent, limits[category], month)
+
+
+def _notify(user_id, category, threshold, spent, limit, month):
+    transaction.on_commit(lambda: budget_threshold_reached.send(
+        sender=MonthlyCategoryTotal,
+        user_id=user_id, category=category, threshold=threshold,
+        spent=spent, budget=limit, month=month,
+    ))
+
+
+def sync_levels(user_id, budgets, today=None):
+    """Пересчитывает пороги после изменения бюджетов, без уведомлений"""
+    month = month_start(today or timezone.localdate())
+    limits = budget_limits(budgets)
+    _sync(user_id, month, limits, notify=False)
+    # Категории без бюджета не могут быть за порогом
+    MonthlyCategoryTotal.objects.filter(user_id=user_id, month=month).exclude(
+        category__in=list(limits)
+    ).exclude(alert_level=0).update(alert_level=0)
+
+
+def compute(user):
+    """Месячные расходы по категориям, посчитанные по дневным итогам"""
+    return (
+        DailyRollup.objects.filter(user=user, type='expense')
+        .annotate(month=TruncMonth('date'))
+        .values('month', 'category')
+        .annotate(sum_total=Sum('total'), sum_count=Sum('count'))
+        .order_by('month', 'category')
+    )
+
+
+def rebuild(user):
+    """Пересобирает месячные итоги пользователя по дневным итогам"""
+    with transaction.atomic():
+        MonthlyCategoryTotal.objects.filter(user=user).delete()
+        MonthlyCategoryTotal.objects.bulk_create([
+            MonthlyCategoryTotal(
+                user=user, month=row['month'], category=row['category'],
+                total=row['sum_total'], count=row['sum_count'],
+            )
+            for row in compute(user)
+        ])
+        user_budgets = UserSettings.objects.filter(user=user).values_list('budgets', flat=True).first()
+        sync_levels(user.id, user_budgets)
+
+
+def status(settings, today=None, spent_by_category=None):
+    """
+    Бюджеты пользователя с тратами текущего месяца.
+    spent_by_category — уже посчитанные траты месяца по имени категории (снимок месяца).
+    """
+    month = month_start(today or timezone.localdate())
+    limits = budget_limits(settings.budgets)
+    if spent_by_category is None:
+        spent_by_category = dict(
+            MonthlyCategoryTotal.objects.filter(
+                user_id=settings.user_id, month=month, category__in=list(limits)
+            ).values_list('category', 'total')
+        )
+
+    budgets = []
+    for category, limit in limits.items():
+        spent = spent_by_category.get(category, Decimal('0'))
+        percentage = spent / limit * 100
+        reached = level(spent, limit)
+        budgets.append({
+            'category': category,
+            'budget': float(limit),
+            'spent': float(spent),
+            'remaining': float(limit - spent),
+            'percentage': float(percentage),
+            'status': {0: 'ok', 80: 'warning', 100: 'exceeded'}[reached],
+        })
+    return {'month': month.isoformat(), 'budgets': budgets}
@@ -0,0 +1,42 @@
+"""
+Связь транзакций с категориями пользователя.
+
+Имя категории в Transaction.category остается подписью, которую принимает
+и отдает API, а Transaction.category_ref указывает на Category с этим
+именем. Связь проставляется при каждой записи, поэтому имя и ссылка
+всегда согласованы, а переименование категории переносится на транзакции.
+"""
+from .models import Category
+
+
+def link(objs):
+    """
+    Проставляет category_ref транзакциям по (user, category).
+    Если имя пустое, а ссылка задана, имя берется из категории того же пользователя.
+    Не больше двух запросов на весь список.
+    """
+    objs = list(objs)
+
+    by_id = {obj.category_ref_id for obj in objs if not obj.category and obj.category_ref_id}
+    if by_id:
+        known = {
+            pk: (user_id, name)
+            for pk, user_id, name in Category.objects.filter(id__in=by_id).values_list('id', 'user_id', 'name')
+        }
+        for obj in objs:
+            owner, name = known.get(obj.category_ref_id, (None, ''))
+            if not obj.category and owner == obj.user_id:
+                obj.category = name
+
+    pairs = {(obj.user_id, obj.category) for obj in objs if obj.category}
+    found = {}
+    if pairs:
+        rows = Category.objects.filter(
+            user_id__in={user_id for user_id, _ in pairs},
+            name__in={name for _, name in pairs},
+        ).values_list('user_id', 'name', 'id')
+        found = {(user_id, name): pk for user_id, name, pk in rows}
+
+    for obj in objs:
+        obj.category_ref_id = found.get((obj.user_id, obj.category)) if obj.category else None
+    return objs
@@ -0,0 +1,145 @@
+"""
+Условные GET-запросы (ETag / Last-Modified) для данных пользователя.
+
+Валидаторы строятся по DataVersion — версии данных, которая увеличивается
+в той же транзакции, что и любая запись (в том числе удаление) транзакций,
+настроек, целей и категорий. Поэтому ответ 304 отдается одним запросом
+по первичному ключу, без выполнения самого представления.
+"""
+import functools
+from contextlib import contextmanager
+from datetime import datetime, time
+
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from . import response_cache, routers
+from .models import DataVersion
+
+
+def state(user_id):
+    """(версия, время изменения) данных пользователя на primary"""
+    return (
+        DataVersion.objects.using(DEFAULT_DB_ALIAS).filter(user_id=user_id)
+        .values_list('version', 'changed_at')
+        .first()
+    ) or (0, None)
+
+
+def validators(user_id, daily=False, current=None):
+    """
+    (ETag, Last-Modified) для данных пользователя; current — уже прочитанный state().
+    daily=True для ответов, зависящих от текущей даты: такие ответы
+    устаревают в полночь даже без изменений данных.
+    """
+    version, changed_at = current or state(user_id)
+
+    etag = f'{user_id}-{version}'
+    if daily:
+        today = timezone.localdate()
+        etag = f'{etag}-{today.isoformat()}'
+        midnight = timezone.make_aware(datetime.combine(today, time.min))
+        changed_at = max(changed_at, midnight) if changed_at else midnight
+    last_modified = int(changed_at.timestamp()) if changed_at else None
+    return quote_etag(etag), last_modified
+
+
+def prepare(request, user_id, daily=False, replica=False):
+    """
+    Проверки до расчета ответа: (ETag, Last-Modified, ответ 304 или None,
+    версия данных, alias для чтений). Валидаторы берутся до расчета: если
+    данные изменятся во время расчета, клиент получит старый ETag и просто
+    перезапросит ответ. replica=True читает данные с реплики, если она
+    догнала версию пользователя.
+    """
+    current = state(user_id)
+    etag, last_modified = validators(user_id, daily=daily, current=current)
+    response = not_modified(request, etag, last_modified)
+    alias = routers.read_alias(user_id, current[0]) if replica and response is None else None
+    return etag, last_modified, response, current[0], alias
+
+
+@contextmanager
+def computing(user_id, version, alias):
+    """Расчет ответа: чтения с alias, ключи кэша по уже прочитанной версии"""
+    with routers.reading_from(alias), response_cache.at_version(user_id, version):
+        yield
+
+
+def respond(request, user_id, compute, daily=False, replica=False):
+    """Отдает 304 по заголовкам If-None-Match / If-Modified-Since или вызывает compute()"""
+    if request.method not in ('GET', 'HEAD') or user_id is None:
+        return compute()
+
+    etag, last_modified, response, version, alias = prepare(request, user_id, daily, replica)
+    if response is None:
+        with computing(user_id, version, alias):
+            response = compute()
+    return finalize(response, etag, last_modified)
+
+
+async def arespond(request, user_id, compute, run, daily=False, replica=False):
+    """respond() для асинхронного compute(); запросы к БД выполняет run(func, *args)"""
+    if request.method not in ('GET', 'HEAD') or user_id is None:
+        return await compute()
+
+    etag, last_modified, response, version, alias = await run(prepare, request, user_id, daily, replica)
+    if response is None:
+        with computing(user_id, version, alias):
+            response = await compute()
+    return finalize(response, etag, last_modified)
+
+
+def not_modified(request, etag, last_modified):
+    """Ответ 304 (или 412), если у клиента актуальная версия, иначе None"""
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def finalize(response, etag, last_modified):
+    """Проставляет валидаторы и заголовки кэширования успешному ответу или 304"""
+    if response.status_code not in (200, 304):
+        return response
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Браузер хранит ответ, но перепроверяет его при каждом переходе
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def _user_id_param(request):
+    try:
+        return int(request.query_params['user_id'])
+    except (KeyError, ValueError):
+        return None
+
+
+def user_view(daily=False, replica=False):
+    """Условный GET для функции-представления с аргументом user_id"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, user_id, *args, **kwargs):
+            return respond(
+                request, user_id,
+                lambda: view(request, user_id, *args, **kwargs),
+                daily=daily, replica=replica
+            )
+        return wrapper
+    return decorator
+
+
+def user_query_view(daily=False, replica=False):
+    """Условный GET для метода ViewSet, где пользователь задан параметром ?user_id="""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            return respond(
+                request, _user_id_param(request),
+                lambda: method(self, request, *args, **kwargs),
+                daily=daily, replica=replica
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,143 @@
+"""
+Строки-счетчики (total, count) с уникальным ключом: дневные и месячные итоги.
+
+Изменения применяются дельтами, без чтения текущих значений, поэтому
+параллельные записи не теряют друг друга. Растущие строки записываются
+пачками INSERT ... ON CONFLICT DO UPDATE (где БД это умеет), уменьшающиеся —
+пачками UPDATE с CASE по ключу; строки, у которых счетчик дошел до нуля,
+удаляются. Число запросов зависит от числа пачек, а не от числа ключей.
+increment — то же для одной строки (версия данных): UPDATE, а при промахе
+INSERT с повтором UPDATE, если строку успели создать параллельно.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models import Case, F, Q, Value, When
+
+# Ключей в одной команде (INSERT ... ON CONFLICT или UPDATE ... CASE)
+BATCH = 100
+
+# Ключ без значения поля в assign: поле не меняется
+_SKIP = object()
+
+
+def increment(model, key, changes, create=None):
+    """
+    UPDATE строки model с ключом key; если строки нет и задан create —
+    INSERT с этими значениями. Если строку успели создать параллельно,
+    UPDATE повторяется.
+    """
+    rows = model.objects.filter(**key)
+    if rows.update(**changes) or create is None:
+        return
+    try:
+        with transaction.atomic(using=router.db_for_write(model)):
+            model.objects.create(**key, **create)
+    except IntegrityError:
+        # Строку успели создать параллельно
+        rows.update(**changes)
+
+
+def apply(model, key_fields, deltas, assign=None):
+    """
+    Прибавляет дельты {key: (total, count)} к строкам model с ключом key_fields.
+    assign — значения других полей строки {key: {field: value}}, которые
+    записываются вместе с дельтой; у остальных ключей эти поля не меняются.
+    """
+    assign = assign or {}
+    # Нулевая разница все равно записывается, если для ключа есть assign
+    changed = {key: delta for key, delta in deltas.items() if delta[0] or delta[1] or key in assign}
+    growing = [key for key, (total, count) in changed.items() if count >= 0]
+    shrinking = [key for key, (total, count) in changed.items() if count < 0]
+
+    connection = connections[router.db_for_write(model)]
+    if connection.features.supports_update_conflicts_with_target:
+        _upsert(connection, model, key_fields, growing, changed, assign)
+    else:
+        for key in growing:
+            total, count = changed[key]
+            values = assign.get(key, {})
+            increment(
+                model, dict(zip(key_fields, key)),
+                {'total': F('total') + total, 'count': F('count') + count, **values},
+                create={'total': total, 'count': count, **values} if count > 0 else None,
+            )
+
+    for batch in _batches(shrinking):
+        _decrement(model, key_fields, batch, changed, assign)
+
+    for batch in _batches([key for key in changed if changed[key][1] <= 0]):
+        model.objects.filter(_match(key_fields, batch), count__lte=0).delete()
+
+
+def _batches(keys):
+    for offset in range(0, len(keys), BATCH):
+        yield keys[offset:offset + BATCH]
+
+
+def _match(key_fields, keys):
+    return reduce(or_, (Q(**dict(zip(key_fields, key))) for key in keys))
+
+
+def _upsert(connection, model, key_fields, keys, deltas, assign):
+    """
+    INSERT ... ON CONFLICT DO UPDATE по BATCH ключей. Ключи с assign и без
+    него пишутся разными командами: у вторых поля из assign не меняются.
+    """
+    groups = {}
+    for key in keys:
+        groups.setdefault(tuple(sorted(assign.get(key, {}))), []).append(key)
+
+    quote = connection.ops.quote_name
+    opts = model._meta
+    table = quote(opts.db_table)
+    for assigned, group in groups.items():
+        listed = [*key_fields, 'total', 'count', *assigned]
+        fields = [opts.get_field(name) for name in listed]
+        # Остальные поля новой строки получают значения по умолчанию
+        defaults = [
+            field for field in opts.concrete_fields
+            if not field.primary_key and field.name not in listed and field.attname not in listed
+        ]
+        columns = [quote(field.column) for field in fields + defaults]
+        key_columns = columns[:len(key_fields)]
+        total, count = columns[len(key_fields):len(key_fields) + 2]
+        updates = [
+            f'{total} = {table}.{total} + EXCLUDED.{total}',
+            f'{count} = {table}.{count} + EXCLUDED.{count}',
+        ] + [f'{column} = EXCLUDED.{column}' for column in columns[len(key_fields) + 2:len(fields)]]
+        row_placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+
+        for batch in _batches(group):
+            sql = (
+                f'INSERT INTO {table} ({", ".join(columns)}) '
+                f'VALUES {", ".join([row_placeholder] * len(batch))} '
+                f'ON CONFLICT ({", ".join(key_columns)}) DO UPDATE SET {", ".join(updates)}'
+            )
+            params = []
+            for key in batch:
+                values = assign.get(key, {})
+                row = [*key, *deltas[key], *(values[name] for name in assigned)]
+                params.extend(field.get_db_prep_save(value, connection) for field, value in zip(fields, row))
+                params.extend(field.get_db_prep_save(field.get_default(), connection) for field in defaults)
+            with connection.cursor() as cursor:
+                cursor.execute(sql, params)
+
+
+def _decrement(model, key_fields, keys, deltas, assign):
+    """Один UPDATE с CASE по ключу для пачки уменьшающихся строк"""
+    def case(name, value_of, default):
+        whens = [
+            When(Q(**dict(zip(key_fields, key))), then=Value(value_of(key)))
+            for key in keys if value_of(key) is not _SKIP
+        ]
+        return Case(*whens, default=default, output_field=model._meta.get_field(name))
+
+    changes = {
+        'total': F('total') + case('total', lambda key: deltas[key][0], Value(0)),
+        'count': F('count') + case('count', lambda key: deltas[key][1], Value(0)),
+    }
+    for name in {name for key in keys for name in assign.get(key, {})}:
+        changes[name] = case(name, lambda key: assign.get(key, {}).get(name, _SKIP), F(name))
+    model.objects.filter(_match(key_fields, keys)).update(**changes)
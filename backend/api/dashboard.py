@@ -0,0 +1,125 @@
+"""
+Данные стартовой страницы одним ответом (GET /api/dashboard/<user_id>/).
+
+Параметр ?fields= выбирает разделы, по умолчанию отдаются все. Настройки
+и цели загружаются один раз, а снимок текущего месяца считается одним
+запросом и общий для инсайтов, расчетов по целям и бюджетов. Разделы
+совпадают с ответами отдельных эндпоинтов; транзакции отдаются первой
+страницей курсорной пагинации со ссылкой next на список транзакций.
+"""
+from functools import cached_property
+
+from django.utils import timezone
+from rest_framework.utils.urls import replace_query_param
+
+from . import aggregation, budgets, fastpath, reports, response_cache
+from .models import Category, FinancialGoal, Transaction, UserSettings
+from .pagination import TransactionCursorPagination
+from .serializers import (
+    CategorySerializer, FinancialGoalSerializer, TransactionSerializer, UserSettingsSerializer
+)
+
+SECTIONS = (
+    'settings', 'transactions', 'categories', 'goals',
+    'goal_calculations', 'analytics', 'insights', 'budgets',
+)
+
+
+def parse_fields(value):
+    """Разделы из ?fields=a,b в порядке запроса; ValueError для неизвестных"""
+    if not value:
+        return list(SECTIONS)
+    fields = []
+    for name in value.split(','):
+        name = name.strip()
+        if not name or name in fields:
+            continue
+        if name not in SECTIONS:
+            raise ValueError(f'Unknown field: {name}. Available: {", ".join(SECTIONS)}')
+        fields.append(name)
+    return fields
+
+
+class Dashboard:
+    """Разделы для пользователя; общие данные загружаются только для выбранных разделов"""
+
+    def __init__(self, user, today=None, period='all', date_range=None, page_size=None, transactions_url=None):
+        self.user = user
+        self.today = today or timezone.localdate()
+        self.period = period
+        self.date_range = date_range
+        self.page_size = page_size or TransactionCursorPagination.page_size
+        # Ссылка на курсорный список транзакций для next
+        self.transactions_url = transactions_url
+
+    def build(self, fields):
+        return {name: getattr(self, f'_{name}')() for name in fields}
+
+    @cached_property
+    def user_settings(self):
+        return UserSettings.objects.filter(user=self.user).first()
+
+    @cached_property
+    def goals(self):
+        return list(FinancialGoal.objects.filter(user=self.user))
+
+    @cached_property
+    def snapshot(self):
+        """Доходы, расходы и траты по категориям с начала месяца"""
+        return aggregation.month_spending(self.user, self.today)
+
+    def _settings(self):
+        if self.user_settings is None:
+            return None
+        return UserSettingsSerializer(self.user_settings).data
+
+    def _transactions(self):
+        paginator = TransactionCursorPagination()
+        queryset = Transaction.objects.filter(user=self.user).order_by(*paginator.ordering)
+        serialize = fastpath.row_serializer(TransactionSerializer)
+        if serialize is not None:
+            queryset = queryset.values(*serialize.values_fields)
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        next_link = None
+        if has_more and self.transactions_url:
+            next_link = replace_query_param(
+                self.transactions_url, paginator.cursor_query_param, paginator.cursor_token(rows[-1])
+            )
+        return {
+            'next': next_link,
+            'previous': None,
+            'results': serialize(rows) if serialize is not None else TransactionSerializer(rows, many=True).data,
+        }
+
+    def _categories(self):
+        return CategorySerializer(Category.objects.filter(user=self.user), many=True).data
+
+    def _goals(self):
+        return FinancialGoalSerializer(self.goals, many=True).data
+
+    def _goal_calculations(self):
+        return reports.goals_calculations(self.goals, self.snapshot, self.today)
+
+    def _analytics(self):
+        return reports.build_analytics(self.user, self.period, self.today, self.date_range)
+
+    def _insights(self):
+        if self.user_settings is None:
+            return None
+        return reports.current_insights(
+            self.user, self.user_settings, self.today,
+            version=response_cache.get_user_version(self.user.id),
+            goals=[goal for goal in self.goals if goal.status == 'active'],
+            snapshot=self.snapshot,
+        )
+
+    def _budgets(self):
+        if self.user_settings is None:
+            return None
+        return budgets.status(
+            self.user_settings, self.today, spent_by_category=self.snapshot['categories']
+        )
@@ -0,0 +1,34 @@
+"""
+Транзакции записи.
+
+SQLite пишет в файл одним соединением за раз. На настроенном бэкенде
+(api.backends.sqlite3) записи процесса выстраиваются в очередь на
+блокировке процесса, а между процессами — на BEGIN IMMEDIATE и busy_timeout.
+Сохранение транзакции вместе с итогами, версией и бюджетами из сигналов
+идет одной транзакцией БД вместо отдельной блокировки на каждую запись.
+На других СУБД write_transaction — обычный atomic().
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock(alias):
+    with _locks_guard:
+        return _locks.setdefault(alias, threading.Lock())
+
+
+@contextmanager
+def write_transaction(using=None):
+    using = using or DEFAULT_DB_ALIAS
+    connection = connections[using]
+    if not getattr(connection, 'serialize_writes', False) or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+    with _lock(using), transaction.atomic(using=using):
+        yield
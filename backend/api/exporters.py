@@ -0,0 +1,100 @@
+"""
+Потоковый экспорт транзакций в CSV и NDJSON.
+
+Строки читаются через values_list().iterator(chunk_size=...), поэтому
+экземпляры моделей не создаются и выборка целиком не держится в памяти.
+Под ASGI поток отдается асинхронным итератором (aiterate): синхронный
+итератор StreamingHttpResponse Django под ASGI сначала читает целиком.
+"""
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import BaseRenderer
+
+from .models import Transaction
+
+CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = ('id', 'type', 'amount', 'category', 'description', 'date', 'created_at')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class ExportRenderer(BaseRenderer):
+    """Пропускает поток экспорта при любом Accept; ошибки отдает как JSON"""
+    media_type = '*/*'
+    format = 'export'
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, bytes):
+            return data
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = 'application/json'
+        return json.dumps(data, ensure_ascii=False).encode()
+
+
+class _Echo:
+    """Псевдо-буфер для csv.writer: возвращает строку вместо записи"""
+
+    def write(self, value):
+        return value
+
+
+def export_queryset(user_id, start_date=None, end_date=None, type=None):
+    """Строки экспорта; фильтры по периоду и типу выполняются в SQL"""
+    queryset = Transaction.objects.filter(user_id=user_id)
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    if type:
+        queryset = queryset.filter(type=type)
+    return (
+        queryset
+        .order_by('date', 'created_at', 'id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _format(row):
+    pk, type, amount, category, description, date, created_at = row
+    return [pk, type, str(amount), category, description, date.isoformat(), created_at.isoformat()]
+
+
+def stream_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(_format(row))
+
+
+def stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, _format(row))), ensure_ascii=False) + '\n'
+
+
+STREAMS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+}
+
+
+async def aiterate(stream, batch_size=CHUNK_SIZE):
+    """
+    Асинхронный итератор по синхронному потоку: batch_size строк за один
+    переход в поток запроса (thread_sensitive), где открыт курсор БД
+    """
+    next_batch = sync_to_async(lambda: list(islice(stream, batch_size)), thread_sensitive=True)
+    while True:
+        batch = await next_batch()
+        if not batch:
+            return
+        yield ''.join(batch)
@@ -0,0 +1,78 @@
+"""
+Быстрый путь чтения списков.
+
+Ответ строится прямо из строк .values() с заранее подготовленными
+конвертерами полей сериализатора: экземпляры моделей не создаются,
+а поля, которые DRF отдает как есть, не проходят через to_representation.
+Результат совпадает с ModelSerializer(many=True).data.
+"""
+from rest_framework import serializers
+
+# Поля, которые для значений из .values() DRF возвращает без изменений
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.PrimaryKeyRelatedField,
+    serializers.JSONField,
+)
+
+# Поля с собственным форматированием (Decimal, даты)
+CONVERTED_FIELDS = (
+    serializers.DecimalField,
+    serializers.DateField,
+    serializers.DateTimeField,
+)
+
+_cache = {}
+
+
+class RowSerializer:
+    """Сериализует строки .values() в порядке полей сериализатора"""
+
+    def __init__(self, columns):
+        # [(имя в ответе, колонка .values(), конвертер или None)]
+        self.columns = columns
+
+    @property
+    def values_fields(self):
+        return [column for _, column, _ in self.columns]
+
+    def __call__(self, rows):
+        columns = self.columns
+        result = []
+        for row in rows:
+            item = {}
+            for name, column, convert in columns:
+                value = row[column]
+                if convert is not None and value is not None:
+                    value = convert(value)
+                item[name] = value
+            result.append(item)
+        return result
+
+
+def row_serializer(serializer_class):
+    """RowSerializer для ModelSerializer или None, если есть поля, которые не читаются из .values()"""
+    if serializer_class in _cache:
+        return _cache[serializer_class]
+
+    serializer = serializer_class()
+    columns = []
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        if '.' in field.source or field.source == '*':
+            columns = None
+            break
+        if isinstance(field, PASSTHROUGH_FIELDS) and not isinstance(field, CONVERTED_FIELDS):
+            columns.append((name, field.source, None))
+        elif isinstance(field, CONVERTED_FIELDS):
+            columns.append((name, field.source, field.to_representation))
+        else:
+            columns = None
+            break
+
+    _cache[serializer_class] = RowSerializer(columns) if columns else None
+    return _cache[serializer_class]
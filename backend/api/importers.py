@@ -0,0 +1,135 @@
+"""
+Потоковый импорт транзакций из CSV и NDJSON.
+
+Файл читается построчно, строки валидируются пачками и записываются через
+bulk_create, по одной транзакции БД на пачку. Дневные итоги и версия кэша
+обновляются один раз на пачку. Ошибочные строки пропускаются и попадают
+в отчет, не прерывая импорт.
+"""
+import codecs
+import csv
+import json
+
+from rest_framework.exceptions import ValidationError
+
+from . import db
+from .models import Transaction
+from .serializers import TransactionSerializer
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(uploaded, requested=None):
+    """Формат из явного параметра или из расширения файла"""
+    if requested:
+        return requested.lower()
+    name = (uploaded.name or '').lower()
+    if name.endswith(('.ndjson', '.jsonl', '.json')):
+        return 'ndjson'
+    return 'csv'
+
+
+def _lines(uploaded):
+    """
+    Строки файла в UTF-8 (BOM в начале пропускается). Строка, которая не
+    декодируется, отдается как ValidationError: остальные строки импортируются.
+    """
+    for index, raw in enumerate(uploaded):
+        if index == 0 and raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8):]
+        try:
+            yield raw.decode('utf-8')
+        except UnicodeDecodeError as exc:
+            yield ValidationError({'non_field_errors': [f'Invalid UTF-8: {exc.reason} at byte {exc.start}']})
+
+
+def _csv_rows(lines):
+    # Недекодированные строки пропускаются читателем CSV и отдаются перед следующей записью
+    pending = []
+
+    def decoded():
+        for line in lines:
+            if isinstance(line, ValidationError):
+                pending.append(line)
+            else:
+                yield line
+
+    reader = csv.DictReader(decoded())
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as exc:
+            row = ValidationError({'non_field_errors': [f'Invalid CSV: {exc}']})
+        yield from pending
+        pending.clear()
+        yield row
+    yield from pending
+
+
+def iter_rows(uploaded, file_format):
+    """Строки файла как словари; невалидная строка отдается как исключение"""
+    lines = _lines(uploaded)
+    if file_format == 'csv':
+        yield from _csv_rows(lines)
+        return
+
+    for line in lines:
+        if isinstance(line, ValidationError):
+            yield line
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield ValidationError({'non_field_errors': [f'Invalid JSON: {exc}']})
+            continue
+        if not isinstance(row, dict):
+            row = ValidationError({'non_field_errors': ['Expected a JSON object']})
+        yield row
+
+
+def _chunks(rows, size):
+    chunk = []
+    for number, row in enumerate(rows, start=1):
+        chunk.append((number, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_transactions(user, uploaded, file_format, batch_size=BATCH_SIZE):
+    """Импортирует файл и возвращает отчет о созданных и ошибочных строках"""
+    report = {'created': 0, 'failed': 0, 'errors': [], 'errors_truncated': False}
+    validator = TransactionSerializer(context={'user_id': user.id})
+
+    for chunk in _chunks(iter_rows(uploaded, file_format), batch_size):
+        objs = []
+        for number, row in chunk:
+            try:
+                if isinstance(row, ValidationError):
+                    raise row
+                data = validator.run_validation(row)
+            except ValidationError as exc:
+                report['failed'] += 1
+                if len(report['errors']) < MAX_REPORTED_ERRORS:
+                    report['errors'].append({'row': number, 'errors': exc.detail})
+                else:
+                    report['errors_truncated'] = True
+                continue
+            objs.append(Transaction(user_id=user.id, **data))
+
+        if objs:
+            with db.write_transaction():
+                Transaction.objects.bulk_create(objs)
+            report['created'] += len(objs)
+
+    return report
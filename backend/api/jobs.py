@@ -0,0 +1,166 @@
+"""
+Очередь фоновых задач в основной БД (таблица jobs, manage.py runworker).
+
+Задача ставится в той же транзакции, что и запись, и становится видна
+воркеру только после коммита. Одинаковые ожидающие задачи (имя, пользователь,
+аргументы) не дублируются: частичный уникальный индекс по dedupe_key для
+status='pending'. Воркер забирает пачку задач через SELECT ... FOR UPDATE
+SKIP LOCKED (PostgreSQL); где его нет (SQLite), задачи забираются условным
+UPDATE ... WHERE status='pending' с меткой воркера, так что одну задачу
+получает только один воркер. Упавшая задача повторяется с экспоненциальной
+задержкой, после max_attempts остается в статусе failed. Выполненные
+задачи удаляются.
+"""
+import json
+import logging
+import os
+import random
+import socket
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+# Задержка перед повтором: BACKOFF_BASE * 2^(попытка - 1), не больше BACKOFF_MAX, секунд
+BACKOFF_BASE = 5
+BACKOFF_MAX = 3600
+
+_tasks = {}
+
+
+def task(name):
+    """Регистрирует функцию как задачу с именем name"""
+    def decorator(func):
+        _tasks[name] = func
+        return func
+    return decorator
+
+
+def registered():
+    from . import tasks  # noqa: F401 — регистрация задач
+
+    return dict(_tasks)
+
+
+def _dedupe_key(name, user_id, kwargs):
+    return f'{name}:{user_id}:{json.dumps(kwargs, sort_keys=True, default=str)}'
+
+
+def enqueue(name, user_id=None, delay=0, max_attempts=5, dedupe=True, **kwargs):
+    """
+    Ставит задачу в очередь и возвращает ее, или None, если такая же
+    задача уже ожидает запуска.
+    """
+    job = Job(
+        name=name, user_id=user_id, kwargs=kwargs, max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        dedupe_key=_dedupe_key(name, user_id, kwargs) if dedupe else None,
+    )
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return None
+    return job
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def backoff(attempts):
+    delay = min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+    # Разброс, чтобы повторы упавших вместе задач не совпадали
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim(worker, limit=10):
+    """Забирает до limit готовых задач и помечает их выполняющимися этим воркером"""
+    now = timezone.now()
+    requeue_stale(now)
+    token = f'{worker}:{uuid.uuid4().hex[:12]}'
+
+    with transaction.atomic():
+        ready = Job.objects.filter(status='pending', run_at__lte=now).order_by('run_at', 'id')
+        if connection.features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list('id', flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids, status='pending').update(
+            status='running', locked_by=token, locked_at=now, attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(locked_by=token, status='running').order_by('run_at', 'id'))
+
+
+def _retry_or_fail(job, error, now):
+    """Возвращает задачу в очередь с задержкой или помечает failed после max_attempts"""
+    if job.attempts >= job.max_attempts:
+        Job.objects.filter(pk=job.pk).update(status='failed', locked_by='', last_error=error)
+        return 'failed'
+    try:
+        with transaction.atomic():
+            Job.objects.filter(pk=job.pk).update(
+                status='pending', locked_by='', locked_at=None, last_error=error,
+                run_at=now + timedelta(seconds=backoff(job.attempts)),
+            )
+    except IntegrityError:
+        # Такая же задача уже ожидает: она и выполнит работу
+        Job.objects.filter(pk=job.pk).delete()
+    return 'retry'
+
+
+def requeue_stale(now=None):
+    """Задачи, которые выполняются дольше JOBS_TIMEOUT (упавший воркер), считаются упавшими"""
+    now = now or timezone.now()
+    stale = Job.objects.filter(
+        status='running', locked_at__lt=now - timedelta(seconds=settings.JOBS_TIMEOUT)
+    )
+    for job in stale:
+        _retry_or_fail(job, 'Timed out', now)
+
+
+def execute(job):
+    """Выполняет задачу: 'done', 'retry' или 'failed'"""
+    func = registered().get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f'Unknown task {job.name}')
+        kwargs = dict(job.kwargs)
+        if job.user_id is not None:
+            kwargs['user_id'] = job.user_id
+        func(**kwargs)
+    except Exception:
+        logger.exception('Job %s (%s) failed', job.pk, job.name)
+        return _retry_or_fail(job, traceback.format_exc(limit=5), timezone.now())
+    Job.objects.filter(pk=job.pk).delete()
+    return 'done'
+
+
+def run_once(worker, limit=10):
+    """Забирает и выполняет одну пачку задач; {результат: число задач}"""
+    results = {}
+    for job in claim(worker, limit):
+        outcome = execute(job)
+        results[outcome] = results.get(outcome, 0) + 1
+    return results
+
+
+def stats():
+    """Глубина очереди: число задач по статусам и возраст самой старой готовой задачи"""
+    now = timezone.now()
+    counts = {status: 0 for status, _ in Job.STATUS_CHOICES}
+    counts.update(Job.objects.values_list('status').annotate(count=Count('id')).order_by())
+    oldest = Job.objects.filter(status='pending', run_at__lte=now).aggregate(oldest=Min('run_at'))['oldest']
+    return {
+        'jobs': counts,
+        'oldest_ready_seconds': (now - oldest).total_seconds() if oldest else 0.0,
+    }
@@ -0,0 +1,129 @@
+import json
+import platform
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+import api.urls
+from api import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет отдельную тестовую БД синтетическими данными и замеряет '
+        'p50/p95/p99, число SQL-запросов и просмотренные строки для каждого маршрута api.urls'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--transactions', type=int, default=1000,
+                            help='Транзакций на пользователя')
+        parser.add_argument('--categories', type=int, default=8)
+        parser.add_argument('--goals', type=int, default=3)
+        parser.add_argument('--days', type=int, default=365, help='Глубина истории в днях')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--endpoint', action='append', dest='endpoints',
+                            help='Имя маршрута (можно несколько раз); по умолчанию все')
+        parser.add_argument('--warm-cache', action='store_true',
+                            help='Не очищать кэш ответов между запросами')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Сохранить тестовую БД и данные между запусками')
+        parser.add_argument('--concurrency', type=int, default=0,
+                            help='Дополнительно замерить GET-маршруты под N одновременными запросами (ASGI)')
+        parser.add_argument('--output', help='Путь для JSON с результатами (по умолчанию stdout)')
+        parser.add_argument('--baseline', help='JSON предыдущего прогона для проверки регрессий')
+        parser.add_argument('--max-latency-regression', type=float, default=0.25,
+                            help='Допустимый рост p95 относительно baseline (доля)')
+        parser.add_argument('--max-query-increase', type=int, default=0,
+                            help='Допустимый рост числа SQL-запросов относительно baseline')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb']
+        )
+        try:
+            results = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        report = json.dumps(results, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(report)
+        else:
+            self.stdout.write(report)
+
+        if options['baseline']:
+            with open(options['baseline']) as fh:
+                baseline = json.load(fh)
+            failures = benchmark.compare(
+                results, baseline,
+                options['max_latency_regression'], options['max_query_increase'],
+            )
+            if failures:
+                raise CommandError('Regressions:\n' + '\n'.join(failures))
+            self.stderr.write(self.style.SUCCESS('No regressions against baseline'))
+
+    def run(self, options):
+        from api.models import User
+
+        user_ids = list(User.objects.filter(email__startswith=f"bench-{options['seed']}-")
+                        .values_list('id', flat=True))
+        if not user_ids:
+            user_ids = benchmark.seed(
+                users=options['users'],
+                transactions=options['transactions'],
+                categories=options['categories'],
+                goals=options['goals'],
+                days=options['days'],
+                seed=options['seed'],
+            )
+        probe_user = user_ids[0]
+
+        endpoints = {}
+        for name, method, kwargs in benchmark.discover_endpoints(api.urls):
+            if options['endpoints'] and name not in options['endpoints']:
+                continue
+            result = benchmark.measure(
+                name, method, kwargs, probe_user,
+                options['iterations'], warm_cache=options['warm_cache'],
+            )
+            key = benchmark.endpoint_key(name, method)
+            if result is None:
+                self.stderr.write(f'skip {key}: no request builder')
+                continue
+            endpoints[key] = result
+            self.stderr.write(f"{key}: p95={result['p95_ms']}ms queries={result['queries']}")
+
+            if options['concurrency'] and method == 'get':
+                concurrent = benchmark.measure_concurrent(
+                    name, kwargs, user_ids, options['iterations'], options['concurrency'],
+                    warm_cache=options['warm_cache'],
+                )
+                if concurrent is not None:
+                    result['concurrent'] = concurrent
+                    self.stderr.write(
+                        f"{key}: x{options['concurrency']} p95={concurrent['p95_ms']}ms "
+                        f"rps={concurrent['throughput_rps']}"
+                    )
+
+        return {
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'python': platform.python_version(),
+                'users': len(user_ids),
+                'transactions_per_user': options['transactions'],
+                'iterations': options['iterations'],
+                'warm_cache': options['warm_cache'],
+                'concurrency': options['concurrency'],
+                'async_views': settings.ASYNC_VIEWS,
+            },
+            'endpoints': endpoints,
+        }
@@ -0,0 +1,199 @@
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import Client
+from django.utils import timezone
+
+from api import benchmark
+
+MODES = ('stock', 'tuned')
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность чтения и записи на файле SQLite '
+        'со стандартным бэкендом Django (stock) и с SQLITE_TUNED (tuned): '
+        'несколько процессов с потоками одновременно читают и создают транзакции'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=4)
+        parser.add_argument('--transactions', type=int, default=500,
+                            help='Транзакций на пользователя при засеве')
+        parser.add_argument('--processes', type=int, default=2)
+        parser.add_argument('--threads', type=int, default=4, help='Потоков в каждом процессе')
+        parser.add_argument('--duration', type=float, default=10.0, help='Длительность прогона, секунд')
+        parser.add_argument('--write-ratio', type=float, default=0.2, help='Доля запросов на запись')
+        parser.add_argument('--mode', action='append', dest='modes', choices=MODES,
+                            help='Режим (можно несколько раз); по умолчанию оба')
+        parser.add_argument('--output', help='Путь для JSON с результатами (по умолчанию stdout)')
+        # Служебные аргументы дочерних процессов
+        parser.add_argument('--prepare', action='store_true', help='(служебный) засеять БД')
+        parser.add_argument('--worker', action='store_true', help='(служебный) выполнить нагрузку')
+        parser.add_argument('--start-at', type=float, default=0.0, help='(служебный) время старта')
+
+    def handle(self, *args, **options):
+        if options['prepare']:
+            call_command('migrate', verbosity=0)
+            benchmark.seed(users=options['users'], transactions=options['transactions'], days=90)
+            return
+        if options['worker']:
+            self.stdout.write(json.dumps(run_worker(options)))
+            return
+
+        workdir = tempfile.mkdtemp(prefix='benchmark-sqlite-')
+        try:
+            seeded = os.path.join(workdir, 'seed.sqlite3')
+            self._manage(seeded, 'stock', '--prepare',
+                         '--users', options['users'], '--transactions', options['transactions'])
+            results = {}
+            for mode in options['modes'] or MODES:
+                path = os.path.join(workdir, f'{mode}.sqlite3')
+                shutil.copyfile(seeded, path)
+                results[mode] = self._run_mode(path, mode, options)
+                self.stderr.write(
+                    f"{mode}: reads/s={results[mode]['reads_per_second']} "
+                    f"writes/s={results[mode]['writes_per_second']} errors={results[mode]['errors']}"
+                )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        report = json.dumps({
+            'meta': {
+                'timestamp': timezone.now().isoformat(),
+                'processes': options['processes'],
+                'threads': options['threads'],
+                'duration': options['duration'],
+                'write_ratio': options['write_ratio'],
+            },
+            'modes': results,
+        }, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(report)
+        else:
+            self.stdout.write(report)
+
+    def _env(self, path, mode):
+        return dict(
+            os.environ,
+            DATABASE_URL=f'sqlite:///{path}',
+            SQLITE_TUNED='True' if mode == 'tuned' else 'False',
+        )
+
+    def _manage(self, path, mode, *args):
+        command = [sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark_sqlite']
+        command += [str(arg) for arg in args]
+        completed = subprocess.run(command, env=self._env(path, mode), capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError(completed.stderr)
+        return completed.stdout
+
+    def _run_mode(self, path, mode, options):
+        start_at = time.time() + 2
+        command = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'), 'benchmark_sqlite', '--worker',
+            '--threads', str(options['threads']), '--duration', str(options['duration']),
+            '--write-ratio', str(options['write_ratio']), '--start-at', str(start_at),
+        ]
+        workers = [
+            subprocess.Popen(command, env=self._env(path, mode), stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE, text=True)
+            for _ in range(options['processes'])
+        ]
+        reports = []
+        for worker in workers:
+            stdout, stderr = worker.communicate()
+            if worker.returncode:
+                raise CommandError(stderr)
+            reports.append(json.loads(stdout))
+        return summarize(reports, options['duration'])
+
+
+def run_worker(options):
+    """Потоки процесса читают и пишут до истечения duration; задержки в мс по видам запросов"""
+    from api.models import User
+
+    user_ids = list(User.objects.values_list('id', flat=True))
+    connections.close_all()
+    results = {'read': [], 'write': [], 'errors': {}}
+    lock = threading.Lock()
+
+    def work(number):
+        rnd = random.Random(os.getpid() * 100 + number)
+        client = Client(raise_request_exception=False)
+        today = timezone.localdate()
+        latencies = {'read': [], 'write': []}
+        errors = {}
+        deadline = options['start_at'] + options['duration']
+        try:
+            while time.time() < deadline:
+                user_id = rnd.choice(user_ids)
+                started = time.perf_counter()
+                if rnd.random() < options['write_ratio']:
+                    kind = 'write'
+                    response = client.post('/api/transactions/', {
+                        'user_id': user_id,
+                        'type': 'expense',
+                        'amount': f'{rnd.randint(100, 10000) / 100:.2f}',
+                        'category': rnd.choice(benchmark.CATEGORY_NAMES[:8]),
+                        'date': (today - timedelta(days=rnd.randint(0, 30))).isoformat(),
+                    }, content_type='application/json')
+                else:
+                    kind = 'read'
+                    response = client.get(
+                        '/api/transactions/', {'user_id': user_id, 'pagination': 'cursor'},
+                        HTTP_ACCEPT='application/json',
+                    )
+                if response.status_code >= 500:
+                    exc_info = getattr(response, 'exc_info', None)
+                    reason = str(exc_info[1]) if exc_info else str(response.status_code)
+                    errors[reason] = errors.get(reason, 0) + 1
+                else:
+                    latencies[kind].append((time.perf_counter() - started) * 1000)
+        finally:
+            connections.close_all()
+        with lock:
+            results['read'] += latencies['read']
+            results['write'] += latencies['write']
+            for reason, count in errors.items():
+                results['errors'][reason] = results['errors'].get(reason, 0) + count
+
+    threads = [threading.Thread(target=work, args=(number,)) for number in range(options['threads'])]
+    time.sleep(max(0.0, options['start_at'] - time.time()))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def summarize(reports, duration):
+    reads = [latency for report in reports for latency in report['read']]
+    writes = [latency for report in reports for latency in report['write']]
+    errors = {}
+    for report in reports:
+        for reason, count in report['errors'].items():
+            errors[reason] = errors.get(reason, 0) + count
+    return {
+        'reads': len(reads),
+        'writes': len(writes),
+        'reads_per_second': round(len(reads) / duration, 1),
+        'writes_per_second': round(len(writes) / duration, 1),
+        'read_p95_ms': round(benchmark.percentile(reads, 0.95) or 0, 3),
+        'write_p95_ms': round(benchmark.percentile(writes, 0.95) or 0, 3),
+        'errors': sum(errors.values()),
+        'error_reasons': errors,
+    }
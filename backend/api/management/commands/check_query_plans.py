@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from api import benchmark, queryplans
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет отдельную тестовую БД, снимает EXPLAIN для запросов к transactions и '
+        'daily_rollups всех GET-маршрутов api.urls и завершается с ошибкой при полном просмотре таблицы'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=3)
+        parser.add_argument('--transactions', type=int, default=2000,
+                            help='Транзакций на пользователя')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Сохранить тестовую БД и данные между запусками')
+        parser.add_argument('--output', help='Путь для JSON с планами запросов')
+
+    def handle(self, *args, **options):
+        if not queryplans.supported():
+            raise CommandError(
+                f'Query plans can be checked on {", ".join(sorted(queryplans.EXPLAIN))}, not {connection.vendor}'
+            )
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb']
+        )
+        try:
+            results = self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options['keepdb'])
+            teardown_test_environment()
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(results, fh, indent=2, ensure_ascii=False)
+
+        failures = [result for result in results if result['sequential_scans']]
+        for result in failures:
+            self.stderr.write(
+                f"{result['endpoint']} {result['params']}: {', '.join(result['sequential_scans'])}\n"
+                f"  {result['sql']}"
+            )
+        if failures:
+            raise CommandError(f'{len(failures)} of {len(results)} queries scan a whole table')
+        self.stderr.write(self.style.SUCCESS(
+            f'{len(results)} queries checked on {connection.vendor}, no sequential scans'
+        ))
+
+    def run(self, options):
+        from api.models import User
+
+        user_ids = list(User.objects.filter(email__startswith=f"bench-{options['seed']}-")
+                        .values_list('id', flat=True))
+        if not user_ids:
+            user_ids = benchmark.seed(
+                users=options['users'],
+                transactions=options['transactions'],
+                seed=options['seed'],
+            )
+        queryplans.analyze()
+        return queryplans.check(user_ids[0])
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from api.routers import REPLICA, replica_configured
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует SQLite-файл primary в SQLite-файл реплики (REPLICA_DATABASE_URL) '
+        'для локальной проверки чтения с реплики; с --interval повторяет копирование, '
+        'имитируя отставание реплики'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Повторять каждые N секунд (по умолчанию один раз)')
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('REPLICA_DATABASE_URL is not set')
+        primary, replica = connections[DEFAULT_DB_ALIAS], connections[REPLICA]
+        if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+            raise CommandError('copy_replica works only with SQLite primary and replica')
+
+        while True:
+            started = time.perf_counter()
+            primary.ensure_connection()
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stderr.write(f'Replica copied in {time.perf_counter() - started:.3f}s')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
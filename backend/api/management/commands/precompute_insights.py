@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from api import forecasting, reports, versioning
+from api.models import User
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+    # Соединения родительского процесса после fork использовать нельзя
+    connections.close_all()
+
+
+def compute_chunk(user_ids, today):
+    """
+    Рассчитывает инсайты для пачки пользователей: [(user_id, version, payload)].
+    Процессы только читают; запись делает родительский процесс.
+    """
+    results = []
+    users = list(User.objects.filter(id__in=user_ids, settings__isnull=False).select_related('settings'))
+    # Версии читаем до расчета: запись во время расчета сделает результат устаревшим
+    versions = {user.id: versioning.current(user.id) for user in users}
+    # Прогнозы всей пачки одним вызовом
+    forecasts = forecasting.forecast_users([user.id for user in users], today)
+    for user in users:
+        payload = reports.build_insights(user, user.settings, today, forecast=forecasts[user.id])
+        results.append((user.id, versions[user.id], payload))
+    return results
+
+
+def store_chunk(results, today):
+    for user_id, version, payload in results:
+        reports.store_insights(user_id, payload, version, today)
+    return len(results)
+
+
+class Command(BaseCommand):
+    help = 'Предрасчет инсайтов за день для всех пользователей или их шарда'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Число процессов; 1 — считать в текущем процессе')
+        parser.add_argument('--shard', default=None,
+                            help='Шард в виде i/n: пользователи с id %% n == i')
+        parser.add_argument('--chunk-size', type=int, default=200)
+        parser.add_argument('--date', default=None, help='Дата расчета YYYY-MM-DD (по умолчанию сегодня)')
+
+    def handle(self, *args, **options):
+        today = parse_date(options['date']) if options['date'] else timezone.localdate()
+        if today is None:
+            raise CommandError('--date must be YYYY-MM-DD')
+
+        user_ids = User.objects.filter(settings__isnull=False).order_by('id').values_list('id', flat=True)
+        if options['shard']:
+            try:
+                index, count = (int(part) for part in options['shard'].split('/'))
+            except ValueError:
+                raise CommandError('--shard must look like i/n')
+            if not 0 <= index < count:
+                raise CommandError('--shard index must be in [0, n)')
+            user_ids = [user_id for user_id in user_ids.iterator() if user_id % count == index]
+        else:
+            user_ids = list(user_ids)
+
+        size = options['chunk_size']
+        chunks = [user_ids[i:i + size] for i in range(0, len(user_ids), size)]
+        workers = max(1, options['workers'])
+
+        done = 0
+        if workers == 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                done += store_chunk(compute_chunk(chunk, today), today)
+        else:
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                futures = [pool.submit(compute_chunk, chunk, today) for chunk in chunks]
+                for future in as_completed(futures):
+                    done += store_chunk(future.result(), today)
+
+        self.stdout.write(self.style.SUCCESS(f'Insights computed for {done} users on {today}'))
@@ -0,0 +1,75 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api import budgets, jobs, rollups
+from api.models import User, DailyRollup, MonthlyCategoryTotal
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает или проверяет дневные итоги (DailyRollup) по таблице транзакций '
+        'и месячные итоги по категориям (MonthlyCategoryTotal) по дневным'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users',
+                            help='ID пользователя (можно указать несколько раз)')
+        parser.add_argument('--verify', action='store_true',
+                            help='Только сравнить итоги с транзакциями, ничего не меняя')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--enqueue', action='store_true',
+                            help='Поставить пересборку в очередь фоновых задач (runworker)')
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id')
+        if options['users']:
+            users = users.filter(id__in=options['users'])
+
+        mismatched = 0
+        for user in users.iterator():
+            if options['verify']:
+                diff = self.verify(user)
+                if diff:
+                    mismatched += 1
+                    self.stdout.write(self.style.WARNING(
+                        f'user {user.id}: {len(diff)} mismatched rows'
+                    ))
+                    for key in diff[:10]:
+                        self.stdout.write(f'  {key}')
+            elif options['enqueue']:
+                jobs.enqueue('rebuild_rollups', user_id=user.id)
+                self.stdout.write(f'user {user.id}: queued')
+            else:
+                rollups.rebuild(user, batch_size=options['batch_size'])
+                self.stdout.write(f'user {user.id}: rebuilt')
+
+        if mismatched:
+            raise CommandError(f'Rollups differ from transactions for {mismatched} users')
+        if options['verify']:
+            self.stdout.write(self.style.SUCCESS('Rollups match transactions'))
+
+    def verify(self, user):
+        """Ключи (date, type, category) и ('month', month, category), где итоги расходятся"""
+        expected = {
+            (row['date'], row['type'], row['category']): (row['total'], row['count'])
+            for row in rollups.compute(user)
+        }
+        actual = {
+            (row['date'], row['type'], row['category']): (row['total'], row['count'])
+            for row in DailyRollup.objects.filter(user=user).values(
+                'date', 'type', 'category', 'total', 'count'
+            )
+        }
+        expected.update({
+            ('month', row['month'], row['category']): (row['sum_total'], row['sum_count'])
+            for row in budgets.compute(user)
+        })
+        actual.update({
+            ('month', row['month'], row['category']): (row['total'], row['count'])
+            for row in MonthlyCategoryTotal.objects.filter(user=user).values(
+                'month', 'category', 'total', 'count'
+            )
+        })
+        return sorted(
+            (key for key in expected.keys() | actual.keys() if expected.get(key) != actual.get(key)),
+            key=str
+        )
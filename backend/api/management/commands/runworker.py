@@ -0,0 +1,77 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api import jobs
+
+
+def _loop(worker, options, stop):
+    """Цикл воркера: пачка задач, при пустой очереди — ожидание poll_interval"""
+    try:
+        while not stop.is_set():
+            results = jobs.run_once(worker, options['batch_size'])
+            if not results:
+                if options['once']:
+                    break
+                stop.wait(options['poll_interval'])
+    finally:
+        connections.close_all()
+
+
+def _process_main(worker, options, stop):
+    import django
+
+    django.setup()
+    # Ctrl+C обрабатывает родительский процесс и останавливает дочерние через stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _loop(worker, options, stop)
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из таблицы jobs в пуле потоков или процессов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Число параллельных воркеров')
+        parser.add_argument('--pool', choices=('thread', 'process'), default='thread')
+        parser.add_argument('--batch-size', type=int, default=10,
+                            help='Задач, забираемых воркером за раз')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Пауза при пустой очереди, секунд')
+        parser.add_argument('--once', action='store_true',
+                            help='Выполнить готовые задачи и завершиться')
+
+    def handle(self, *args, **options):
+        jobs.registered()
+        concurrency = max(1, options['concurrency'])
+        name = jobs.worker_name()
+        self.stderr.write(f"Worker {name}: {concurrency} x {options['pool']}")
+
+        if options['pool'] == 'process':
+            connections.close_all()
+            stop = multiprocessing.Event()
+            workers = [
+                multiprocessing.Process(target=_process_main, args=(f'{name}-{index}', options, stop))
+                for index in range(concurrency)
+            ]
+        else:
+            stop = threading.Event()
+            workers = [
+                threading.Thread(target=_loop, args=(f'{name}-{index}', options, stop))
+                for index in range(concurrency)
+            ]
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for worker in workers:
+                worker.join()
+        self.stdout.write(self.style.SUCCESS(f'Worker {name} stopped'))
@@ -0,0 +1,261 @@
+"""
+Метрики запросов по представлениям: количество, гистограмма времени ответа,
+время в БД и число SQL-запросов.
+
+SQL считается через connection.execute_wrapper, поэтому работает при
+DEBUG=False. Метрики копятся в памяти процесса и отдаются на /api/_metrics
+в формате Prometheus или JSON.
+"""
+import hmac
+import json
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, Http404
+
+# Границы корзин гистограммы времени ответа, секунды
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Registry:
+    """Потокобезопасные счетчики по имени представления"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def _empty(self):
+        return {
+            'requests': 0,
+            'errors': 0,
+            'duration_sum': 0.0,
+            'duration_buckets': [0] * len(BUCKETS),
+            'db_duration_sum': 0.0,
+            'queries': 0,
+        }
+
+    def observe(self, view, duration, db_duration, queries, status_code):
+        with self._lock:
+            stats = self._views.get(view)
+            if stats is None:
+                stats = self._views[view] = self._empty()
+            stats['requests'] += 1
+            if status_code >= 500:
+                stats['errors'] += 1
+            stats['duration_sum'] += duration
+            for index, bound in enumerate(BUCKETS):
+                if duration <= bound:
+                    stats['duration_buckets'][index] += 1
+            stats['db_duration_sum'] += db_duration
+            stats['queries'] += queries
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: dict(stats, duration_buckets=list(stats['duration_buckets']))
+                for view, stats in self._views.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+registry = Registry()
+
+
+class _QueryTimer:
+    """
+    execute_wrapper, который считает запросы и время в БД.
+    Один таймер может обслуживать соединения нескольких потоков запроса.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.duration += elapsed
+                self.queries += 1
+
+
+@contextmanager
+def track_queries(timer):
+    """Подключает таймер запроса к соединениям текущего потока (для пулов потоков)"""
+    with ExitStack() as stack:
+        if timer is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+        yield
+
+
+class QueryMetricsMiddleware:
+    """
+    Записывает метрики каждого запроса в registry. Работает и в цепочке
+    ASGI без перехода между потоками: для асинхронных представлений
+    (ASYNC_VIEWS) вызывается асинхронная ветка.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = request.query_timer = _QueryTimer()
+        started = time.perf_counter()
+        with track_queries(timer):
+            response = self.get_response(request)
+        self._observe(request, timer, started, response)
+        return response
+
+    async def __acall__(self, request):
+        timer = request.query_timer = _QueryTimer()
+        started = time.perf_counter()
+        with track_queries(timer):
+            response = await self.get_response(request)
+        self._observe(request, timer, started, response)
+        return response
+
+    def _observe(self, request, timer, started, response):
+        duration = time.perf_counter() - started
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else '<unresolved>'
+        registry.observe(view, duration, timer.duration, timer.queries, response.status_code)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(views, cache_stats, principal_stats=None, job_stats=None):
+    lines = [
+        '# HELP finance_api_requests_total Requests handled per view',
+        '# TYPE finance_api_requests_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        lines.append(f'finance_api_requests_total{{view="{_label(view)}"}} {stats["requests"]}')
+
+    lines += [
+        '# HELP finance_api_request_errors_total Responses with 5xx status per view',
+        '# TYPE finance_api_request_errors_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        lines.append(f'finance_api_request_errors_total{{view="{_label(view)}"}} {stats["errors"]}')
+
+    lines += [
+        '# HELP finance_api_request_duration_seconds Wall time per request',
+        '# TYPE finance_api_request_duration_seconds histogram',
+    ]
+    for view, stats in sorted(views.items()):
+        label = _label(view)
+        for bound, count in zip(BUCKETS, stats['duration_buckets']):
+            lines.append(f'finance_api_request_duration_seconds_bucket{{view="{label}",le="{bound}"}} {count}')
+        lines.append(f'finance_api_request_duration_seconds_bucket{{view="{label}",le="+Inf"}} {stats["requests"]}')
+        lines.append(f'finance_api_request_duration_seconds_sum{{view="{label}"}} {stats["duration_sum"]:.6f}')
+        lines.append(f'finance_api_request_duration_seconds_count{{view="{label}"}} {stats["requests"]}')
+
+    lines += [
+        '# HELP finance_api_db_duration_seconds_total Time spent in SQL per view',
+        '# TYPE finance_api_db_duration_seconds_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        lines.append(f'finance_api_db_duration_seconds_total{{view="{_label(view)}"}} {stats["db_duration_sum"]:.6f}')
+
+    lines += [
+        '# HELP finance_api_db_queries_total SQL queries executed per view',
+        '# TYPE finance_api_db_queries_total counter',
+    ]
+    for view, stats in sorted(views.items()):
+        lines.append(f'finance_api_db_queries_total{{view="{_label(view)}"}} {stats["queries"]}')
+
+    lines += [
+        '# HELP finance_api_response_cache_total Response cache lookups per view and result',
+        '# TYPE finance_api_response_cache_total counter',
+    ]
+    for view, counters in sorted(cache_stats.items()):
+        for result in ('hits', 'misses'):
+            lines.append(
+                f'finance_api_response_cache_total{{view="{_label(view)}",result="{result}"}} {counters[result]}'
+            )
+
+    if principal_stats is not None:
+        lines += [
+            '# HELP finance_api_principal_cache_total Token user cache lookups per result',
+            '# TYPE finance_api_principal_cache_total counter',
+            f'finance_api_principal_cache_total{{result="hits"}} {principal_stats["hits"]}',
+            f'finance_api_principal_cache_total{{result="misses"}} {principal_stats["misses"]}',
+            '# HELP finance_api_principal_cache_size Token users cached in the process',
+            '# TYPE finance_api_principal_cache_size gauge',
+            f'finance_api_principal_cache_size {principal_stats["size"]}',
+        ]
+
+    if job_stats is not None:
+        lines += [
+            '# HELP finance_api_jobs Background jobs in the queue per status',
+            '# TYPE finance_api_jobs gauge',
+        ]
+        for status, count in sorted(job_stats['jobs'].items()):
+            lines.append(f'finance_api_jobs{{status="{_label(status)}"}} {count}')
+        lines += [
+            '# HELP finance_api_jobs_oldest_ready_seconds Age of the oldest job ready to run',
+            '# TYPE finance_api_jobs_oldest_ready_seconds gauge',
+            f'finance_api_jobs_oldest_ready_seconds {job_stats["oldest_ready_seconds"]:.3f}',
+        ]
+
+    return '\n'.join(lines) + '\n'
+
+
+def _authorized(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        return False
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    supplied = header[len('Bearer '):] if header.startswith('Bearer ') else ''
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def metrics_view(request):
+    """Метрики процесса; доступ по заголовку Authorization: Bearer <METRICS_TOKEN>"""
+    if not _authorized(request):
+        # Не раскрываем наличие эндпоинта
+        raise Http404
+
+    from . import authentication, jobs, response_cache
+
+    views = registry.snapshot()
+    cache_stats = response_cache.stats()
+    principal_stats = authentication.principals.stats()
+    job_stats = jobs.stats()
+    wants_json = (
+        request.GET.get('format') == 'json'
+        or 'application/json' in request.META.get('HTTP_ACCEPT', '')
+    )
+    if wants_json:
+        payload = {
+            'buckets': list(BUCKETS),
+            'views': views,
+            'response_cache': cache_stats,
+            'principal_cache': principal_stats,
+            'queue': job_stats,
+        }
+        return HttpResponse(json.dumps(payload), content_type='application/json')
+    return HttpResponse(
+        render_prometheus(views, cache_stats, principal_stats, job_stats),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,75 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+
+
+def build_rollups(apps, schema_editor):
+    Transaction = apps.get_model("api", "Transaction")
+    DailyRollup = apps.get_model("api", "DailyRollup")
+
+    rows = (
+        Transaction.objects.order_by()
+        .values("user_id", "date", "type", "category")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by("user_id", "date", "type", "category")
+    )
+    batch = []
+    for row in rows.iterator():
+        batch.append(DailyRollup(**row))
+        if len(batch) >= 1000:
+            DailyRollup.objects.bulk_create(batch)
+            batch = []
+    DailyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("expense", "Расход"), ("income", "Доход")],
+                        max_length=10,
+                    ),
+                ),
+                ("category", models.CharField(blank=True, max_length=100)),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_rollups",
+                        to="api.user",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "daily_rollups",
+                "unique_together": {("user", "date", "type", "category")},
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0002_daily_rollup"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DataVersion",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="data_version",
+                        serialize=False,
+                        to="api.user",
+                    ),
+                ),
+                ("version", models.PositiveBigIntegerField(default=0)),
+                ("changed_at", models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                "db_table": "data_versions",
+            },
+        ),
+        migrations.AddField(
+            model_name="insight",
+            name="data_version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
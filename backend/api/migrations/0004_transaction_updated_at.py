@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:20
+
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    Transaction = apps.get_model("api", "Transaction")
+    Transaction.objects.filter(updated_at__isnull=True).update(
+        updated_at=models.F("created_at")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_insight_data_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="updated_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="transaction",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
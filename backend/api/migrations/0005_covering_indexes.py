@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_transaction_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dailyrollup",
+            index=models.Index(
+                fields=["user", "type", "date"],
+                include=("category", "total", "count"),
+                name="rollup_user_type_date",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "-date", "-created_at", "-id"],
+                name="tx_user_date_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "type", "date"],
+                include=("amount",),
+                name="tx_user_type_date",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["user", "type", "category", "date"],
+                include=("amount",),
+                name="tx_user_type_category_date",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_user_id_dff1f0_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="transaction",
+            name="transaction_user_id_7b4347_idx",
+        ),
+    ]
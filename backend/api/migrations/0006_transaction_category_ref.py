@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0005_covering_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailyrollup",
+            name="category_ref",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="category_id",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="daily_rollups",
+                to="api.category",
+            ),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="category_ref",
+            field=models.ForeignKey(
+                blank=True,
+                db_column="category_id",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="transactions",
+                to="api.category",
+            ),
+        ),
+    ]
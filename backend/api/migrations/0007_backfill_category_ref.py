@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-17 16:40
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+BATCH_SIZE = 5000
+
+
+def _backfill(model, Category):
+    """
+    Проставляет category_id по (user_id, category) диапазонами первичного ключа.
+    Миграция не атомарная: каждый диапазон — отдельный короткий UPDATE,
+    таблица не блокируется на все время заполнения.
+    """
+    category_id = Subquery(
+        Category.objects.filter(
+            user_id=OuterRef("user_id"), name=OuterRef("category")
+        ).values("id")[:1]
+    )
+    pks = (
+        model.objects.filter(category_ref__isnull=True)
+        .exclude(category="")
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    batch = []
+    for pk in pks.iterator(chunk_size=BATCH_SIZE):
+        batch.append(pk)
+        if len(batch) >= BATCH_SIZE:
+            model.objects.filter(pk__gte=batch[0], pk__lte=batch[-1], category_ref__isnull=True).update(
+                category_ref=category_id
+            )
+            batch = []
+    if batch:
+        model.objects.filter(pk__gte=batch[0], pk__lte=batch[-1], category_ref__isnull=True).update(
+            category_ref=category_id
+        )
+
+
+def backfill_category_ref(apps, schema_editor):
+    Category = apps.get_model("api", "Category")
+    _backfill(apps.get_model("api", "Transaction"), Category)
+    _backfill(apps.get_model("api", "DailyRollup"), Category)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ("api", "0006_transaction_category_ref"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_category_ref, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 4.2.7 on 2026-10-17 15:18
+
+from decimal import Decimal, InvalidOperation
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+
+def build_monthly_totals(apps, schema_editor):
+    DailyRollup = apps.get_model("api", "DailyRollup")
+    MonthlyCategoryTotal = apps.get_model("api", "MonthlyCategoryTotal")
+    UserSettings = apps.get_model("api", "UserSettings")
+
+    rows = (
+        DailyRollup.objects.filter(type="expense")
+        .annotate(month=TruncMonth("date"))
+        .values("user_id", "month", "category")
+        .annotate(sum_total=Sum("total"), sum_count=Sum("count"))
+        .order_by("user_id", "month", "category")
+    )
+    batch = []
+    for row in rows.iterator():
+        batch.append(
+            MonthlyCategoryTotal(
+                user_id=row["user_id"],
+                month=row["month"],
+                category=row["category"],
+                total=row["sum_total"],
+                count=row["sum_count"],
+            )
+        )
+        if len(batch) >= 1000:
+            MonthlyCategoryTotal.objects.bulk_create(batch)
+            batch = []
+    MonthlyCategoryTotal.objects.bulk_create(batch)
+
+    # Уже достигнутые пороги текущего месяца, без уведомлений
+    month = timezone.localdate().replace(day=1)
+    for user_id, budgets in UserSettings.objects.values_list("user_id", "budgets"):
+        for category, limit in (budgets or {}).items():
+            try:
+                limit = Decimal(str(limit))
+            except (InvalidOperation, ValueError):
+                continue
+            if not limit.is_finite() or limit <= 0:
+                continue
+            for pk, total in MonthlyCategoryTotal.objects.filter(
+                user_id=user_id, month=month, category=category
+            ).values_list("id", "total"):
+                percentage = total / limit * 100
+                level = 100 if percentage >= 100 else 80 if percentage >= 80 else 0
+                if level:
+                    MonthlyCategoryTotal.objects.filter(pk=pk).update(alert_level=level)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0007_backfill_category_ref"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlyCategoryTotal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("month", models.DateField()),
+                ("category", models.CharField(blank=True, max_length=100)),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=18),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("alert_level", models.PositiveSmallIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="monthly_totals",
+                        to="api.user",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "monthly_category_totals",
+                "unique_together": {("user", "month", "category")},
+            },
+        ),
+        migrations.RunPython(build_monthly_totals, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -29,6 +29,81 @@ class UserSettings(models.Model):
         db_table = 'user_settings'
 
 
+class TransactionQuerySet(models.QuerySet):
+    """Массовые операции, которые не шлют сигналы, сами обновляют дневные итоги и версию кэша"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from . import categories, rollups, response_cache
+
+        objs = super().bulk_create(categories.link(objs), *args, **kwargs)
+        rollups.apply(added=rollups.rows_from_instances(objs))
+        response_cache.bump_user_versions({obj.user_id for obj in objs})
+        return objs
+
+    def update(self, **kwargs):
+        from . import rollups, response_cache
+
+        kwargs.setdefault('updated_at', timezone.now())
+        if 'category' in kwargs and not {'category_ref', 'category_ref_id'}.intersection(kwargs):
+            # Ссылка на категорию следует за именем, как при сохранении одной транзакции
+            kwargs['category_ref'] = models.Subquery(
+                Category.objects.filter(user_id=models.OuterRef('user_id'), name=kwargs['category'])
+                .values('id')[:1]
+            )
+        if not rollups.TRACKED_FIELDS.intersection(kwargs):
+            with transaction.atomic(using=self.db):
+                user_ids = set(self.values_list('user_id', flat=True).distinct())
+                updated = super().update(**kwargs)
+                response_cache.bump_user_versions(user_ids)
+            return updated
+
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            before = list(rollups.rows_from_queryset(self.model.objects.filter(pk__in=pks)))
+            updated = super().update(**kwargs)
+            after = list(rollups.rows_from_queryset(self.model.objects.filter(pk__in=pks)))
+            rollups.apply(added=after, removed=before)
+            response_cache.bump_user_versions({row[0] for row in before + after})
+        return updated
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        from . import categories
+
+        # Итоги и версию кэша обновляет update(), которым bulk_update записывает
+        # каждую пачку; здесь только ссылка на категорию и updated_at у самих объектов
+        objs = list(objs)
+        fields = set(fields)
+        if fields.intersection(['category', 'category_ref']):
+            categories.link(objs)
+            fields.update(['category', 'category_ref'])
+        now = timezone.now()
+        for obj in objs:
+            obj.updated_at = now
+        fields.add('updated_at')
+        return super().bulk_update(objs, sorted(fields), *args, **kwargs)
+
+    def delete(self):
+        from . import rollups, response_cache
+
+        with transaction.atomic(using=self.db):
+            pks = list(self.values_list('pk', flat=True))
+            removed = list(rollups.rows_from_queryset(self.model.objects.filter(pk__in=pks)))
+            # Сигналы удаления отправляются как обычно, но обработчики итогов
+            # и версии пропускают эти строки: итоги вычитаются одним apply
+            deleting = rollups.bulk_deleting()
+            deleting.update(pks)
+            try:
+                deleted = super().delete()
+            finally:
+                deleting.difference_update(pks)
+            rollups.apply(removed=removed)
+            response_cache.bump_user_versions({row[0] for row in removed})
+        return deleted
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
 class Transaction(models.Model):
     """Транзакция (доход или расход)"""
     TRANSACTION_TYPES = [
@@ -40,19 +115,73 @@ class Transaction(models.Model):
     type = models.CharField(max_length=10, choices=TRANSACTION_TYPES)
     amount = models.DecimalField(max_digits=15, decimal_places=2)
     category = models.CharField(max_length=100, blank=True)
+    # Категория пользователя с именем category; заполняется при записи (api.categories)
+    category_ref = models.ForeignKey(
+        'Category', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='transactions', db_column='category_id'
+    )
     description = models.TextField(blank=True)
     date = models.DateField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = TransactionQuerySet.as_manager()
 
     class Meta:
         db_table = 'transactions'
         ordering = ['-date', '-created_at']
         indexes = [
-            models.Index(fields=['user', '-date']),
-            models.Index(fields=['user', 'type']),
+            # Порядок списка и курсорной пагинации; экспорт читает его в обратную сторону
+            models.Index(fields=['user', '-date', '-created_at', '-id'], name='tx_user_date_created'),
+            # Суммы по типу за период и по категориям; INCLUDE работает в PostgreSQL
+            models.Index(fields=['user', 'type', 'date'], include=['amount'], name='tx_user_type_date'),
+            models.Index(
+                fields=['user', 'type', 'category', 'date'], include=['amount'],
+                name='tx_user_type_category_date'
+            ),
+        ]
+
+
+class DailyRollup(models.Model):
+    """Дневные итоги транзакций пользователя по типу и категории"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField()
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    category = models.CharField(max_length=100, blank=True)
+    category_ref = models.ForeignKey(
+        'Category', on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='daily_rollups', db_column='category_id'
+    )
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'daily_rollups'
+        unique_together = ['user', 'date', 'type', 'category']
+        indexes = [
+            # Разбивка по категориям за период для одного типа
+            models.Index(
+                fields=['user', 'type', 'date'], include=['category', 'total', 'count'],
+                name='rollup_user_type_date'
+            ),
         ]
 
 
+class MonthlyCategoryTotal(models.Model):
+    """Расходы пользователя по категории с начала месяца; ведется вместе с DailyRollup"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_totals')
+    month = models.DateField()  # Первое число месяца
+    category = models.CharField(max_length=100, blank=True)
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+    # Старший достигнутый порог бюджета, %: 0, 80 или 100
+    alert_level = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        db_table = 'monthly_category_totals'
+        unique_together = ['user', 'month', 'category']
+
+
 class Category(models.Model):
     """Пользовательская категория расходов"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='categories')
@@ -108,9 +237,57 @@ class Insight(models.Model):
     daily_limit = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     forecast_balance = models.DecimalField(max_digits=15, decimal_places=2, default=0)
     monthly_spending = models.DecimalField(max_digits=15, decimal_places=2, default=0)
+    # Полный ответ insights, рассчитанный для версии данных data_version
     comparison_data = models.JSONField(default=dict)
+    data_version = models.PositiveBigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = 'insights'
         unique_together = ['user', 'date']
+
+
+class DataVersion(models.Model):
+    """Счетчик изменений данных пользователя (транзакции, настройки, цели, категории)"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='data_version')
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'data_versions'
+
+
+class Job(models.Model):
+    """Фоновая задача (api.jobs); выполненные задачи удаляются"""
+    STATUS_CHOICES = [
+        ('pending', 'Ожидает'),
+        ('running', 'Выполняется'),
+        ('failed', 'Ошибка'),
+    ]
+
+    name = models.CharField(max_length=100)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='jobs')
+    kwargs = models.JSONField(default=dict, blank=True)
+    # Одинаковые ожидающие задачи не дублируются
+    dedupe_key = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'jobs'
+        indexes = [
+            # Выборка готовых к запуску задач и зависших выполняющихся
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at'),
+            models.Index(fields=['locked_by'], name='job_locked_by'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'], condition=models.Q(status='pending'), name='job_pending_dedupe'
+            ),
+        ]
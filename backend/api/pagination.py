@@ -0,0 +1,139 @@
+"""
+Keyset-пагинация списка транзакций.
+
+Страница выбирается условием по ключу (date, created_at, id) последней
+строки предыдущей страницы, поэтому нет ни COUNT(*), ни OFFSET, а новые
+транзакции, добавленные во время листания, не сдвигают страницы.
+"""
+import base64
+import binascii
+from collections import OrderedDict
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class TransactionCursorPagination(BasePagination):
+    """Курсорная пагинация по (-date, -created_at, -id)"""
+    page_size = 100
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-date', '-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor = self.decode_cursor(request)
+
+        reverse = bool(self.cursor and self.cursor[0])
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(field.lstrip('-') for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor:
+            queryset = queryset.filter(self._beyond(self.cursor[1:], reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next = True
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def _beyond(self, position, reverse):
+        """Строки строго после позиции в порядке обхода"""
+        row_date, created_at, pk = position
+        op = 'gt' if reverse else 'lt'
+        return (
+            Q(**{f'date__{op}': row_date})
+            | Q(date=row_date, **{f'created_at__{op}': created_at})
+            | Q(date=row_date, created_at=created_at, **{f'id__{op}': pk})
+        )
+
+    def position(self, row):
+        """Ключ строки: модель или словарь из .values()"""
+        if isinstance(row, dict):
+            return row['date'], row['created_at'], row['id']
+        return row.date, row.created_at, row.pk
+
+    def cursor_token(self, row, reverse=False):
+        """Значение параметра cursor для страницы после (или перед) строкой"""
+        row_date, created_at, pk = self.position(row)
+        raw = '|'.join([
+            '1' if reverse else '0',
+            row_date.isoformat(),
+            created_at.isoformat(),
+            str(pk),
+        ])
+        return base64.urlsafe_b64encode(raw.encode()).decode()
+
+    def encode_cursor(self, row, reverse):
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.cursor_token(row, reverse)
+        )
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token.encode()).decode()
+            reverse, row_date, created_at, pk = raw.split('|')
+            return (
+                reverse == '1',
+                date.fromisoformat(row_date),
+                datetime.fromisoformat(created_at),
+                int(pk),
+            )
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,140 @@
+"""
+Проверка планов запросов API (manage.py check_query_plans).
+
+Запросы маршрутов перехватываются при реальных вызовах через тестовый клиент,
+для каждого SELECT по проверяемым таблицам снимается EXPLAIN и ищется
+полный просмотр таблицы: `SCAN <table>` в SQLite или `Seq Scan` в PostgreSQL.
+"""
+import json
+import re
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import benchmark
+
+# Таблицы, которые растут вместе с историей пользователя
+CHECKED_TABLES = ('transactions', 'daily_rollups')
+
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?"?(\w+)"?')
+
+
+def extra_requests(user_id):
+    """Варианты параметров, которые не покрываются запросами бенчмарка по умолчанию"""
+    today = timezone.localdate()
+    month_ago = (today - timedelta(days=30)).isoformat()
+    return [
+        ('analytics', {'user_id': user_id}, {'period': 'month'}),
+        ('analytics', {'user_id': user_id}, {'period': 'week'}),
+        ('analytics', {'user_id': user_id}, {'from': month_ago, 'granularity': 'week'}),
+        ('analytics', {'user_id': user_id}, {'granularity': 'month'}),
+        ('transaction-list', {}, {'user_id': user_id, 'pagination': 'cursor'}),
+        ('transaction-export', {}, {
+            'user_id': user_id, 'output': 'ndjson', 'type': 'expense', 'from': month_ago,
+        }),
+    ]
+
+
+def capture(path, params):
+    """SQL-запросы, выполненные при GET-запросе к маршруту"""
+    client = Client()
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(path, params, HTTP_ACCEPT='application/json')
+        if response.streaming:
+            b''.join(response.streaming_content)
+    return response.status_code, [query['sql'] for query in captured.captured_queries]
+
+
+def _touches(sql):
+    return [table for table in CHECKED_TABLES if f'"{table}"' in sql]
+
+
+def _explain_sqlite(cursor, sql):
+    cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+    plan = [row[-1] for row in cursor.fetchall()]
+    scans = []
+    for line in plan:
+        match = _SQLITE_SCAN.match(line)
+        if match and match.group(1) in CHECKED_TABLES:
+            scans.append(line)
+    return plan, scans
+
+
+def _explain_postgresql(cursor, sql):
+    # Seq Scan при выключенном enable_seqscan значит, что подходящего индекса нет
+    cursor.execute('SET LOCAL enable_seqscan = off')
+    cursor.execute('EXPLAIN (FORMAT JSON) ' + sql)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    scans = []
+
+    def walk(node):
+        if node.get('Node Type') == 'Seq Scan' and node.get('Relation Name') in CHECKED_TABLES:
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        for child in node.get('Plans', []):
+            walk(child)
+
+    walk(plan[0]['Plan'])
+    return plan, scans
+
+
+# Разбор EXPLAIN по СУБД; для остальных проверка планов не выполняется
+EXPLAIN = {
+    'sqlite': _explain_sqlite,
+    'postgresql': _explain_postgresql,
+}
+
+
+def supported():
+    return connection.vendor in EXPLAIN
+
+
+def explain(sql):
+    """(план, полные просмотры проверяемых таблиц) для запроса; СУБД должна быть в EXPLAIN"""
+    with transaction.atomic(), connection.cursor() as cursor:
+        return EXPLAIN[connection.vendor](cursor, sql)
+
+
+def analyze():
+    """Обновляет статистику планировщика после заполнения данных"""
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+def check(user_id):
+    """Планы всех GET-маршрутов api.urls и дополнительных вариантов для пользователя"""
+    import api.urls
+
+    objects = benchmark.sample_objects(user_id)
+    requests = []
+    for name, method, kwarg_names in benchmark.discover_endpoints(api.urls):
+        if method != 'get':
+            continue
+        request = benchmark.build_request(name, method, kwarg_names, user_id, objects, 0)
+        if request is not None:
+            requests.append((name, request[0], request[1]))
+    for name, kwargs, params in extra_requests(user_id):
+        requests.append((name, reverse(name, kwargs=kwargs), params))
+
+    results = []
+    for name, path, params in requests:
+        status, queries = capture(path, params)
+        for sql in queries:
+            if not sql.lstrip().upper().startswith('SELECT') or not _touches(sql):
+                continue
+            plan, scans = explain(sql)
+            results.append({
+                'endpoint': name,
+                'params': params,
+                'status': status,
+                'sql': sql,
+                'plan': plan,
+                'sequential_scans': scans,
+            })
+    return results
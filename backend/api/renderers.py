@@ -0,0 +1,66 @@
+"""
+JSON-рендерер и парсер на orjson.
+
+Вывод совпадает с rest_framework.renderers.JSONRenderer: компактные
+разделители, Decimal как float, даты и время через isoformat с 'Z' для UTC,
+экранирование U+2028/U+2029. Отступы orjson не поддерживает, поэтому
+запросы с indent (например, из Browsable API) рендерятся стандартным json.
+"""
+import datetime
+
+import orjson
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+OPTIONS = (
+    orjson.OPT_PASSTHROUGH_DATETIME
+    | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY
+)
+
+_encoder = JSONEncoder()
+
+
+def _default(obj):
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    if isinstance(obj, (datetime.date, datetime.time)):
+        return obj.isoformat()
+    return _encoder.default(obj)
+
+
+def dumps(data):
+    """Сериализация в байты в формате JSONRenderer"""
+    return (
+        orjson.dumps(data, default=_default, option=OPTIONS)
+        .replace(b'\xe2\x80\xa8', b'\\u2028')
+        .replace(b'\xe2\x80\xa9', b'\\u2029')
+    )
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class ORJSONParser(JSONParser):
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if encoding.lower().replace('-', '') != 'utf8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
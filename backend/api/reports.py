@@ -0,0 +1,449 @@
+"""
+Расчет отчетов для пользователя вне контекста запроса.
+
+Используется синхронными и асинхронными представлениями и пакетным
+предрасчетом (precompute_insights): готовые инсайты сохраняются в Insight
+вместе с версией данных пользователя и отдаются, пока дата и версия совпадают.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import aggregation, forecasting, series, versioning
+from .models import FinancialGoal, Insight
+
+# Наибольшее число точек ряда аналитики для заданного from
+MAX_SERIES_POINTS = 5000
+
+
+def analytics_period(period, today):
+    """Границы периода аналитики: month, week или все время (None, None)"""
+    if period == 'month':
+        return today.replace(day=1), today
+    if period == 'week':
+        return today - timedelta(days=7), today
+    return None, None
+
+
+def analytics_range(params, today, user=None):
+    """
+    (from, to, granularity) из параметров from / to / granularity или None,
+    если ни один не задан. Без from начало берется из period. ValueError при ошибке.
+    Ряд без начала (period=all) идет от первых данных пользователя user:
+    по ним же проверяется MAX_SERIES_POINTS.
+    """
+    if not any(params.get(name) for name in ('from', 'to', 'granularity')):
+        return None
+
+    granularity = params.get('granularity') or 'day'
+    if granularity not in series.GRANULARITIES:
+        raise ValueError(f'granularity must be one of: {", ".join(series.GRANULARITIES)}')
+
+    bounds = []
+    for name in ('from', 'to'):
+        value = params.get(name)
+        try:
+            day = parse_date(value) if value else None
+        except ValueError:
+            day = None
+        if value and day is None:
+            raise ValueError(f'{name} must be a date in YYYY-MM-DD format')
+        bounds.append(day)
+    start_date, end_date = bounds
+
+    end_date = end_date or today
+    start_date = start_date or analytics_period(params.get('period', 'all'), today)[0]
+    if start_date and start_date > end_date:
+        raise ValueError('from must not be after to')
+    first = start_date or (aggregation.first_date(user) if user is not None else None) or end_date
+    if series.count(min(first, end_date), end_date, granularity) > MAX_SERIES_POINTS:
+        raise ValueError(f'Range is too long for granularity={granularity} (max {MAX_SERIES_POINTS} points)')
+    return start_date, end_date, granularity
+
+
+def analytics_queries(user, period='all', today=None, date_range=None):
+    """
+    Независимые запросы аналитики: {имя: (функция, аргументы)}.
+    Выполняются в любом порядке, в том числе одновременно (async_views).
+    """
+    now = today or timezone.localdate()
+    if date_range is None:
+        start_date, end_date = analytics_period(period, now)
+        # По датам (последние 30 дней)
+        by_date = (aggregation.daily_series, (user, now - timedelta(days=29), now))
+    else:
+        start_date, end_date, granularity = date_range
+        # По периодам выбранной гранулярности
+        by_date = (aggregation.period_series, (user, start_date, end_date, granularity))
+
+    return {
+        # Базовые метрики и тренды
+        'totals': (aggregation.summary, (user, start_date, end_date, now)),
+        # По категориям
+        'category_stats': (aggregation.category_totals, (user, start_date, end_date)),
+        'series': by_date,
+    }
+
+
+def analytics_result(now, period, date_range, results):
+    """Ответ аналитики из результатов analytics_queries"""
+    if date_range is None:
+        start_date, _ = analytics_period(period, now)
+        return analytics_payload(
+            now, start_date, results['totals'], results['category_stats'], results['series']
+        )
+
+    start_date, end_date, granularity = date_range
+    points = results['series']
+    start_date = start_date or (points[0]['date'] if points else end_date)
+    payload = analytics_payload(
+        now, start_date, results['totals'], results['category_stats'], points,
+        days=(end_date - start_date).days + 1,
+    )
+    payload['range'] = {
+        'from': start_date.isoformat(),
+        'to': end_date.isoformat(),
+        'granularity': granularity,
+        'rolling_window': series.ROLLING_WINDOWS[granularity],
+    }
+    return payload
+
+
+def build_analytics(user, period='all', today=None, date_range=None):
+    """
+    Глубокая аналитика: итоги, категории, ряд и тренды.
+    Без date_range — период period и дневной ряд за последние 30 дней.
+    """
+    now = today or timezone.localdate()
+    queries = analytics_queries(user, period, now, date_range)
+    results = {name: func(*args) for name, (func, args) in queries.items()}
+    return analytics_result(now, period, date_range, results)
+
+
+def analytics_payload(now, start_date, totals, category_stats, series, days=None):
+    """Ответ аналитики из уже посчитанных агрегатов; days — длина периода для среднего расхода"""
+    expenses = totals['expenses']
+    incomes = totals['incomes']
+    balance = incomes - expenses
+
+    date_stats = [
+        {
+            **day,
+            'date': day['date'].isoformat(),
+            'expenses': float(day['expenses']),
+            'incomes': float(day['incomes'])
+        }
+        for day in series
+    ]
+
+    # Тренды
+    current_month_spending = totals['current_month']
+    prev_month_spending = totals['prev_month']
+
+    trend_percentage = 0
+    if prev_month_spending > 0:
+        trend_percentage = float(((current_month_spending - prev_month_spending) / prev_month_spending) * 100)
+
+    # Средний дневной расход
+    if days is not None:
+        days_count = days
+    else:
+        days_count = max(1, (now - start_date).days) if start_date else 30
+    avg_daily = float(expenses / days_count)
+
+    return {
+        'summary': {
+            'expenses': float(expenses),
+            'incomes': float(incomes),
+            'balance': float(balance),
+            'avg_daily': avg_daily
+        },
+        'categories': category_stats,
+        'date_stats': date_stats,
+        'trends': {
+            'current_month': float(current_month_spending),
+            'prev_month': float(prev_month_spending),
+            'percentage': round(trend_percentage, 2)
+        }
+    }
+
+
+def active_goals(user):
+    return list(FinancialGoal.objects.filter(user=user, status='active'))
+
+
+def goal_category_ids(goals):
+    return {cat_id for goal in goals for cat_id in (goal.category_savings or {})}
+
+
+def build_insights(user, settings, today=None, goals=None, snapshot=None, forecast=None):
+    """
+    Расширенные инсайты: дневной лимит, прогноз, перерасход бюджетов и цели.
+    Активные цели, снимок месяца и прогноз (forecasting.forecast_users) можно передать уже загруженными.
+    """
+    now = today or timezone.localdate()
+    days_in_month = (now.replace(month=now.month % 12 + 1, day=1) - timedelta(days=1)).day
+    current_day = now.day
+    days_remaining = days_in_month - current_day + 1
+
+    # Все данные месяца одним снимком: итоги, траты по категориям и категории целей
+    if goals is None:
+        goals = active_goals(user)
+    if snapshot is None:
+        snapshot = aggregation.load_month_snapshot(user, now, goal_category_ids(goals))
+    spent_by_category = snapshot['categories']
+    spent_by_category_id = snapshot['category_spending']
+    category_names = snapshot.get('category_names')
+    if category_names is None:
+        # Снимок без категорий целей (например, общий снимок dashboard)
+        category_names = aggregation.category_names(user, goal_category_ids(goals))
+
+    # Текущие траты месяца
+    current_spending = snapshot['expenses']
+
+    # Доступно на месяц
+    available = Decimal(str(settings.monthly_income)) - Decimal(str(settings.fixed_expenses))
+    daily_limit = available / days_in_month if days_in_month > 0 else Decimal('0')
+    remaining_for_month = available - current_spending
+    daily_remaining = remaining_for_month / days_remaining if days_remaining > 0 else Decimal('0')
+
+    # Прогноз трат с завтрашнего дня до конца месяца
+    if forecast is None:
+        forecast = forecasting.forecast_user(user.id, now)
+    projected_spending = float(current_spending) + forecast['expected']
+    forecast_balance = float(available) - projected_spending
+
+    # Бюджеты
+    budgets = settings.budgets or {}
+    overspending = []
+    for category, budget_limit in budgets.items():
+        spent = spent_by_category.get(category, Decimal('0'))
+        
+        if budget_limit > 0:
+            percentage = (spent / Decimal(str(budget_limit))) * 100
+            if percentage >= 80:
+                overspending.append({
+                    'category': category,
+                    'spent': float(spent),
+                    'budget': float(budget_limit),
+                    'percentage': float(percentage)
+                })
+
+    # Инсайты по целям
+    goals_insights = []
+    
+    for goal in goals:
+        remaining = goal.target_amount - goal.current_amount
+        
+        # Категории, которые тормозят цель
+        category_savings = goal.category_savings or {}
+        blocking_categories = []
+        
+        # Текущие траты по категориям цели
+        for cat_id, planned_savings in category_savings.items():
+            category_name = category_names.get(str(cat_id))
+            if category_name is None:
+                continue
+            current_spending_cat = spent_by_category_id.get(int(cat_id), Decimal('0'))
+            
+            if current_spending_cat > Decimal(str(planned_savings)):
+                blocking_categories.append({
+                    'category': category_name,
+                    'current_spending': float(current_spending_cat),
+                    'planned_savings': float(planned_savings),
+                    'excess': float(current_spending_cat - Decimal(str(planned_savings)))
+                })
+        
+        # Расчет среднего откладывания
+        current_savings_rate = snapshot['incomes'] - snapshot['expenses']
+        total_planned_savings = sum(Decimal(str(v)) for v in category_savings.values())
+        total_savings_rate = current_savings_rate + total_planned_savings
+        
+        if total_savings_rate > 0:
+            months_needed = remaining / total_savings_rate
+        else:
+            months_needed = None
+        
+        goals_insights.append({
+            'goal_id': goal.id,
+            'goal_title': goal.title,
+            'remaining': float(remaining),
+            'current_savings_rate': float(current_savings_rate),
+            'total_savings_rate': float(total_savings_rate),
+            'months_needed': float(months_needed) if months_needed else None,
+            'is_reachable': total_savings_rate > 0,
+            'blocking_categories': blocking_categories
+        })
+
+    return {
+        'daily_limit': {
+            'limit': float(daily_limit),
+            'remaining': float(daily_remaining),
+            'days_remaining': days_remaining
+        },
+        'forecast': {
+            'balance': forecast_balance,
+            'projected_spending': projected_spending,
+            'current_spending': float(current_spending),
+            'method': forecasting.METHOD,
+            'confidence': forecasting.CONFIDENCE,
+            'projected_spending_lower': float(current_spending) + forecast['lower'],
+            'projected_spending_upper': float(current_spending) + forecast['upper'],
+            'balance_lower': float(available) - float(current_spending) - forecast['upper'],
+            'balance_upper': float(available) - float(current_spending) - forecast['lower'],
+            'categories': [
+                {
+                    'category': item['category'],
+                    'spent': item['spent'],
+                    'projected': item['spent'] + item['expected'],
+                    'lower': item['spent'] + item['lower'],
+                    'upper': item['spent'] + item['upper'],
+                }
+                for item in forecast['categories']
+            ]
+        },
+        'overspending': overspending,
+        'goals_insights': goals_insights
+    }
+
+
+def goal_calculations(goal, totals, today=None):
+    """
+    Расчеты для цели: среднее время достижения, рекомендуемое откладывание.
+    totals — доходы и расходы с начала месяца (aggregation.month_totals или снимок месяца).
+    """
+    # Среднее откладывание в месяц (из разницы доходов и расходов)
+    current_savings_rate = totals['incomes'] - totals['expenses']
+    return _goal_projection(goal, current_savings_rate, today or timezone.localdate())
+
+
+def goals_calculations(goals, totals, today=None):
+    """Расчеты для списка целей с одной скоростью накопления: {id цели: расчеты}"""
+    now = today or timezone.localdate()
+    current_savings_rate = totals['incomes'] - totals['expenses']
+    return {str(goal.pk): _goal_projection(goal, current_savings_rate, now) for goal in goals}
+
+
+def _goal_projection(goal, current_savings_rate, now):
+    """Прогноз и рекомендации для цели при заданной скорости накопления"""
+    # Если есть категории с экономией
+    category_savings = goal.category_savings or {}
+    additional_savings = Decimal('0')
+    if category_savings:
+        # Суммируем планируемую экономию по категориям
+        for cat_id, amount in category_savings.items():
+            additional_savings += Decimal(str(amount))
+
+    total_savings_rate = current_savings_rate + additional_savings
+
+    # Осталось накопить
+    remaining = goal.target_amount - goal.current_amount
+
+    # Прогноз даты достижения
+    if total_savings_rate > 0:
+        months_needed = remaining / total_savings_rate
+        projected_date = now + timedelta(days=int(months_needed * 30))
+    else:
+        months_needed = None
+        projected_date = None
+
+    # Сравнение с дедлайном
+    deadline_status = None
+    if goal.deadline:
+        if projected_date and projected_date > goal.deadline:
+            deadline_status = 'late'
+        elif projected_date and projected_date <= goal.deadline:
+            deadline_status = 'on_time'
+        else:
+            deadline_status = 'unreachable'
+
+    # Рекомендуемое откладывание в день/месяц
+    if goal.deadline and total_savings_rate > 0:
+        days_until_deadline = (goal.deadline - now).days
+        if days_until_deadline > 0:
+            recommended_daily = remaining / days_until_deadline
+            recommended_monthly = recommended_daily * 30
+        else:
+            recommended_daily = None
+            recommended_monthly = None
+    else:
+        recommended_daily = None
+        recommended_monthly = None
+
+    return {
+        'current_savings_rate': float(current_savings_rate),
+        'total_savings_rate': float(total_savings_rate),
+        'remaining': float(remaining),
+        'months_needed': float(months_needed) if months_needed else None,
+        'projected_date': projected_date.isoformat() if projected_date else None,
+        'deadline_status': deadline_status,
+        'recommended_daily': float(recommended_daily) if recommended_daily else None,
+        'recommended_monthly': float(recommended_monthly) if recommended_monthly else None,
+        'is_reachable': total_savings_rate > 0
+    }
+
+
+def store_insights(user_id, payload, version, today=None):
+    """
+    Сохраняет рассчитанные инсайты за день. Если на primary уже лежат
+    инсайты этой или более новой версии (например, реплика еще не получила
+    строку Insight), ничего не пишет.
+    """
+    today = today or timezone.localdate()
+    stored = Insight.objects.using(DEFAULT_DB_ALIAS).filter(
+        user_id=user_id, date=today, data_version__gte=version
+    )
+    if stored.exists():
+        return
+    Insight.objects.update_or_create(
+        user_id=user_id, date=today,
+        defaults={
+            'daily_limit': Decimal(str(payload['daily_limit']['limit'])),
+            'forecast_balance': Decimal(str(payload['forecast']['balance'])),
+            'monthly_spending': Decimal(str(payload['forecast']['current_spending'])),
+            'comparison_data': payload,
+            'data_version': version,
+        }
+    )
+
+
+def refresh_insights(user, settings, today=None, goals=None, snapshot=None, version=None):
+    """Пересчитывает и сохраняет инсайты пользователя; version — уже прочитанная версия данных"""
+    today = today or timezone.localdate()
+    # Версию читаем до расчета: запись во время расчета сделает результат устаревшим
+    if version is None:
+        version = versioning.current(user.id)
+    payload = build_insights(user, settings, today, goals=goals, snapshot=snapshot)
+    store_insights(user.id, payload, version, today)
+    return payload
+
+
+def stored_insights(user, today=None, version=None):
+    """Сохраненные инсайты за сегодня, если данные с тех пор не менялись"""
+    today = today or timezone.localdate()
+    if version is None:
+        version = versioning.current(user.id)
+    return (
+        Insight.objects
+        .filter(user=user, date=today, data_version=version)
+        .values_list('comparison_data', flat=True)
+        .first()
+    )
+
+
+def current_insights(user, settings, today=None, version=None, goals=None, snapshot=None):
+    """
+    Сохраненные инсайты за сегодня, если данные с тех пор не менялись, иначе пересчет.
+    Версия данных читается один раз и используется и для проверки, и для записи;
+    goals и snapshot — уже загруженные данные для пересчета (см. build_insights).
+    """
+    today = today or timezone.localdate()
+    if version is None:
+        version = versioning.current(user.id)
+    stored = stored_insights(user, today, version)
+    if stored is not None:
+        return stored
+    return refresh_insights(user, settings, today, goals=goals, snapshot=snapshot, version=version)
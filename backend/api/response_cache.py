@@ -0,0 +1,162 @@
+"""
+Кэш ответов аналитики и инсайтов поверх Django cache framework.
+
+Ключ ответа включает версию данных пользователя — DataVersion на primary,
+которая увеличивается в той же транзакции, что и запись в Transaction,
+UserSettings, FinancialGoal или Category. Версия хранится в БД, а не в кэше,
+поэтому после коммита записи любой процесс (и с locmem, где у каждого
+процесса свой кэш) строит уже новый ключ: устаревший ответ не отдается,
+старые ключи просто перестают читаться и вытесняются по TTL. Условный GET
+уже прочитал версию для ETag, и ключ строится по ней без второго запроса.
+"""
+import contextvars
+import functools
+import hashlib
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+from rest_framework.response import Response
+
+from . import versioning
+
+_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_stats_lock = threading.Lock()
+
+# Версия данных, прочитанная условным GET: (user_id, version)
+_known_version = contextvars.ContextVar('api_known_version', default=None)
+
+# Пользователи, удаляемые в этом потоке: их данные удаляются каскадом,
+# и версию (как и фоновые задачи) для них создавать уже нельзя
+_deleting = threading.local()
+
+
+def deleting_users():
+    if not hasattr(_deleting, 'user_ids'):
+        _deleting.user_ids = set()
+    return _deleting.user_ids
+
+
+@contextmanager
+def at_version(user_id, version):
+    """Ключи кэша внутри блока (и в пуле потоков async_views) строятся по уже прочитанной версии"""
+    token = _known_version.set((str(user_id), version))
+    try:
+        yield
+    finally:
+        _known_version.reset(token)
+
+
+# Бэкенды, у которых в каждом процессе свой кэш
+PROCESS_LOCAL_BACKENDS = frozenset([
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+])
+
+
+def is_shared():
+    """Кэш общий для процессов (file, redis, memcached): его можно прогревать из runworker"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def get_user_version(user_id):
+    """Текущая версия данных пользователя на primary"""
+    known = _known_version.get()
+    if known is not None and known[0] == str(user_id):
+        return known[1]
+    return versioning.current(user_id, using=DEFAULT_DB_ALIAS)
+
+
+def bump_user_versions(user_ids):
+    """
+    Увеличивает долговременную версию данных в текущей транзакции (после
+    коммита она меняет ключи кэша); при BACKGROUND_JOBS ставит фоновый
+    пересчет (api.tasks).
+    """
+    user_ids = {user_id for user_id in user_ids if user_id is not None} - deleting_users()
+    if not user_ids:
+        return
+
+    versioning.bump(user_ids)
+    if settings.BACKGROUND_JOBS:
+        from . import tasks
+
+        tasks.schedule_user_refresh(user_ids)
+
+
+def _record(prefix, hit):
+    with _stats_lock:
+        _stats[prefix]['hits' if hit else 'misses'] += 1
+
+
+def stats():
+    """Счетчики попаданий и промахов по каждому виду ответа"""
+    with _stats_lock:
+        return {prefix: dict(counters) for prefix, counters in _stats.items()}
+
+
+def response_key(prefix, user_id, params=None):
+    params = sorted((params or {}).items())
+    digest = hashlib.md5(repr(params).encode()).hexdigest()
+    today = timezone.localdate().isoformat()
+    return f'api:{prefix}:{user_id}:{get_user_version(user_id)}:{today}:{digest}'
+
+
+def lookup(prefix, user_id, params):
+    """(ключ, данные из кэша или None) с учетом попаданий и промахов"""
+    key = response_key(prefix, user_id, params)
+    data = cache.get(key)
+    _record(prefix, data is not None)
+    return key, data
+
+
+def store(key, data):
+    cache.set(key, data, timeout=settings.RESPONSE_CACHE_TTL)
+
+
+def get_or_compute(prefix, user_id, params, compute):
+    """
+    Отдает ответ из кэша или вызывает compute(), который должен вернуть Response.
+    В кэш попадают только данные успешных ответов.
+    """
+    key, data = lookup(prefix, user_id, params)
+    if data is not None:
+        return cached_response(data)
+    return remember(key, compute())
+
+
+async def aget_or_compute(prefix, user_id, params, compute, run):
+    """get_or_compute() для асинхронного compute(); обращения к кэшу выполняет run(func, *args)"""
+    key, data = await run(lookup, prefix, user_id, params)
+    if data is not None:
+        return cached_response(data)
+    return await run(remember, key, await compute())
+
+
+def cached_response(data):
+    return Response(data, headers={'X-Cache': 'HIT'})
+
+
+def remember(key, response):
+    """Сохраняет данные успешного ответа под ключом key"""
+    if response.status_code == 200:
+        store(key, response.data)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_user_view(prefix):
+    """Кэширует ответ функции-представления с аргументом user_id"""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, user_id, *args, **kwargs):
+            return get_or_compute(
+                prefix, user_id, request.query_params.dict(),
+                lambda: view(request, user_id, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,104 @@
+"""
+Инкрементальное обновление дневных итогов (DailyRollup).
+
+Каждая транзакция вносит в строку (user, date, type, category) свою сумму
+и единицу в счетчик. При изменении старое значение вычитается, новое
+прибавляется, при удалении — вычитается. Ссылка на категорию (category_ref)
+берется из последних добавленных транзакций строки.
+"""
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Sum, Count, Max
+
+from . import budgets, counters
+from .models import DailyRollup, Transaction
+
+TRACKED_FIELDS = frozenset([
+    'user', 'user_id', 'date', 'type', 'category', 'category_ref', 'category_ref_id', 'amount',
+])
+
+ROW_FIELDS = ('user_id', 'date', 'type', 'category', 'category_ref_id', 'amount')
+
+KEY_FIELDS = ('user_id', 'date', 'type', 'category')
+
+# Транзакции, которые удаляет TransactionQuerySet.delete в этом потоке:
+# итоги и версию кэша для них обновляет сам delete, одним apply
+_bulk_deleting = threading.local()
+
+
+def bulk_deleting():
+    if not hasattr(_bulk_deleting, 'pks'):
+        _bulk_deleting.pks = set()
+    return _bulk_deleting.pks
+
+
+def rows_from_instances(objs):
+    # До сохранения date может быть строкой ISO или datetime (по умолчанию timezone.now);
+    # в итоги идет та же локальная дата, что запишется в БД
+    to_date = Transaction._meta.get_field('date').to_python
+    for obj in objs:
+        yield obj.user_id, to_date(obj.date), obj.type, obj.category, obj.category_ref_id, obj.amount
+
+
+def rows_from_queryset(queryset):
+    return queryset.order_by().values_list(*ROW_FIELDS).iterator()
+
+
+def _merge(deltas, refs, rows, sign):
+    for user_id, date, type, category, category_ref_id, amount in rows:
+        key = (user_id, date, type, category or '')
+        delta = deltas[key]
+        delta[0] += sign * Decimal(str(amount))
+        delta[1] += sign
+        if sign > 0:
+            refs[key] = category_ref_id
+
+
+def apply(added=(), removed=()):
+    """Добавляет в итоги строки added и вычитает строки removed"""
+    deltas = defaultdict(lambda: [Decimal('0'), 0])
+    refs = {}
+    _merge(deltas, refs, removed, -1)
+    _merge(deltas, refs, added, 1)
+    # Строки итогов меняются пачками, а не запросами на каждый ключ
+    counters.apply(
+        DailyRollup, KEY_FIELDS, deltas,
+        assign={key: {'category_ref_id': ref} for key, ref in refs.items()},
+    )
+
+    budgets.apply({
+        (user_id, date, category): delta
+        for (user_id, date, type, category), delta in deltas.items()
+        if type == 'expense'
+    })
+
+
+def compute(user=None):
+    """Итоги, посчитанные заново по таблице транзакций"""
+    queryset = Transaction.objects.order_by()
+    if user is not None:
+        queryset = queryset.filter(user=user)
+    return (
+        queryset
+        .values('user_id', 'date', 'type', 'category')
+        .annotate(total=Sum('amount'), count=Count('id'), ref=Max('category_ref'))
+        .order_by('user_id', 'date', 'type', 'category')
+    )
+
+
+def rebuild(user, batch_size=1000):
+    """Пересобирает дневные и месячные итоги пользователя с нуля"""
+    with transaction.atomic():
+        DailyRollup.objects.filter(user=user).delete()
+        batch = []
+        for row in compute(user).iterator():
+            row['category_ref_id'] = row.pop('ref')
+            batch.append(DailyRollup(**row))
+            if len(batch) >= batch_size:
+                DailyRollup.objects.bulk_create(batch)
+                batch = []
+        DailyRollup.objects.bulk_create(batch)
+        budgets.rebuild(user)
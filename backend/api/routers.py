@@ -0,0 +1,70 @@
+"""
+Чтение тяжелых GET-запросов с реплики (REPLICA_DATABASE_URL).
+
+Представления с replica=True (аналитика, инсайты, расчеты по целям, списки)
+выполняются внутри reading_from(alias): ReplicaRouter направляет их чтения
+на реплику, все записи и остальные чтения — на default. Реплика выбирается,
+только если ее версия данных пользователя (DataVersion) совпадает с версией
+на primary, которую условный GET все равно читает для ETag: сразу после
+записи пользователя и пока реплика ее не догнала, чтения идут на primary.
+"""
+import contextvars
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+
+from .models import DataVersion
+
+REPLICA = 'replica'
+
+_read_alias = contextvars.ContextVar('api_read_alias', default=None)
+
+
+def replica_configured():
+    return settings.REPLICA_READS and REPLICA in settings.DATABASES
+
+
+def read_alias(user_id, version):
+    """
+    Alias для чтений запроса: REPLICA, если она догнала версию данных
+    пользователя на primary, иначе None (default).
+    """
+    if not replica_configured():
+        return None
+    try:
+        replica_version = (
+            DataVersion.objects.using(REPLICA).filter(user_id=user_id)
+            .values_list('version', flat=True)
+            .first()
+        ) or 0
+    except DatabaseError:
+        # Недоступная реплика не должна ломать чтение
+        return None
+    return REPLICA if replica_version == version else None
+
+
+@contextmanager
+def reading_from(alias):
+    """Чтения внутри блока (и в пуле потоков async_views) идут в alias"""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплика содержит те же данные, что и primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема реплики приходит с репликацией (локально — copy_replica)
+        return db != REPLICA
@@ -17,10 +17,33 @@ class UserSettingsSerializer(serializers.ModelSerializer):
 
 
 class TransactionSerializer(serializers.ModelSerializer):
+    # Категорию можно задать по имени (category) или по id (category_id)
+    category_id = serializers.PrimaryKeyRelatedField(
+        source='category_ref', queryset=Category.objects.all(), required=False, allow_null=True
+    )
+
     class Meta:
         model = Transaction
-        fields = '__all__'
-        read_only_fields = ['id', 'user', 'created_at']
+        fields = [
+            'id', 'type', 'amount', 'category', 'category_id', 'description',
+            'date', 'created_at', 'updated_at', 'user',
+        ]
+        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+
+    def validate(self, attrs):
+        category = attrs.get('category_ref')
+        if category is not None:
+            if self.instance is not None:
+                user_id = self.instance.user_id
+            elif 'user_id' in self.context:
+                # Пользователь из токена или пакетного запроса передается во view через context
+                user_id = self.context['user_id']
+            else:
+                user_id = getattr(self, 'initial_data', {}).get('user_id')
+            if user_id is not None and str(category.user_id) != str(user_id):
+                raise serializers.ValidationError({'category_id': 'Category belongs to another user'})
+            attrs['category'] = category.name
+        return attrs
 
 
 class CategorySerializer(serializers.ModelSerializer):
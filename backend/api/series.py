@@ -0,0 +1,115 @@
+"""
+Временные ряды аналитики на NumPy.
+
+Суммы по периодам группируются в БД (aggregation.period_rows), здесь ряд
+дополняется пустыми периодами и считаются скользящие средние и изменение
+к предыдущему периоду — операциями над массивами, без циклов по датам.
+Периоды начинаются с понедельника (week), первого числа (month)
+и 1 января (year), как TruncWeek / TruncMonth / TruncYear.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+GRANULARITIES = ('day', 'week', 'month', 'year')
+
+# Окно скользящего среднего, периодов
+ROLLING_WINDOWS = {'day': 7, 'week': 4, 'month': 3, 'year': 2}
+
+_CALENDAR_UNITS = {'month': 'M', 'year': 'Y'}
+
+
+def period_start(day, granularity):
+    """Начало периода, в который попадает дата"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def count(start, end, granularity):
+    """Число периодов от start до end включительно"""
+    first, last = period_start(start, granularity), period_start(end, granularity)
+    if granularity == 'year':
+        return last.year - first.year + 1
+    if granularity == 'month':
+        return (last.year - first.year) * 12 + last.month - first.month + 1
+    step = 7 if granularity == 'week' else 1
+    return (last - first).days // step + 1
+
+
+def periods(start, end, granularity):
+    """Начала периодов от start до end включительно: массив datetime64[D]"""
+    first = np.datetime64(period_start(start, granularity), 'D')
+    last = np.datetime64(period_start(end, granularity), 'D')
+    if granularity in _CALENDAR_UNITS:
+        unit = f'datetime64[{_CALENDAR_UNITS[granularity]}]'
+        return np.arange(first.astype(unit), last.astype(unit) + 1).astype('datetime64[D]')
+    step = np.timedelta64(7 if granularity == 'week' else 1, 'D')
+    return np.arange(first, last + 1, step)
+
+
+def fill(rows, buckets):
+    """
+    Расходы и доходы по периодам buckets из строк [(начало периода, расходы, доходы)];
+    периоды без строк заполняются нулями.
+    """
+    expenses = np.zeros(len(buckets))
+    incomes = np.zeros(len(buckets))
+    if rows:
+        dates, row_expenses, row_incomes = zip(*rows)
+        index = np.searchsorted(buckets, np.array(dates, dtype='datetime64[D]'))
+        expenses[index] = np.array(row_expenses, dtype=float)
+        incomes[index] = np.array(row_incomes, dtype=float)
+    return expenses, incomes
+
+
+def rolling_mean(values, window):
+    """Среднее за последние window периодов; в начале ряда — за доступные"""
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    upper = np.arange(1, len(values) + 1)
+    lower = np.maximum(upper - window, 0)
+    return (cumulative[upper] - cumulative[lower]) / (upper - lower)
+
+
+def percent_change(values):
+    """Изменение к предыдущему периоду, %; None для первого периода и после нуля"""
+    change = np.full(len(values), np.nan)
+    if len(values) > 1:
+        previous = values[:-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change[1:] = np.where(previous > 0, (values[1:] - previous) / previous * 100, np.nan)
+    change = np.round(change, 2)
+    return np.where(np.isnan(change), None, change).tolist()
+
+
+def daily(rows, start, end):
+    """Дневной ряд без пропусков: [{'date', 'expenses', 'incomes'}]"""
+    buckets = periods(start, end, 'day')
+    expenses, incomes = fill(rows, buckets)
+    return [
+        {'date': day, 'expenses': spent, 'incomes': earned}
+        for day, spent, earned in zip(buckets.tolist(), expenses.tolist(), incomes.tolist())
+    ]
+
+
+def build(rows, start, end, granularity):
+    """Точки ряда по периодам: суммы, баланс, скользящие средние и изменение к предыдущему периоду"""
+    buckets = periods(start, end, granularity)
+    expenses, incomes = fill(rows, buckets)
+    window = ROLLING_WINDOWS[granularity]
+
+    columns = {
+        'date': buckets.tolist(),
+        'expenses': expenses.tolist(),
+        'incomes': incomes.tolist(),
+        'balance': (incomes - expenses).tolist(),
+        'expenses_avg': rolling_mean(expenses, window).tolist(),
+        'incomes_avg': rolling_mean(incomes, window).tolist(),
+        'expenses_change': percent_change(expenses),
+        'incomes_change': percent_change(incomes),
+    }
+    return [dict(zip(columns, values)) for values in zip(*columns.values())]
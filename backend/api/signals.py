@@ -0,0 +1,110 @@
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from . import authentication, budgets, categories, rollups, response_cache
+from .models import Transaction, UserSettings, FinancialGoal, Category, User
+
+
+@receiver(pre_save, sender=Transaction)
+def link_transaction_category(sender, instance, raw=False, **kwargs):
+    """Ссылка на категорию следует за именем категории"""
+    if not raw:
+        categories.link([instance])
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_name(sender, instance, **kwargs):
+    instance._previous_name = None
+    if instance.pk and not instance._state.adding:
+        instance._previous_name = (
+            Category.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Category)
+def relink_category_transactions(sender, instance, created, raw=False, **kwargs):
+    """
+    Переименование переносится на связанные транзакции, а транзакции
+    с новым именем без категории привязываются к ней. Итоги обновляются
+    через TransactionQuerySet.update.
+    """
+    if raw or (not created and instance._previous_name == instance.name):
+        return
+    Transaction.objects.filter(category_ref=instance).exclude(category=instance.name).update(
+        category=instance.name
+    )
+    Transaction.objects.filter(
+        user_id=instance.user_id, category=instance.name, category_ref__isnull=True
+    ).update(category_ref=instance)
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_transaction_state(sender, instance, **kwargs):
+    """Запоминаем старые значения, чтобы при обновлении вычесть их из итогов"""
+    instance._rollup_previous = None
+    if instance.pk and not instance._state.adding:
+        instance._rollup_previous = list(
+            rollups.rows_from_queryset(Transaction.objects.filter(pk=instance.pk))
+        )
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    rollups.apply(
+        added=rollups.rows_from_instances([instance]),
+        removed=getattr(instance, '_rollup_previous', None) or (),
+    )
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    # При удалении пользователя его итоги удаляются каскадом, вычитать нечего;
+    # при массовом удалении итоги вычитает TransactionQuerySet.delete
+    if instance.user_id in response_cache.deleting_users() or instance.pk in rollups.bulk_deleting():
+        return
+    rollups.apply(removed=rollups.rows_from_instances([instance]))
+
+
+@receiver(post_save, sender=UserSettings)
+def sync_budget_levels(sender, instance, raw=False, **kwargs):
+    """После изменения бюджетов пороги текущего месяца пересчитываются без уведомлений"""
+    if not raw:
+        budgets.sync_levels(instance.user_id, instance.budgets)
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+@receiver(post_save, sender=UserSettings)
+@receiver(post_delete, sender=UserSettings)
+@receiver(post_save, sender=FinancialGoal)
+@receiver(post_delete, sender=FinancialGoal)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_user_version(sender, instance, raw=False, **kwargs):
+    """Любая запись в данные пользователя инвалидирует его кэш"""
+    if sender is Transaction and instance.pk in rollups.bulk_deleting():
+        return
+    if not raw:
+        response_cache.bump_user_versions([instance.user_id])
+
+
+@receiver(pre_delete, sender=User)
+def remember_deleting_user(sender, instance, **kwargs):
+    """Записи каскадного удаления данных пользователя не поднимают его версию"""
+    response_cache.deleting_users().add(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def forget_deleting_user(sender, instance, **kwargs):
+    response_cache.deleting_users().discard(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_principal(sender, instance, **kwargs):
+    """Кэш пользователей токенов перечитывает пользователя после коммита"""
+    user_id = instance.pk
+    transaction.on_commit(lambda: authentication.principals.invalidate(user_id))
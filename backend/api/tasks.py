@@ -0,0 +1,67 @@
+"""
+Фоновые задачи, выполняемые manage.py runworker.
+
+При BACKGROUND_JOBS=True каждая запись в данные пользователя ставит одну
+задачу refresh_user (с задержкой JOBS_DEBOUNCE, так что серия записей
+сливается в одну задачу). Задача проверяет пороги бюджетов и отправляет
+уведомления, которые без очереди выполняются в транзакции записи,
+пересчитывает инсайты и, если кэш общий для процессов, прогревает
+аналитику: следующий GET берет готовый результат, а не считает его
+в запросе. С locmem прогрев заполнил бы только кэш процесса runworker.
+Дневные и месячные итоги по-прежнему ведутся в транзакции записи —
+аналитика и статус бюджетов читают их сразу; rebuild_rollups — полная
+пересборка вне запроса.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import budgets, jobs, reports, response_cache, rollups
+from .models import User, UserSettings
+
+# Периоды аналитики, которые запрашивает клиент (getAnalytics)
+WARM_PERIODS = ('all', 'month')
+
+
+@jobs.task('refresh_insights')
+def refresh_insights(user_id):
+    """Пересчитывает сохраненные инсайты за сегодня, если они устарели"""
+    user_settings = UserSettings.objects.select_related('user').filter(user_id=user_id).first()
+    if user_settings is None:
+        return
+    reports.current_insights(user_settings.user, user_settings, timezone.localdate())
+
+
+@jobs.task('warm_cache')
+def warm_cache(user_id):
+    """Кладет в кэш ответы analytics для WARM_PERIODS по текущей версии данных"""
+    user = User.objects.filter(pk=user_id).first()
+    if user is None:
+        return
+    for period in WARM_PERIODS:
+        key = response_cache.response_key('analytics', user_id, {'period': period})
+        if cache.get(key) is None:
+            response_cache.store(key, reports.build_analytics(user, period))
+
+
+@jobs.task('rebuild_rollups')
+def rebuild_rollups(user_id):
+    """Пересобирает дневные итоги и месячные итоги по категориям"""
+    user = User.objects.filter(pk=user_id).first()
+    if user is not None:
+        rollups.rebuild(user)
+
+
+@jobs.task('refresh_user')
+def refresh_user(user_id):
+    """Работа после записи в данные пользователя, вынесенная из запроса"""
+    budgets.check_user(user_id)
+    refresh_insights(user_id)
+    if response_cache.is_shared():
+        warm_cache(user_id)
+
+
+def schedule_user_refresh(user_ids):
+    """Ставит refresh_user после записи в данные пользователей (в текущей транзакции)"""
+    for user_id in sorted(user_ids):
+        jobs.enqueue('refresh_user', user_id=user_id, delay=settings.JOBS_DEBOUNCE)
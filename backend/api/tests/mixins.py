@@ -0,0 +1,27 @@
+from django.core.cache import cache
+
+from api import budgets
+
+
+class CacheResetMixin:
+    """
+    Очищает кэш ответов перед каждым тестом: ключ кэша строится по id
+    и версии данных пользователя, а они повторяются в тестах после отката.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+class BudgetSignalMixin:
+    """Собирает в self.reached пары (категория, порог) из сигнала budget_threshold_reached"""
+
+    def setUp(self):
+        super().setUp()
+        self.reached = []
+        budgets.budget_threshold_reached.connect(self.record)
+        self.addCleanup(budgets.budget_threshold_reached.disconnect, self.record)
+
+    def record(self, sender, threshold, category, **kwargs):
+        self.reached.append((category, threshold))
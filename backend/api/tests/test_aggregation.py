@@ -0,0 +1,73 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import Transaction, User
+from api.tests.mixins import CacheResetMixin
+
+
+class AnalyticsAggregationTests(CacheResetMixin, TestCase):
+    """Итоги, категории, дневной ряд и тренды совпадают с суммами по самим транзакциям"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='aggregation@example.com', password_hash='')
+        cls.today = timezone.localdate()
+        cls.prev_month_day = cls.today.replace(day=1) - timedelta(days=1)
+        cls.rows = [
+            ('expense', '10.00', 'Food', cls.today),
+            ('expense', '20.00', 'Transport', cls.today - timedelta(days=5)),
+            ('expense', '30.00', 'Food', cls.prev_month_day),
+            ('income', '100.00', '', cls.today),
+        ]
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, type=type, amount=Decimal(amount), category=category, date=day)
+            for type, amount, category, day in cls.rows
+        ])
+
+    def analytics(self):
+        response = self.client.get(f'/api/analytics/{self.user.id}/', {'period': 'all'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def spent(self, start, end=None):
+        return float(sum(
+            Decimal(amount) for type, amount, category, day in self.rows
+            if type == 'expense' and start <= day <= (end or self.today)
+        ))
+
+    def test_payload(self):
+        data = self.analytics()
+        self.assertEqual(data['summary']['expenses'], 60.0)
+        self.assertEqual(data['summary']['incomes'], 100.0)
+        self.assertEqual(data['summary']['balance'], 40.0)
+        self.assertEqual(
+            [(row['category'], float(row['total']), row['count']) for row in data['categories']],
+            [('Food', 40.0, 2), ('Transport', 20.0, 1)],
+        )
+
+        # Ряд за 30 дней без пропусков, по дню на точку
+        days = [row['date'] for row in data['date_stats']]
+        self.assertEqual(days, [(self.today - timedelta(days=29 - index)).isoformat() for index in range(30)])
+        last = data['date_stats'][-1]
+        self.assertEqual((last['expenses'], last['incomes']), (10.0, 100.0))
+        self.assertEqual(sum(row['expenses'] for row in data['date_stats']), self.spent(self.today - timedelta(days=29)))
+
+        start_of_month = self.today.replace(day=1)
+        self.assertEqual(data['trends']['current_month'], self.spent(start_of_month))
+        self.assertEqual(data['trends']['prev_month'], self.spent(self.prev_month_day.replace(day=1), self.prev_month_day))
+
+    def test_queries_do_not_grow_with_transactions(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.analytics()
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, type='expense', amount=Decimal('1.00'), category=f'Category {index % 7}',
+                        date=self.today - timedelta(days=index % 40))
+            for index in range(200)
+        ])
+        with self.assertNumQueries(len(queries)):
+            self.assertEqual(self.analytics()['summary']['expenses'], 260.0)
@@ -0,0 +1,37 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api import reports
+from api.models import Transaction, User
+from api.tests.mixins import CacheResetMixin
+
+
+class AnalyticsRangeTests(CacheResetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='analytics@example.com', password_hash='')
+        today = timezone.localdate()
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, type='expense', amount=Decimal('10.00'), date=day)
+            for day in (today - timedelta(days=20 * 365), today)
+        ])
+
+    def test_implicit_start_is_limited(self):
+        response = self.client.get(f'/api/analytics/{self.user.id}/', {'granularity': 'day'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(reports.MAX_SERIES_POINTS), response.json()['error'])
+
+    def test_implicit_start_within_limit(self):
+        response = self.client.get(f'/api/analytics/{self.user.id}/', {'granularity': 'month'})
+        self.assertEqual(response.status_code, 200)
+        self.assertGreaterEqual(len(response.json()['date_stats']), 20 * 12)
+
+    def test_explicit_start_is_limited(self):
+        start = timezone.localdate() - timedelta(days=reports.MAX_SERIES_POINTS + 1)
+        response = self.client.get(
+            f'/api/analytics/{self.user.id}/', {'granularity': 'day', 'from': start.isoformat()}
+        )
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,87 @@
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, RequestFactory, TransactionTestCase
+
+from api import async_views, benchmark, views
+from api.models import Insight
+
+ANALYTICS_PARAMS = [
+    {},
+    {'period': 'month'},
+    {'granularity': 'week'},
+    {'from': '2026-01-15', 'to': '2026-09-30', 'granularity': 'month'},
+    {'period': 'month', 'granularity': 'year'},
+    {'from': '2026-13-01'},
+]
+
+
+class AsyncViewParityTests(TransactionTestCase):
+    """Асинхронные analytics и insights отвечают так же, как синхронные"""
+
+    def setUp(self):
+        # Агрегаты выполняются в потоках пула со своими соединениями, поэтому
+        # данные должны быть закоммичены: TransactionTestCase, а не TestCase
+        self.user_id = benchmark.seed(users=1, transactions=200, seed=3)[0]
+        cache.clear()
+
+    def sync_get(self, view, user_id, params):
+        response = view(RequestFactory().get('/', params), user_id=user_id)
+        response.render()
+        return response
+
+    def async_get(self, view, user_id, params):
+        return async_to_sync(view)(AsyncRequestFactory().get('/', params), user_id=user_id)
+
+    def assertSameResponse(self, sync_response, async_response):
+        self.assertEqual(async_response.status_code, sync_response.status_code)
+        self.assertEqual(async_response.content, sync_response.content)
+        for header in ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control'):
+            self.assertEqual(async_response.get(header), sync_response.get(header), header)
+
+    def test_analytics(self):
+        for params in ANALYTICS_PARAMS:
+            with self.subTest(params=params):
+                cache.clear()
+                expected = self.sync_get(views.analytics, self.user_id, params)
+                cache.clear()
+                self.assertSameResponse(expected, self.async_get(async_views.analytics, self.user_id, params))
+
+    def test_insights(self):
+        expected = self.sync_get(views.insights, self.user_id, {})
+        # Обе версии считают инсайты заново, а не читают сохраненные
+        Insight.objects.all().delete()
+        cache.clear()
+        self.assertSameResponse(expected, self.async_get(async_views.insights, self.user_id, {}))
+
+    def test_unknown_user(self):
+        for sync_view, async_view in ((views.analytics, async_views.analytics), (views.insights, async_views.insights)):
+            with self.subTest(view=sync_view.__name__):
+                self.assertSameResponse(
+                    self.sync_get(sync_view, self.user_id + 1000, {}),
+                    self.async_get(async_view, self.user_id + 1000, {}),
+                )
+
+    def test_invalid_token(self):
+        headers = {'Authorization': 'Bearer not-a-token'}
+        for sync_view, async_view in ((views.analytics, async_views.analytics), (views.insights, async_views.insights)):
+            with self.subTest(view=sync_view.__name__):
+                sync_response = sync_view(RequestFactory().get('/', headers=headers), user_id=self.user_id)
+                sync_response.render()
+                async_response = async_to_sync(async_view)(
+                    AsyncRequestFactory().get('/', headers=headers), user_id=self.user_id
+                )
+                self.assertEqual(async_response.status_code, 401)
+                self.assertSameResponse(sync_response, async_response)
+                self.assertEqual(async_response['WWW-Authenticate'], 'Bearer')
+
+    def test_cached_and_not_modified(self):
+        first = self.async_get(async_views.analytics, self.user_id, {})
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(self.async_get(async_views.analytics, self.user_id, {})['X-Cache'], 'HIT')
+        request = AsyncRequestFactory().get('/', headers={'If-None-Match': first['ETag']})
+        self.assertEqual(async_to_sync(async_views.analytics)(request, user_id=self.user_id).status_code, 304)
+
+    def test_other_methods(self):
+        response = async_to_sync(async_views.insights)(AsyncRequestFactory().post('/'), user_id=self.user_id)
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'GET, HEAD')
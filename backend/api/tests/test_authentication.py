@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+
+from django.contrib.auth.hashers import check_password, identify_hasher
+from django.test import TestCase
+from django.utils import timezone
+
+from api import authentication
+from api.models import Transaction, User
+
+
+class AuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='auth@example.com', password_hash='')
+        authentication.set_password(cls.user, 'secret')
+        cls.other = User.objects.create(email='other@example.com', password_hash='')
+
+    def setUp(self):
+        # Кэш Principal живет в памяти процесса и переживает откат транзакции теста
+        authentication.principals.clear()
+
+    def login(self, email='auth@example.com', password='secret'):
+        return self.client.post('/api/users/login/', {'email': email, 'password': password},
+                                content_type='application/json')
+
+    def create(self, token, **data):
+        return self.client.post('/api/transactions/', dict({
+            'type': 'expense', 'amount': '5.00', 'category': 'Food', 'date': str(timezone.localdate()),
+        }, **data), content_type='application/json', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_register_issues_token(self):
+        response = self.client.post('/api/users/register/', {'email': 'new@example.com', 'password': 'pw'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(email='new@example.com')
+        self.assertTrue(check_password('pw', user.password_hash))
+        self.assertEqual(authentication.verify_token(response.json()['token']).id, user.id)
+
+    def test_login(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['id'], self.user.id)
+        self.assertEqual(authentication.verify_token(response.json()['token']).id, self.user.id)
+        for email, password in (('auth@example.com', 'wrong'), ('missing@example.com', 'secret'), ('', '')):
+            with self.subTest(email=email, password=password):
+                self.assertEqual(self.login(email, password).status_code, 401)
+
+    def test_plaintext_password_is_rehashed(self):
+        User.objects.filter(pk=self.other.pk).update(password_hash='legacy')
+        self.assertEqual(self.login('other@example.com', 'wrong').status_code, 401)
+        self.assertEqual(User.objects.get(pk=self.other.pk).password_hash, 'legacy')
+
+        self.assertEqual(self.login('other@example.com', 'legacy').status_code, 200)
+        encoded = User.objects.get(pk=self.other.pk).password_hash
+        identify_hasher(encoded)
+        self.assertTrue(check_password('legacy', encoded))
+        self.assertEqual(self.login('other@example.com', 'legacy').status_code, 200)
+
+    def test_token_writes_as_its_user(self):
+        token = self.login().json()['token']
+        response = self.create(token)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Transaction.objects.get(pk=response.json()['id']).user_id, self.user.id)
+        self.assertEqual(self.create(token, user_id=self.user.id).status_code, 201)
+
+    def test_foreign_user_id_is_forbidden(self):
+        token = self.login().json()['token']
+        response = self.create(token, user_id=self.other.id)
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Transaction.objects.filter(user=self.other).exists())
+
+    def test_invalid_token(self):
+        token = self.login().json()['token']
+        for header in (f'Bearer {token}x', 'Bearer', f'Bearer {token} extra'):
+            with self.subTest(header=header):
+                response = self.client.post('/api/transactions/', {
+                    'type': 'expense', 'amount': '5.00', 'date': str(timezone.localdate()),
+                }, content_type='application/json', HTTP_AUTHORIZATION=header)
+                self.assertEqual(response.status_code, 401)
+
+    def test_password_change_revokes_tokens(self):
+        token = self.login().json()['token']
+        self.assertEqual(self.create(token).status_code, 201)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            authentication.set_password(User.objects.get(pk=self.user.pk), 'changed')
+        self.assertEqual(self.create(token).status_code, 401)
+        self.assertEqual(self.login().status_code, 401)
+        self.assertEqual(self.create(self.login(password='changed').json()['token']).status_code, 201)
+
+    def test_shared_cache_invalidation_reaches_other_processes(self):
+        directory = tempfile.mkdtemp(prefix='finance-api-cache-')
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        file_cache = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory,
+        }}
+        # Два экземпляра кэша — как в двух процессах
+        this_process, other_process = authentication.PrincipalCache(), authentication.PrincipalCache()
+        with self.settings(CACHES=file_cache):
+            stamp = other_process.get(self.user.id).password_stamp
+            with self.assertNumQueries(0):
+                self.assertEqual(other_process.get(self.user.id).password_stamp, stamp)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                authentication.set_password(User.objects.get(pk=self.user.pk), 'changed')
+            self.assertNotEqual(other_process.get(self.user.id).password_stamp, stamp)
+
+            User.objects.filter(pk=self.other.pk).delete()
+            this_process.invalidate(self.other.id)
+            self.assertIsNone(other_process.get(self.other.id))
@@ -0,0 +1,117 @@
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api import views
+from api.models import Category, DailyRollup, Transaction, User
+
+
+class TransactionBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='batch@example.com', password_hash='')
+        Category.objects.bulk_create([Category(user=cls.user, name=name) for name in ('Food', 'Transport')])
+        cls.today = timezone.localdate()
+        cls.url = f'/api/transactions/?user_id={cls.user.id}'
+        cls.batch_url = f'/api/transactions/batch/?user_id={cls.user.id}'
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(url, json.dumps(data), content_type='application/json')
+
+    def item(self, **overrides):
+        return dict({'type': 'expense', 'amount': '10.00', 'category': 'Food', 'date': str(self.today)}, **overrides)
+
+    def add(self, user=None):
+        return Transaction.objects.create(
+            user=user or self.user, type='expense', amount=Decimal('10.00'), category='Food', date=self.today
+        )
+
+    def totals(self):
+        return dict(
+            DailyRollup.objects.filter(user=self.user, date=self.today).values_list('category', 'total')
+        )
+
+    def test_create_many(self):
+        response = self.send('post', self.url, [self.item(), self.item(category='Transport')])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(self.totals(), {'Food': Decimal('10.00'), 'Transport': Decimal('10.00')})
+        self.assertEqual(Transaction.objects.filter(user=self.user, category_ref__isnull=False).count(), 2)
+
+    def test_create_many_without_date(self):
+        item = self.item()
+        del item['date']
+        response = self.send('post', self.url, [item])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()[0]['date'], str(self.today))
+        self.assertEqual(self.totals(), {'Food': Decimal('10.00')})
+
+    def test_create_many_is_atomic(self):
+        response = self.send('post', self.url, [self.item(), self.item(amount='x'), self.item()])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['errors']
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(errors[0], {})
+        self.assertIn('amount', errors[1])
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+        self.assertEqual(self.totals(), {})
+
+    def test_batch_limit(self):
+        response = self.send('post', self.url, [self.item()] * (views.BATCH_LIMIT + 1))
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+    def test_update_many(self):
+        objs = [self.add() for _ in range(3)]
+        response = self.send('patch', self.batch_url, [
+            {'id': obj.id, 'amount': '20.00', 'category': 'Transport'} for obj in objs
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({row['amount'] for row in response.json()}, {'20.00'})
+        self.assertEqual(self.totals(), {'Transport': Decimal('60.00')})
+
+    def test_update_many_keeps_past_date(self):
+        past = self.today - timedelta(days=40)
+        obj = Transaction.objects.create(
+            user=self.user, type='expense', amount=Decimal('10.00'), category='Food', date=past
+        )
+        response = self.send('patch', self.batch_url, [{'id': obj.id, 'amount': '7.00'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['date'], str(past))
+        self.assertEqual(
+            dict(DailyRollup.objects.filter(user=self.user).values_list('date', 'total')), {past: Decimal('7.00')}
+        )
+
+    def test_update_many_is_atomic(self):
+        obj = self.add()
+        response = self.send('patch', self.batch_url, [
+            {'id': obj.id, 'amount': '20.00'}, {'id': obj.id + 1000, 'amount': '1.00'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'][1], {'id': ['Transaction not found']})
+        obj.refresh_from_db()
+        self.assertEqual(obj.amount, Decimal('10.00'))
+        self.assertEqual(self.totals(), {'Food': Decimal('10.00')})
+
+    def test_delete_many(self):
+        objs = [self.add() for _ in range(3)]
+        response = self.send('delete', self.batch_url, {'ids': [obj.id for obj in objs[:2]]})
+        self.assertEqual(response.json(), {'deleted': 2})
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(self.totals(), {'Food': Decimal('10.00')})
+
+    def test_delete_many_is_atomic(self):
+        obj = self.add()
+        response = self.send('delete', self.batch_url, {'ids': [obj.id, obj.id + 1000]})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Transaction.objects.filter(pk=obj.pk).exists())
+
+    def test_other_users_transactions_are_not_found(self):
+        other = User.objects.create(email='other@example.com', password_hash='')
+        obj = self.add(other)
+        response = self.send('delete', self.batch_url, {'ids': [obj.id]})
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Transaction.objects.filter(pk=obj.pk).exists())
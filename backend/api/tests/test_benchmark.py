@@ -0,0 +1,64 @@
+from django.test import TestCase
+
+import api.urls
+from api import benchmark
+from api.management.commands.rebuild_rollups import Command as RebuildRollups
+from api.models import DailyRollup, Transaction, User
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_id = benchmark.seed(users=1, transactions=50, seed=0)[0]
+        cls.endpoints = {
+            (name, method): kwargs for name, method, kwargs in benchmark.discover_endpoints(api.urls)
+        }
+
+    def test_seed_maintains_rollups(self):
+        self.assertEqual(RebuildRollups().verify(User.objects.get(pk=self.user_id)), [])
+
+    def test_seed_links_categories(self):
+        # У доходов ('Зарплата') нет категории пользователя
+        transactions = Transaction.objects.filter(user_id=self.user_id, type='expense')
+        self.assertFalse(transactions.filter(category_ref__isnull=True).exists())
+        self.assertEqual(
+            set(transactions.values_list('category', 'category_ref__name').distinct()),
+            set(transactions.values_list('category', 'category').distinct()),
+        )
+        self.assertFalse(
+            DailyRollup.objects.filter(user_id=self.user_id, type='expense', category_ref__isnull=True).exists()
+        )
+
+    def measure(self, name, method='get'):
+        kwargs = self.endpoints[name, method]
+        return benchmark.measure(name, method, kwargs, self.user_id, iterations=1)
+
+    def test_streaming_export_queries_are_counted(self):
+        result = self.measure('transaction-export')
+        self.assertEqual(result['status'], [200])
+        self.assertGreaterEqual(result['queries'], 1)
+
+    def test_transaction_batch_is_measured(self):
+        result = self.measure('transaction-batch', 'patch')
+        self.assertIsNotNone(result)
+        self.assertEqual((result['method'], result['status']), ('PATCH', [200]))
+
+    def test_every_allowed_method_is_discovered(self):
+        methods = {name: set() for name, _ in self.endpoints}
+        for name, method in self.endpoints:
+            methods[name].add(method)
+        self.assertEqual(methods['transaction-list'], {'get', 'post'})
+        self.assertEqual(methods['transaction-detail'], {'get', 'put', 'patch', 'delete'})
+        self.assertEqual(methods['transaction-batch'], {'patch', 'delete'})
+        self.assertEqual(methods['analytics'], {'get'})
+
+    def test_transaction_writes_are_measured(self):
+        count = Transaction.objects.filter(user_id=self.user_id).count()
+        for name, method, status in (
+            ('transaction-list', 'post', 201), ('transaction-detail', 'patch', 200),
+            ('transaction-detail', 'delete', 204), ('transaction-batch', 'delete', 200),
+        ):
+            with self.subTest(name=name, method=method):
+                self.assertEqual(self.measure(name, method)['status'], [status])
+        # Удаляются только созданные для замера транзакции
+        self.assertEqual(Transaction.objects.filter(user_id=self.user_id).count(), count + 1)
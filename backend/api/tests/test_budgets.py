@@ -0,0 +1,78 @@
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api import budgets
+from api.models import MonthlyCategoryTotal, Transaction, User, UserSettings
+from api.tests.mixins import BudgetSignalMixin
+
+
+class BudgetThresholdTests(BudgetSignalMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='budgets@example.com', password_hash='')
+        UserSettings.objects.create(user=cls.user, budgets={'Food': 100})
+
+    def spend(self, amount, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Transaction.objects.create(
+                user=self.user, type='expense', amount=Decimal(amount), category='Food', **kwargs
+            )
+
+    def monthly(self):
+        return list(
+            MonthlyCategoryTotal.objects.filter(user=self.user).values_list('month', 'total', 'alert_level')
+        )
+
+    def test_each_threshold_is_reported_once(self):
+        for amount in ('50.00', '35.00', '1.00', '20.00', '5.00'):
+            self.spend(amount)
+        self.assertEqual(self.reached, [('Food', 80), ('Food', 100)])
+        self.assertEqual(self.monthly(), [(budgets.month_start(timezone.localdate()), Decimal('111.00'), 100)])
+
+    def test_threshold_is_reported_again_after_dropping_below(self):
+        obj = self.spend('90.00')
+        with self.captureOnCommitCallbacks(execute=True):
+            obj.delete()
+        self.assertEqual(self.monthly(), [])
+        self.spend('85.00')
+        self.assertEqual(self.reached, [('Food', 80), ('Food', 80)])
+
+    def test_status(self):
+        self.spend('85.00')
+        response = self.client.get(f'/api/budgets/{self.user.id}/status/')
+        self.assertEqual(response.json()['budgets'], [{
+            'category': 'Food', 'budget': 100.0, 'spent': 85.0, 'remaining': 15.0,
+            'percentage': 85.0, 'status': 'warning',
+        }])
+
+    def test_iso_string_date(self):
+        self.spend('90.00', date=timezone.localdate().isoformat())
+        self.assertEqual(self.reached, [('Food', 80)])
+
+    def test_default_date(self):
+        self.spend('90.00')
+        self.assertEqual(self.reached, [('Food', 80)])
+
+    def test_late_utc_write_uses_local_month(self):
+        # 31 октября 21:00 UTC — уже 1 ноября в TIME_ZONE (UTC+5)
+        now = datetime(2026, 10, 31, 21, 0, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            self.spend('90.00', date=now)
+        self.assertEqual(self.monthly(), [(date(2026, 11, 1), Decimal('90.00'), 80)])
+        self.assertEqual(self.reached, [('Food', 80)])
+
+    def test_status_matches_dashboard_at_month_boundary(self):
+        # В UTC еще 31 октября, в TIME_ZONE уже 1 ноября: бюджеты, дашборд и инсайты берут один месяц
+        now = datetime(2026, 10, 31, 21, 0, tzinfo=dt_timezone.utc)
+        with mock.patch('django.utils.timezone.now', return_value=now):
+            self.spend('90.00', date=now)
+            status = self.client.get(f'/api/budgets/{self.user.id}/status/').json()
+            board = self.client.get(f'/api/dashboard/{self.user.id}/', {'fields': 'budgets,insights'}).json()
+        self.assertEqual(status['month'], '2026-11-01')
+        self.assertEqual(board['budgets'], status)
+        self.assertEqual(status['budgets'][0]['spent'], 90.0)
+        self.assertEqual(board['insights']['forecast']['current_spending'], 90.0)
@@ -0,0 +1,100 @@
+import importlib
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection, models
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import Category, DailyRollup, Transaction, User
+
+backfill = importlib.import_module('api.migrations.0007_backfill_category_ref')
+
+
+class CategoryLinkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='categories@example.com', password_hash='')
+        cls.food = Category.objects.create(user=cls.user, name='Food')
+
+    def add(self, category='Food', **kwargs):
+        return Transaction.objects.create(
+            user=self.user, type='expense', amount=Decimal('10.00'), category=category, **kwargs
+        )
+
+    def test_linked_by_name(self):
+        self.assertEqual(self.add().category_ref, self.food)
+        self.assertIsNone(self.add('Unknown').category_ref)
+
+    def test_create_by_category_id(self):
+        response = self.client.post('/api/transactions/', {
+            'user_id': self.user.id, 'type': 'expense', 'amount': '5.00', 'category_id': self.food.id,
+            'date': str(timezone.localdate()),
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['category'], response.json()['category_id']), ('Food', self.food.id))
+
+    def test_other_users_category_is_rejected(self):
+        other = User.objects.create(email='other@example.com', password_hash='')
+        response = self.client.post('/api/transactions/', {
+            'user_id': other.id, 'type': 'expense', 'amount': '5.00', 'category_id': self.food.id,
+            'date': str(timezone.localdate()),
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('category_id', response.json())
+
+    def test_rename_moves_transactions_and_rollups(self):
+        obj = self.add()
+        self.food.name = 'Groceries'
+        self.food.save()
+        obj.refresh_from_db()
+        self.assertEqual((obj.category, obj.category_ref_id), ('Groceries', self.food.id))
+        self.assertEqual(
+            list(DailyRollup.objects.filter(user=self.user).values_list('category', 'category_ref', 'total')),
+            [('Groceries', self.food.id, Decimal('10.00'))],
+        )
+
+    def test_new_category_links_existing_transactions(self):
+        obj = self.add('Transport')
+        transport = Category.objects.create(user=self.user, name='Transport')
+        obj.refresh_from_db()
+        self.assertEqual(obj.category_ref, transport)
+
+    def test_delete_category_keeps_name(self):
+        obj = self.add()
+        self.food.delete()
+        obj.refresh_from_db()
+        self.assertEqual((obj.category, obj.category_ref), ('Food', None))
+
+
+class CategoryBackfillTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='backfill@example.com', password_hash='')
+        cls.other = User.objects.create(email='other@example.com', password_hash='')
+        cls.food = Category.objects.create(user=cls.user, name='Food')
+        Category.objects.create(user=cls.other, name='Food')
+        Transaction.objects.bulk_create([
+            Transaction(user=user, type='expense', amount=Decimal('1.00'), category=category,
+                        date=timezone.localdate())
+            for user in (cls.user, cls.other) for category in ('Food', 'Food', 'Unknown', '')
+        ])
+        # Состояние до миграции: ссылки не заполнены (QuerySet без пересчета итогов)
+        for model in (Transaction, DailyRollup):
+            models.QuerySet(model).update(category_ref=None)
+
+    def test_backfill(self):
+        # Исторические модели, как при migrate: без TransactionQuerySet и сигналов
+        state = MigrationLoader(connection).project_state(('api', '0007_backfill_category_ref'))
+        with mock.patch.object(backfill, 'BATCH_SIZE', 3):
+            backfill.backfill_category_ref(state.apps, None)
+
+        for model in (Transaction, DailyRollup):
+            rows = model.objects.values_list('user_id', 'category', 'category_ref__user_id', 'category_ref__name')
+            for user_id, category, ref_user_id, ref_name in rows:
+                if category == 'Food':
+                    self.assertEqual((ref_user_id, ref_name), (user_id, 'Food'), model.__name__)
+                else:
+                    self.assertIsNone(ref_name, model.__name__)
+        self.assertEqual(Transaction.objects.filter(category_ref=self.food).count(), 2)
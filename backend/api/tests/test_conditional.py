@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import Transaction, User
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='etag@example.com', password_hash='')
+        cls.url = f'/api/transactions/?user_id={cls.user.id}'
+
+    def add(self):
+        return Transaction.objects.create(user=self.user, type='expense', amount=Decimal('10.00'))
+
+    def test_not_modified_without_running_view(self):
+        self.add()
+        etag = self.client.get(self.url)['ETag']
+        # Только чтение DataVersion
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        self.add()
+        last_modified = self.client.get(self.url)['Last-Modified']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_create_and_delete_change_etag(self):
+        obj = self.add()
+        etag = self.client.get(self.url)['ETag']
+        self.add()
+        created = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(created.status_code, 200)
+        self.assertNotEqual(created['ETag'], etag)
+
+        obj.delete()
+        deleted = self.client.get(self.url, HTTP_IF_NONE_MATCH=created['ETag'])
+        self.assertEqual(deleted.status_code, 200)
+        self.assertNotIn(obj.id, [row['id'] for row in deleted.json()['results']])
+
+    def test_daily_etag_includes_date(self):
+        response = self.client.get(f'/api/analytics/{self.user.id}/')
+        self.assertIn(timezone.localdate().isoformat(), response['ETag'])
+        self.assertNotIn(timezone.localdate().isoformat(), self.client.get(self.url)['ETag'])
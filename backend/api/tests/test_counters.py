@@ -0,0 +1,74 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.db.models import F, QuerySet
+from django.test import TestCase
+
+from api import counters
+from api.models import DataVersion, MonthlyCategoryTotal, User
+
+KEY_FIELDS = ('user_id', 'month', 'category')
+
+
+class CounterTests(TestCase):
+    """Общий для итогов и версии данных UPDATE-или-INSERT и пакетное применение дельт"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='counters@example.com', password_hash='')
+        cls.month = date(2026, 10, 1)
+
+    def bump(self):
+        counters.increment(
+            DataVersion, {'user_id': self.user.id}, {'version': F('version') + 1}, create={'version': 1}
+        )
+
+    def totals(self):
+        return sorted(
+            MonthlyCategoryTotal.objects.filter(user=self.user).values_list('category', 'total', 'count', 'alert_level')
+        )
+
+    def test_increment_creates_then_updates(self):
+        self.bump()
+        self.bump()
+        self.assertEqual(DataVersion.objects.get(user=self.user).version, 2)
+
+    def test_increment_retries_update_after_concurrent_create(self):
+        # Параллельная запись создала строку между UPDATE и INSERT: первый UPDATE
+        # ее не видит, INSERT падает на уникальности
+        DataVersion.objects.create(user=self.user, version=5)
+        update = QuerySet.update
+        missed = []
+
+        def update_after_miss(queryset, **kwargs):
+            if not missed:
+                missed.append(True)
+                return 0
+            return update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, 'update', update_after_miss):
+            self.bump()
+        self.assertEqual(DataVersion.objects.get(user=self.user).version, 6)
+
+    def test_apply_adds_subtracts_and_deletes_empty_rows(self):
+        counters.apply(MonthlyCategoryTotal, KEY_FIELDS, {
+            (self.user.id, self.month, 'Food'): (Decimal('30.00'), 3),
+            (self.user.id, self.month, 'Transport'): (Decimal('5.00'), 1),
+        })
+        self.assertEqual(self.totals(), [('Food', Decimal('30.00'), 3, 0), ('Transport', Decimal('5.00'), 1, 0)])
+
+        counters.apply(MonthlyCategoryTotal, KEY_FIELDS, {
+            (self.user.id, self.month, 'Food'): (Decimal('-10.00'), -1),
+            (self.user.id, self.month, 'Transport'): (Decimal('-5.00'), -1),
+        })
+        self.assertEqual(self.totals(), [('Food', Decimal('20.00'), 2, 0)])
+
+    def test_apply_without_upsert_support(self):
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            for _ in range(2):
+                counters.apply(MonthlyCategoryTotal, KEY_FIELDS, {
+                    (self.user.id, self.month, 'Food'): (Decimal('7.00'), 1),
+                })
+        self.assertEqual(self.totals(), [('Food', Decimal('14.00'), 2, 0)])
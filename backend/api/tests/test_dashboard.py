@@ -0,0 +1,68 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.dashboard import SECTIONS
+from api.models import Category, FinancialGoal, Transaction, User, UserSettings
+from api.tests.mixins import CacheResetMixin
+
+
+class DashboardTests(CacheResetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='dashboard@example.com', password_hash='')
+        UserSettings.objects.create(
+            user=cls.user, monthly_income=Decimal('80000'), fixed_expenses=Decimal('20000'),
+            onboarding_completed=True, budgets={'Food': 10000, 'Transport': 500},
+        )
+        Category.objects.bulk_create([Category(user=cls.user, name=name) for name in ('Food', 'Transport')])
+        today = timezone.localdate()
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, type='expense', amount=Decimal(100 + index), date=today - timedelta(days=index),
+                        category='Food' if index % 3 else 'Transport')
+            for index in range(12)
+        ] + [Transaction(user=cls.user, type='income', amount=Decimal('80000.00'), date=today)])
+        FinancialGoal.objects.create(
+            user=cls.user, title='Машина', target_amount=Decimal('500000'), deadline=today + timedelta(days=365),
+        )
+
+    def get(self, url, **params):
+        response = self.client.get(url, dict(params, user_id=self.user.id))
+        self.assertEqual(response.status_code, 200, url)
+        return response.json()
+
+    def standalone(self, section):
+        user_id = self.user.id
+        if section == 'settings':
+            return self.get('/api/settings/')['results'][0]
+        if section == 'transactions':
+            return self.get('/api/transactions/', pagination='cursor', page_size=5)['results']
+        if section in ('categories', 'goals'):
+            return self.get(f'/api/{section}/')['results']
+        if section == 'goal_calculations':
+            return self.get('/api/goals/calculations/')
+        if section == 'analytics':
+            return self.get(f'/api/analytics/{user_id}/', period='all')
+        if section == 'insights':
+            return self.get(f'/api/insights/{user_id}/')
+        if section == 'budgets':
+            return self.get(f'/api/budgets/{user_id}/status/')
+        self.fail(f'No standalone endpoint for {section}')
+
+    def test_sections_match_standalone_endpoints(self):
+        board = self.get(f'/api/dashboard/{self.user.id}/', page_size=5)
+        self.assertEqual(list(board), list(SECTIONS))
+        # Первая страница транзакций со ссылкой на продолжение курсорного списка
+        self.assertIn('pagination=cursor', board['transactions']['next'])
+        board['transactions'] = board['transactions']['results']
+        for section in SECTIONS:
+            with self.subTest(section=section):
+                self.assertEqual(board[section], self.standalone(section))
+
+    def test_fields(self):
+        board = self.get(f'/api/dashboard/{self.user.id}/', fields='budgets,settings')
+        self.assertEqual(list(board), ['budgets', 'settings'])
+        response = self.client.get(f'/api/dashboard/{self.user.id}/', {'fields': 'settings,unknown'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+
+from api import exporters
+from api.exporters import EXPORT_FIELDS
+from api.models import Transaction, User
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='export@example.com', password_hash='')
+        other = User.objects.create(email='other@example.com', password_hash='')
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, type='income', amount=Decimal('1000.00'), category='Salary',
+                        date=date(2024, 1, 5)),
+            Transaction(user=cls.user, type='expense', amount=Decimal('12.30'), category='Food',
+                        description='Кофе, "латте"', date=date(2024, 2, 10)),
+            Transaction(user=cls.user, type='expense', amount=Decimal('7.00'), category='Transport',
+                        date=date(2024, 3, 1)),
+            Transaction(user=other, type='expense', amount=Decimal('1.00'), date=date(2024, 2, 10)),
+        ])
+
+    def get(self, **params):
+        return self.client.get('/api/transactions/export/', dict(params, user_id=self.user.id))
+
+    def export(self, **params):
+        response = self.get(**params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response, body = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn(f'transactions-{self.user.id}.csv', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(body)))
+        self.assertEqual(rows[0], list(EXPORT_FIELDS))
+        self.assertEqual([row[1:6] for row in rows[1:]], [
+            ['income', '1000.00', 'Salary', '', '2024-01-05'],
+            ['expense', '12.30', 'Food', 'Кофе, "латте"', '2024-02-10'],
+            ['expense', '7.00', 'Transport', '', '2024-03-01'],
+        ])
+
+    def test_ndjson_matches_csv(self):
+        _, body = self.export(output='ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        # id в NDJSON — число, остальные поля — те же строки, что в CSV
+        for row in rows:
+            row['id'] = str(row['id'])
+        _, csv_body = self.export()
+        self.assertEqual(rows, list(csv.DictReader(io.StringIO(csv_body))))
+
+    def test_filters(self):
+        _, body = self.export(output='ndjson', **{'from': '2024-02-01', 'to': '2024-03-01', 'type': 'expense'})
+        self.assertEqual([json.loads(line)['category'] for line in body.splitlines()], ['Food', 'Transport'])
+        _, body = self.export(output='ndjson', **{'to': '2024-01-31'})
+        self.assertEqual([json.loads(line)['category'] for line in body.splitlines()], ['Salary'])
+
+    def test_invalid_params(self):
+        for params in ({'output': 'xml'}, {'from': '05.01.2024'}, {'type': 'transfer'}):
+            response = self.get(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.json())
+        self.assertEqual(self.client.get('/api/transactions/export/').status_code, 400)
+
+    async def test_asgi_streams_asynchronously(self):
+        wsgi_body = await sync_to_async(lambda: self.export(output='ndjson')[1])()
+        response = await self.async_client.get(
+            '/api/transactions/export/', {'user_id': self.user.id, 'output': 'ndjson'}
+        )
+        # Синхронный итератор Django под ASGI прочитал бы целиком до первой отправки
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(b''.join(chunks).decode(), wsgi_body)
+
+    async def test_aiterate_batches(self):
+        parts = [part async for part in exporters.aiterate(iter('abcde'), batch_size=2)]
+        self.assertEqual(parts, ['ab', 'cd', 'e'])
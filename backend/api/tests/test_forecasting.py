@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from api import forecasting
+from api.models import Transaction, User, UserSettings
+
+# Суббота; до конца месяца 14 дней прогноза
+TODAY = date(2026, 10, 17)
+
+
+def spend(user, amount, day, category='Food'):
+    return Transaction(user=user, type='expense', amount=Decimal(amount), category=category, date=day)
+
+
+class ForecastTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.steady = User.objects.create(email='steady@example.com', password_hash='')
+        cls.weekly = User.objects.create(email='weekly@example.com', password_hash='')
+        cls.idle = User.objects.create(email='idle@example.com', password_hash='')
+        history = [TODAY - timedelta(days=offset) for offset in range(1, forecasting.HISTORY_DAYS + 1)]
+        Transaction.objects.bulk_create(
+            [spend(cls.steady, '10.00', day) for day in history]
+            + [spend(cls.steady, '5.00', TODAY)]
+            # По понедельникам: ресторан, в остальные дни понемногу на транспорт
+            + [spend(cls.weekly, '70.00', day, 'Cafe') for day in history if day.weekday() == 0]
+            + [spend(cls.weekly, str(day.day % 4 + 1), day, 'Transport') for day in history if day.weekday() != 0]
+        )
+
+    def test_steady_spending(self):
+        forecast = forecasting.forecast_user(self.steady.id, TODAY)
+        self.assertEqual(forecast['days'], 14)
+        self.assertAlmostEqual(forecast['expected'], 140.0)
+        # Без разброса полоса схлопывается
+        self.assertAlmostEqual(forecast['lower'], forecast['expected'])
+        self.assertAlmostEqual(forecast['upper'], forecast['expected'])
+        [category] = forecast['categories']
+        self.assertEqual(category['category'], 'Food')
+        # С 1 октября: 16 полных дней по 10 и сегодняшние 5
+        self.assertAlmostEqual(category['spent'], 165.0)
+
+    def test_bounds_and_order(self):
+        forecast = forecasting.forecast_user(self.weekly.id, TODAY)
+        self.assertEqual(set(forecast), {'expected', 'lower', 'upper', 'days', 'categories'})
+        self.assertLessEqual(0, forecast['lower'])
+        self.assertLess(forecast['lower'], forecast['expected'])
+        self.assertLess(forecast['expected'], forecast['upper'])
+        categories = forecast['categories']
+        expected = [item['expected'] for item in categories]
+        self.assertEqual(expected, sorted(expected, reverse=True))
+        for item in categories:
+            self.assertLessEqual(0, item['lower'])
+            self.assertLessEqual(item['lower'], item['expected'])
+            self.assertLessEqual(item['expected'], item['upper'])
+        self.assertAlmostEqual(sum(expected), forecast['expected'])
+        # Траты раз в неделю дают разброс больше прогноза: нижняя граница упирается в 0
+        cafe = next(item for item in categories if item['category'] == 'Cafe')
+        self.assertEqual(cafe['lower'], 0.0)
+        self.assertGreater(cafe['upper'], cafe['expected'])
+
+    def test_no_history(self):
+        self.assertEqual(
+            forecasting.forecast_user(self.idle.id, TODAY),
+            {'expected': 0.0, 'lower': 0.0, 'upper': 0.0, 'days': 14, 'categories': []},
+        )
+
+    def test_batches_match_single_user(self):
+        user_ids = [self.steady.id, self.weekly.id, self.idle.id]
+        single = {user_id: forecasting.forecast_user(user_id, TODAY) for user_id in user_ids}
+        self.assertEqual(forecasting.forecast_users(user_ids, TODAY), single)
+        with mock.patch.object(forecasting, 'BATCH_SIZE', 1):
+            self.assertEqual(forecasting.forecast_users(user_ids, TODAY), single)
+
+    def test_insights_forecast(self):
+        cache.clear()
+        UserSettings.objects.create(user=self.weekly, monthly_income=Decimal('5000'), fixed_expenses=Decimal('1000'))
+        forecast = self.client.get(f'/api/insights/{self.weekly.id}/').json()['forecast']
+        self.assertEqual((forecast['method'], forecast['confidence']), (forecasting.METHOD, forecasting.CONFIDENCE))
+        self.assertLessEqual(forecast['projected_spending_lower'], forecast['projected_spending'])
+        self.assertLessEqual(forecast['projected_spending'], forecast['projected_spending_upper'])
+        self.assertLessEqual(forecast['balance_lower'], forecast['balance'])
+        self.assertLessEqual(forecast['balance'], forecast['balance_upper'])
+        self.assertAlmostEqual(
+            forecast['balance_upper'] - forecast['balance_lower'],
+            forecast['projected_spending_upper'] - forecast['projected_spending_lower'],
+        )
+        for item in forecast['categories']:
+            self.assertLessEqual(item['spent'], item['lower'])
+            self.assertLessEqual(item['lower'], item['projected'])
+            self.assertLessEqual(item['projected'], item['upper'])
@@ -0,0 +1,48 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import FinancialGoal, Transaction, User, UserSettings
+from api.tests.mixins import CacheResetMixin
+
+
+class GoalCalculationsTests(CacheResetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='goals@example.com', password_hash='')
+        UserSettings.objects.create(user=cls.user, monthly_income=Decimal('100000'), fixed_expenses=Decimal('30000'))
+        today = timezone.localdate()
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, type='income', amount=Decimal('90000.00'), date=today),
+            Transaction(user=cls.user, type='expense', amount=Decimal('25000.00'), category='Food', date=today),
+        ])
+        cls.goals = [
+            FinancialGoal.objects.create(
+                user=cls.user, title='Отпуск', target_amount=Decimal('150000'), current_amount=Decimal('20000'),
+                deadline=today + timedelta(days=120), category_savings={'Food': 5000},
+            ),
+            FinancialGoal.objects.create(user=cls.user, title='Подушка', target_amount=Decimal('300000')),
+        ]
+
+    def test_matches_per_goal_endpoint(self):
+        response = self.client.get('/api/goals/calculations/', {'user_id': self.user.id})
+        self.assertEqual(response.status_code, 200)
+        expected = {
+            str(goal.id): self.client.get(f'/api/goals/{goal.id}/calculations/', {'user_id': self.user.id}).json()
+            for goal in self.goals
+        }
+        self.assertEqual(response.json(), expected)
+
+    def test_user_without_goals(self):
+        other = User.objects.create(email='nogoals@example.com', password_hash='')
+        response = self.client.get('/api/goals/calculations/', {'user_id': other.id})
+        self.assertEqual((response.status_code, response.json()), (200, {}))
+
+    def test_unknown_user(self):
+        response = self.client.get('/api/goals/calculations/', {'user_id': self.user.id + 1000})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            self.client.get('/api/goals/calculations/', {'user_id': 'x'}).status_code, 400
+        )
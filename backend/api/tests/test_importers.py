@@ -0,0 +1,66 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+
+from api.models import DailyRollup, Transaction, User
+
+HEADER = b'type,amount,category,description,date\n'
+
+
+class ImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='import@example.com', password_hash='')
+
+    def upload(self, content, name='transactions.csv'):
+        response = self.client.post('/api/transactions/import/', {
+            'user_id': self.user.id,
+            'file': SimpleUploadedFile(name, content),
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_csv(self):
+        report = self.upload(
+            '﻿'.encode() + HEADER + 'expense,10.50,Еда,,2026-10-01\nincome,100,,,2026-10-02\n'.encode()
+        )
+        self.assertEqual((report['created'], report['failed']), (2, 0))
+        self.assertEqual(
+            sorted(DailyRollup.objects.filter(user=self.user).values_list('type', 'total')),
+            [('expense', 10.5), ('income', 100)],
+        )
+
+    def test_invalid_rows_are_reported(self):
+        report = self.upload(HEADER + b'expense,abc,,,2026-10-01\nexpense,5,,,2026-10-01\nrefund,5,,,2026-10-01\n')
+        self.assertEqual((report['created'], report['failed']), (1, 2))
+        self.assertEqual([error['row'] for error in report['errors']], [1, 3])
+        self.assertIn('amount', report['errors'][0]['errors'])
+
+    def test_not_utf8(self):
+        report = self.upload('type,amount\nexpense,5\n'.encode('utf-16'))
+        self.assertEqual(report['created'], 0)
+        self.assertEqual(report['failed'], 2)
+        self.assertIn('Invalid UTF-8', report['errors'][0]['errors']['non_field_errors'][0])
+
+    def test_undecodable_line_does_not_stop_import(self):
+        report = self.upload(HEADER + b'expense,1,\xff\xfe,,2026-10-01\nexpense,2,,,2026-10-01\n')
+        self.assertEqual((report['created'], report['failed']), (1, 1))
+        self.assertEqual(list(Transaction.objects.filter(user=self.user).values_list('amount', flat=True)), [2])
+
+    def test_malformed_csv(self):
+        report = self.upload(HEADER + b'expense,1,' + b'x' * (200 * 1024) + b',,2026-10-01\nexpense,2,,,2026-10-01\n')
+        self.assertEqual((report['created'], report['failed']), (1, 1))
+        self.assertIn('Invalid CSV', report['errors'][0]['errors']['non_field_errors'][0])
+
+    def test_ndjson(self):
+        report = self.upload(
+            b'{"type": "expense", "amount": "3", "date": "2026-10-01"}\n'
+            b'not json\n'
+            b'[1]\n'
+            b'\xff{"type": "expense"}\n',
+            name='transactions.ndjson',
+        )
+        self.assertEqual((report['created'], report['failed']), (1, 3))
+        messages = [error['errors']['non_field_errors'][0] for error in report['errors']]
+        self.assertTrue(messages[0].startswith('Invalid JSON'))
+        self.assertEqual(messages[1], 'Expected a JSON object')
+        self.assertTrue(messages[2].startswith('Invalid UTF-8'))
@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api import reports, versioning
+from api.models import Category, FinancialGoal, Insight, Transaction, User, UserSettings
+from api.tests.mixins import CacheResetMixin
+
+
+class InsightsQueryCountTests(CacheResetMixin, TestCase):
+    """Число запросов insights не зависит от числа целей, бюджетов и категорий"""
+
+    def make_user(self, name, goals, budgets):
+        user = User.objects.create(email=f'{name}@example.com', password_hash='')
+        categories = Category.objects.bulk_create([
+            Category(user=user, name=f'Category {index}') for index in range(budgets)
+        ])
+        UserSettings.objects.create(
+            user=user, monthly_income=Decimal('50000'),
+            budgets={category.name: 100 for category in categories},
+        )
+        Transaction.objects.bulk_create([
+            Transaction(user=user, type='expense', amount=Decimal('90.00'), category=category.name,
+                        date=timezone.localdate())
+            for category in categories
+        ])
+        FinancialGoal.objects.bulk_create([
+            FinancialGoal(
+                user=user, title=f'Goal {index}', target_amount=Decimal('1000'),
+                category_savings={str(categories[index % budgets].id): 50},
+            )
+            for index in range(goals)
+        ])
+        return user
+
+    def insights(self, user):
+        response = self.client.get(f'/api/insights/{user.id}/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_queries_do_not_grow_with_goals_and_budgets(self):
+        small = self.make_user('small', goals=1, budgets=1)
+        large = self.make_user('large', goals=10, budgets=15)
+        with CaptureQueriesContext(connection) as queries:
+            self.insights(small)
+
+        with self.assertNumQueries(len(queries)):
+            data = self.insights(large)
+        self.assertEqual(len(data['overspending']), 15)
+        self.assertEqual(len(data['goals_insights']), 10)
+        self.assertTrue(all(goal['blocking_categories'] for goal in data['goals_insights']))
+
+
+class StoredInsightsTests(CacheResetMixin, TestCase):
+    """GET insights читает версию данных один раз и не пишет Insight, если сохраненные актуальны"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='stored@example.com', password_hash='')
+        UserSettings.objects.create(user=cls.user, monthly_income=Decimal('50000'))
+        Transaction.objects.create(user=cls.user, type='expense', amount=Decimal('90.00'), category='Food')
+
+    def get(self):
+        """Ответ insights, число чтений DataVersion и число записей в insights"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/insights/{self.user.id}/')
+        self.assertEqual(response.status_code, 200)
+        sql = [query['sql'] for query in queries]
+        versions = [query for query in sql if 'data_versions' in query]
+        writes = [query for query in sql if query.startswith(('INSERT', 'UPDATE')) and 'insights' in query]
+        return response.json(), len(versions), len(writes)
+
+    def test_reads_version_once_and_writes_only_when_stale(self):
+        computed, versions, writes = self.get()
+        self.assertEqual((versions, writes), (1, 1))
+
+        cache.clear()
+        stored, versions, writes = self.get()
+        self.assertEqual((versions, writes), (1, 0))
+        self.assertEqual(stored, computed)
+
+    def test_store_keeps_current_row(self):
+        payload = self.get()[0]
+        version = versioning.current(self.user.id)
+        # Строка уже актуальна на primary (реплика могла ее еще не получить):
+        # повторная запись той же или более старой версии не выполняется
+        for stale in (version, version - 1):
+            with self.assertNumQueries(1):
+                reports.store_insights(self.user.id, {'stale': True}, stale)
+        self.assertEqual(Insight.objects.get().comparison_data, payload)
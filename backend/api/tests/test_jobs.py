@@ -0,0 +1,63 @@
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from api import jobs, response_cache
+from api.models import Job, MonthlyCategoryTotal, Transaction, User, UserSettings
+from api.tests.mixins import BudgetSignalMixin
+
+
+@override_settings(BACKGROUND_JOBS=True, JOBS_DEBOUNCE=0)
+class BackgroundJobTests(BudgetSignalMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='jobs@example.com', password_hash='')
+        UserSettings.objects.create(user=cls.user, budgets={'Food': 100})
+
+    def setUp(self):
+        super().setUp()
+        self.file_cache = tempfile.mkdtemp(prefix='finance-api-cache-')
+        self.addCleanup(shutil.rmtree, self.file_cache, ignore_errors=True)
+
+    def write(self, amount='10.00'):
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.create(user=self.user, type='expense', amount=Decimal(amount), category='Food')
+
+    def queued(self):
+        return list(Job.objects.filter(user=self.user).values_list('name', flat=True))
+
+    def test_write_enqueues_once(self):
+        self.write()
+        self.write()
+        self.assertEqual(self.queued(), ['refresh_user'])
+
+    def test_budget_thresholds_are_checked_by_job(self):
+        self.write('90.00')
+        self.assertEqual(self.reached, [])
+        self.assertEqual(MonthlyCategoryTotal.objects.get(user=self.user).alert_level, 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(jobs.run_once('test'), {'done': 1})
+        self.assertEqual(self.reached, [('Food', 80)])
+        self.assertEqual(MonthlyCategoryTotal.objects.get(user=self.user).alert_level, 80)
+        self.assertFalse(Job.objects.exists())
+
+    def warmed(self):
+        return cache.get(response_cache.response_key('analytics', self.user.id, {'period': 'all'})) is not None
+
+    def test_warm_cache_needs_shared_cache(self):
+        self.write()
+        jobs.run_once('test')
+        self.assertFalse(self.warmed())
+
+        file_cache = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': self.file_cache,
+        }}
+        with self.settings(CACHES=file_cache):
+            cache.clear()
+            self.write()
+            jobs.run_once('test')
+            self.assertTrue(self.warmed())
@@ -0,0 +1,120 @@
+import json
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+
+from api import metrics
+from api.models import User
+
+TOKEN = 'metrics-secret'
+
+
+class RegistryTests(TestCase):
+    def test_observe_counts_per_view(self):
+        registry = metrics.Registry()
+        registry.observe('analytics', 0.02, 0.005, 3, 200)
+        registry.observe('analytics', 3.0, 0.5, 7, 500)
+        stats = registry.snapshot()['analytics']
+        self.assertEqual(stats['requests'], 2)
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['queries'], 10)
+        self.assertAlmostEqual(stats['duration_sum'], 3.02)
+        self.assertAlmostEqual(stats['db_duration_sum'], 0.505)
+        # Корзины накопительные: 0.02 попадает во все начиная с 0.025, 3.0 — начиная с 5.0
+        self.assertEqual(stats['duration_buckets'], [0, 0, 1, 1, 1, 1, 1, 1, 1, 2, 2])
+
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {})
+
+    def test_render_prometheus(self):
+        registry = metrics.Registry()
+        registry.observe('user-detail', 0.002, 0.001, 2, 200)
+        text = metrics.render_prometheus(
+            registry.snapshot(), {'analytics': {'hits': 4, 'misses': 1}},
+            principal_stats={'hits': 5, 'misses': 2, 'size': 3},
+            job_stats={'jobs': {'pending': 6}, 'oldest_ready_seconds': 1.5},
+        )
+        for line in (
+            'finance_api_requests_total{view="user-detail"} 1',
+            'finance_api_request_duration_seconds_bucket{view="user-detail",le="0.005"} 1',
+            'finance_api_request_duration_seconds_bucket{view="user-detail",le="+Inf"} 1',
+            'finance_api_db_queries_total{view="user-detail"} 2',
+            'finance_api_response_cache_total{view="analytics",result="hits"} 4',
+            'finance_api_principal_cache_size 3',
+            'finance_api_jobs{status="pending"} 6',
+            'finance_api_jobs_oldest_ready_seconds 1.500',
+        ):
+            self.assertIn(line, text.splitlines())
+
+    def test_label_escaping(self):
+        self.assertEqual(metrics._label('a"b\\c\nd'), 'a\\"b\\\\c\\nd')
+
+
+class MiddlewareTests(TestCase):
+    def setUp(self):
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+        self.user = User.objects.create(email='metrics@example.com', password_hash='')
+
+    def test_records_view_and_queries(self):
+        self.client.get(f'/api/users/{self.user.id}/')
+        stats = metrics.registry.snapshot()['user-detail']
+        self.assertEqual(stats['requests'], 1)
+        self.assertGreaterEqual(stats['queries'], 1)
+
+    def test_sync_chain(self):
+        middleware = metrics.QueryMetricsMiddleware(lambda request: HttpResponse(status=503))
+        self.assertFalse(iscoroutinefunction(middleware))
+        response = middleware(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(metrics.registry.snapshot()['<unresolved>']['errors'], 1)
+
+    def test_async_chain(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        middleware = metrics.QueryMetricsMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = async_to_sync(middleware)(AsyncRequestFactory().get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metrics.registry.snapshot()['<unresolved>']['requests'], 1)
+
+
+class MetricsViewTests(TestCase):
+    def setUp(self):
+        metrics.registry.reset()
+        self.addCleanup(metrics.registry.reset)
+
+    def get(self, token=TOKEN, **kwargs):
+        headers = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+        return self.client.get('/api/_metrics', **headers, **kwargs)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_not_found_without_configured_token(self):
+        self.assertEqual(self.get().status_code, 404)
+
+    @override_settings(METRICS_TOKEN=TOKEN)
+    def test_not_found_with_missing_or_wrong_token(self):
+        self.assertEqual(self.get(token=None).status_code, 404)
+        self.assertEqual(self.get(token='wrong').status_code, 404)
+
+    @override_settings(METRICS_TOKEN=TOKEN)
+    def test_prometheus_by_default(self):
+        self.get()
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('finance_api_requests_total{view="metrics"} 1', response.content.decode().splitlines())
+
+    @override_settings(METRICS_TOKEN=TOKEN)
+    def test_json_by_format_or_accept(self):
+        for kwargs in ({'data': {'format': 'json'}}, {'HTTP_ACCEPT': 'application/json'}):
+            with self.subTest(**kwargs):
+                response = self.get(**kwargs)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                payload = json.loads(response.content)
+                self.assertEqual(payload['buckets'], list(metrics.BUCKETS))
+                self.assertEqual(
+                    set(payload), {'buckets', 'views', 'response_cache', 'principal_cache', 'queue'}
+                )
@@ -0,0 +1,54 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import Transaction, User
+
+
+class CursorPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='pages@example.com', password_hash='')
+        today = timezone.localdate()
+        # По две транзакции на дату: порядок внутри даты задают created_at и id
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, type='expense', amount=Decimal(index + 1), date=today - timedelta(days=index // 2))
+            for index in range(7)
+        ])
+        cls.url = f'/api/transactions/?user_id={cls.user.id}&pagination=cursor&page_size=3'
+
+    def walk(self, url):
+        ids = []
+        while url:
+            page = self.client.get(url).json()
+            ids += [row['id'] for row in page['results']]
+            url = page['next']
+        return ids
+
+    def test_pages_match_list_order(self):
+        page = self.client.get(self.url).json()
+        self.assertEqual(set(page), {'next', 'previous', 'results'})
+        self.assertIsNone(page['previous'])
+        listed = self.client.get(f'/api/transactions/?user_id={self.user.id}').json()
+        expected = [row['id'] for row in listed['results']]
+        self.assertEqual(self.walk(self.url), expected)
+
+    def test_new_rows_do_not_shift_pages(self):
+        page = self.client.get(self.url).json()
+        seen = [row['id'] for row in page['results']]
+        Transaction.objects.create(user=self.user, type='expense', amount=Decimal('1.00'), date=timezone.localdate())
+        seen += self.walk(page['next'])
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(len(set(seen)), 7)
+
+    def test_previous_link(self):
+        first = self.client.get(self.url).json()
+        second = self.client.get(first['next']).json()
+        back = self.client.get(second['previous']).json()
+        self.assertEqual(back['results'], first['results'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url + '&cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,30 @@
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from api import benchmark, queryplans
+
+
+class QueryPlanTests(TestCase):
+    """То же, что manage.py check_query_plans, на небольшом засеве"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user_ids = benchmark.seed(users=2, transactions=300, seed=0)
+        queryplans.analyze()
+
+    def test_no_sequential_scans(self):
+        results = queryplans.check(self.user_ids[0])
+        self.assertTrue(results)
+        failures = [
+            f"{result['endpoint']} {result['params']}: {', '.join(result['sequential_scans'])}"
+            for result in results if result['sequential_scans']
+        ]
+        self.assertEqual(failures, [])
+
+    def test_unsupported_database(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            with self.assertRaisesMessage(CommandError, 'not mysql'):
+                call_command('check_query_plans')
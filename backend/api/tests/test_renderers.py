@@ -0,0 +1,86 @@
+import io
+import unittest
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+import numpy as np
+from django.test import TestCase
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import fastpath
+from api.models import Category, Transaction, User
+from api.serializers import CategorySerializer, TransactionSerializer
+
+try:
+    from api import renderers
+except ImportError:
+    renderers = None
+
+PAYLOAD = {
+    'amount': Decimal('12.30'),
+    'created_at': datetime(2024, 5, 1, 10, 30, 15, 123456, tzinfo=dt_timezone.utc),
+    'local': datetime(2024, 5, 1, 15, 30, tzinfo=dt_timezone(timedelta(hours=5))),
+    'naive': datetime(2024, 5, 1, 10, 30),
+    'date': date(2024, 5, 1),
+    'time': time(9, 15),
+    'text': 'Кофе "латте"\u2028\u2029\n',
+    'nested': [{'ok': True, 'none': None, 'float': 0.1, 'int': -7}],
+    'by_id': {1: 'один', 2: 'два'},
+    'series': np.array([1.5, 2.0]),
+    'count': np.int64(3),
+}
+
+
+@unittest.skipIf(renderers is None, 'orjson не установлен')
+class ORJSONRendererTests(TestCase):
+    def test_matches_drf_renderer(self):
+        self.assertEqual(renderers.ORJSONRenderer().render(PAYLOAD), JSONRenderer().render(PAYLOAD))
+
+    def test_indent_uses_drf_renderer(self):
+        media_type = 'application/json; indent=2'
+        self.assertEqual(
+            renderers.ORJSONRenderer().render(PAYLOAD, media_type),
+            JSONRenderer().render(PAYLOAD, media_type),
+        )
+
+    def test_parser_matches_drf_parser(self):
+        body = JSONRenderer().render({'amount': '12.30', 'items': [1, 2.5, None], 'text': 'Кофе'})
+        self.assertEqual(
+            renderers.ORJSONParser().parse(io.BytesIO(body)),
+            JSONParser().parse(io.BytesIO(body)),
+        )
+        with self.assertRaises(ParseError):
+            renderers.ORJSONParser().parse(io.BytesIO(b'{"amount": '))
+
+
+class FastPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='fastpath@example.com', password_hash='')
+        Category.objects.create(user=cls.user, name='Food')
+        Transaction.objects.bulk_create([
+            Transaction(user=cls.user, type='expense', amount=Decimal('12.30'), category='Food',
+                        description='Кофе', date=date(2024, 5, 1)),
+            Transaction(user=cls.user, type='income', amount=Decimal('1000'), date=date(2024, 5, 2)),
+        ])
+
+    def assertSameAsSerializer(self, serializer_class, queryset):
+        serialize = fastpath.row_serializer(serializer_class)
+        self.assertIsNotNone(serialize)
+        rows = serialize(queryset.values(*serialize.values_fields))
+        expected = serializer_class(queryset, many=True).data
+        self.assertEqual(rows, expected)
+        self.assertEqual(JSONRenderer().render(rows), JSONRenderer().render(expected))
+
+    def test_transactions(self):
+        self.assertSameAsSerializer(TransactionSerializer, Transaction.objects.filter(user=self.user).order_by('id'))
+
+    def test_categories(self):
+        self.assertSameAsSerializer(CategorySerializer, Category.objects.filter(user=self.user))
+
+    def test_list_endpoint(self):
+        queryset = Transaction.objects.filter(user=self.user)
+        response = self.client.get('/api/transactions/', {'user_id': self.user.id})
+        self.assertEqual(response.json()['results'], TransactionSerializer(queryset, many=True).data)
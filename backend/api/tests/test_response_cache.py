@@ -0,0 +1,37 @@
+from decimal import Decimal
+
+from django.db.models import F
+from django.test import TestCase
+
+from api import versioning
+from api.models import DataVersion, Transaction, User
+from api.tests.mixins import CacheResetMixin
+
+
+class ResponseCacheTests(CacheResetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='cache@example.com', password_hash='')
+        Transaction.objects.create(user=cls.user, type='expense', amount=Decimal('10.00'), category='Food')
+        cls.url = f'/api/analytics/{cls.user.id}/'
+
+    def test_hit_reuses_conditional_version(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        # Только версия данных для ETag; ключ кэша строится по ней же
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+
+    def test_version_written_by_another_process(self):
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+        # Запись в другом процессе меняет только DataVersion, не кэш этого процесса
+        DataVersion.objects.filter(user=self.user).update(version=F('version') + 1)
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+    def test_write_changes_key(self):
+        first = self.client.get(self.url).json()
+        version = versioning.current(self.user.id)
+        Transaction.objects.create(user=self.user, type='expense', amount=Decimal('25.00'), category='Food')
+        self.assertEqual(versioning.current(self.user.id), version + 1)
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertNotEqual(response.json(), first)
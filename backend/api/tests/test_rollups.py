@@ -0,0 +1,147 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.management.commands.rebuild_rollups import Command as RebuildRollups
+from api.models import Category, DailyRollup, Transaction, User
+
+
+class RollupConsistencyTests(TestCase):
+    """Дневные итоги после каждой записи совпадают с пересчетом rebuild_rollups --verify"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='rollups@example.com', password_hash='')
+        Category.objects.bulk_create([Category(user=cls.user, name=name) for name in ('Food', 'Transport')])
+        cls.today = timezone.localdate()
+
+    def add(self, amount, category='Food', days_ago=0):
+        return Transaction.objects.create(
+            user=self.user, type='expense', amount=Decimal(amount), category=category,
+            date=self.today - timedelta(days=days_ago),
+        )
+
+    def assertConsistent(self):
+        self.assertEqual(RebuildRollups().verify(self.user), [])
+
+    def test_save_and_delete(self):
+        first = self.add('10.00')
+        second = self.add('5.50', category='Transport', days_ago=40)
+        self.assertConsistent()
+
+        first.amount = Decimal('12.00')
+        first.category = 'Transport'
+        first.save()
+        second.date = self.today
+        second.save()
+        self.assertConsistent()
+
+        first.delete()
+        self.assertConsistent()
+        second.delete()
+        self.assertConsistent()
+        self.assertFalse(DailyRollup.objects.filter(user=self.user).exists())
+
+    def test_bulk_create(self):
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, type='expense', amount=Decimal('3.00'), category='Food',
+                        date=self.today - timedelta(days=index % 3))
+            for index in range(9)
+        ])
+        self.assertConsistent()
+        self.assertEqual(
+            sorted(DailyRollup.objects.filter(user=self.user).values_list('count', flat=True)), [3, 3, 3]
+        )
+
+    def test_bulk_create_adds_to_existing_rows(self):
+        self.add('1.00')
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, type='expense', amount=Decimal('2.00'), category='Food', date=self.today)
+            for _ in range(2)
+        ])
+        self.assertConsistent()
+        rollup = DailyRollup.objects.get(user=self.user)
+        self.assertEqual((rollup.total, rollup.count), (Decimal('5.00'), 3))
+
+    def test_queryset_update(self):
+        for index in range(4):
+            self.add('2.00', days_ago=index)
+        Transaction.objects.filter(user=self.user, date=self.today).update(amount=Decimal('7.00'))
+        Transaction.objects.filter(user=self.user).update(category='Transport')
+        self.assertConsistent()
+        self.assertEqual(
+            set(Transaction.objects.filter(user=self.user).values_list('category_ref__name', flat=True)),
+            {'Transport'},
+        )
+
+    def test_bulk_update(self):
+        objs = [self.add('4.00', days_ago=index) for index in range(5)]
+        for index, obj in enumerate(objs):
+            obj.amount = Decimal(index + 1)
+            obj.category = 'Transport' if index % 2 else 'Other'
+            obj.date = self.today
+        Transaction.objects.bulk_update(objs, ['amount', 'category', 'date'])
+        self.assertConsistent()
+        self.assertEqual(
+            Transaction.objects.filter(user=self.user, category='Transport', category_ref__isnull=False).count(), 2
+        )
+
+    def test_queryset_delete(self):
+        for index in range(6):
+            self.add('1.25', days_ago=index % 2)
+        received = []
+
+        def record(sender, instance, **kwargs):
+            received.append(instance.pk)
+
+        post_delete.connect(record, sender=Transaction)
+        self.addCleanup(post_delete.disconnect, record, sender=Transaction)
+
+        pks = set(Transaction.objects.filter(user=self.user, date=self.today).values_list('pk', flat=True))
+        deleted, _ = Transaction.objects.filter(user=self.user, date=self.today).delete()
+        self.assertEqual(deleted, 3)
+        # Сигналы отправлены для каждой строки, итоги вычтены один раз
+        self.assertEqual(set(received), pks)
+        self.assertConsistent()
+
+    def test_queryset_update_moving_rows(self):
+        objs = [self.add('2.00', days_ago=index % 3) for index in range(6)]
+        Transaction.objects.filter(pk__in=[obj.pk for obj in objs[:4]]).update(date=self.today, category='Transport')
+        self.assertConsistent()
+        Transaction.objects.filter(user=self.user, category='Transport').update(category='Food')
+        self.assertConsistent()
+        self.assertEqual(
+            set(DailyRollup.objects.filter(user=self.user).values_list('category_ref__name', flat=True)), {'Food'}
+        )
+
+    def test_without_upsert_support(self):
+        with mock.patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            first = self.add('3.00')
+            self.add('4.00', category='Transport', days_ago=2)
+            Transaction.objects.bulk_create([
+                Transaction(user=self.user, type='expense', amount=Decimal('1.00'), category='Food', date=self.today)
+                for _ in range(2)
+            ])
+            self.assertConsistent()
+            first.date = self.today - timedelta(days=2)
+            first.save()
+            Transaction.objects.filter(user=self.user, category='Food').delete()
+            self.assertConsistent()
+
+    def test_removal_queries_do_not_grow_with_rows(self):
+        def delete_days(days):
+            for index in range(days):
+                self.add('1.00', days_ago=index)
+                self.add('2.00', category='Transport', days_ago=index)
+            with CaptureQueriesContext(connection) as queries:
+                Transaction.objects.filter(user=self.user).delete()
+            self.assertConsistent()
+            return len([query for query in queries if DailyRollup._meta.db_table in query['sql']])
+
+        self.assertEqual(delete_days(3), delete_days(30))
@@ -0,0 +1,84 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api import routers, versioning
+from api.models import Transaction, User
+
+
+@skipUnless(connections[DEFAULT_DB_ALIAS].vendor == 'sqlite', 'copy_replica copies SQLite databases')
+@override_settings(REPLICA_READS=True)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Реплика — отдельная тестовая БД, которую догоняет copy_replica: между
+    записью на primary и следующим копированием она действительно отстает.
+    """
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.user = User.objects.create(email='replica@example.com', password_hash='')
+        self.add('5.00')
+        self.replicate()
+
+    def add(self, amount):
+        return Transaction.objects.create(user=self.user, type='expense', amount=Decimal(amount), category='Food')
+
+    def replicate(self):
+        call_command('copy_replica', stderr=StringIO())
+
+    def list_transactions(self):
+        """Id транзакций из списка и число запросов, выполненных на реплике"""
+        with CaptureQueriesContext(connections[routers.REPLICA]) as replica_queries:
+            response = self.client.get('/api/transactions/', {'user_id': self.user.id})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()['results']], len(replica_queries)
+
+    def test_caught_up_replica_serves_reads(self):
+        version = versioning.current(self.user.id)
+        self.assertEqual(versioning.current(self.user.id, using=routers.REPLICA), version)
+        self.assertEqual(routers.read_alias(self.user.id, version), routers.REPLICA)
+
+        ids, replica_queries = self.list_transactions()
+        self.assertEqual(len(ids), 1)
+        # Кроме проверки версии, на реплике выполнены чтения самого списка
+        self.assertGreater(replica_queries, 1)
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        obj = self.add('10.00')
+        version = versioning.current(self.user.id)
+        self.assertLess(versioning.current(self.user.id, using=routers.REPLICA), version)
+        self.assertIsNone(routers.read_alias(self.user.id, version))
+
+        ids, replica_queries = self.list_transactions()
+        # Новая транзакция видна сразу после записи: список прочитан с primary
+        self.assertIn(obj.id, ids)
+        self.assertEqual(replica_queries, 1)
+
+        self.replicate()
+        ids, replica_queries = self.list_transactions()
+        self.assertIn(obj.id, ids)
+        self.assertGreater(replica_queries, 1)
+
+    def test_unavailable_replica(self):
+        with connections[routers.REPLICA].cursor() as cursor:
+            cursor.execute('DROP TABLE data_versions')
+        self.assertIsNone(routers.read_alias(self.user.id, versioning.current(self.user.id)))
+        ids, _ = self.list_transactions()
+        self.assertEqual(len(ids), 1)
+
+    @override_settings(REPLICA_READS=False)
+    def test_without_replica(self):
+        self.assertIsNone(routers.read_alias(self.user.id, versioning.current(self.user.id)))
+
+    def test_router(self):
+        router = routers.ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Transaction))
+        with routers.reading_from(routers.REPLICA):
+            self.assertEqual(router.db_for_read(Transaction), routers.REPLICA)
+            self.assertEqual(router.db_for_write(Transaction), DEFAULT_DB_ALIAS)
+        self.assertIsNone(router.db_for_read(Transaction))
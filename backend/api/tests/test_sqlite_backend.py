@@ -0,0 +1,56 @@
+import os
+import runpy
+import shutil
+import sqlite3
+import tempfile
+from unittest import mock
+
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+
+import finance_api.settings
+
+
+class TunedSQLiteTests(SimpleTestCase):
+    """Настройки с SQLITE_TUNED=True: прагмы на каждом соединении и BEGIN IMMEDIATE"""
+
+    def setUp(self):
+        with mock.patch.dict(os.environ, {'SQLITE_TUNED': 'True'}):
+            os.environ.pop('DATABASE_URL', None)
+            database = runpy.run_path(finance_api.settings.__file__)['DATABASES']['default']
+        self.assertEqual(database['ENGINE'], 'api.backends.sqlite3')
+
+        directory = tempfile.mkdtemp(prefix='finance-api-sqlite-')
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = os.path.join(directory, 'tuned.sqlite3')
+        self.connection = ConnectionHandler({'default': dict(database, NAME=self.path)})['default']
+        self.addCleanup(self.connection.close)
+
+    def pragma(self, name):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('temp_store'), 2)  # MEMORY
+        self.assertTrue(self.connection.serialize_writes)
+
+    def test_transactions_begin_immediate(self):
+        with CaptureQueriesContext(self.connection) as queries:
+            self.connection.set_autocommit(False, force_begin_transaction_with_broken_autocommit=True)
+        self.assertEqual([query['sql'] for query in queries], ['BEGIN IMMEDIATE'])
+
+        # Блокировка записи взята при BEGIN, до первой записи: второй писатель ее не получает
+        other = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'database is locked'):
+            other.execute('BEGIN IMMEDIATE')
+
+        self.connection.commit()
+        self.connection.set_autocommit(True)
+        other.execute('BEGIN IMMEDIATE')
+        other.execute('ROLLBACK')
@@ -0,0 +1,78 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api import versioning
+from api.models import (
+    Category, DailyRollup, DataVersion, FinancialGoal, Job, MonthlyCategoryTotal, Transaction, User,
+    UserSettings,
+)
+
+
+def add(user, amount, category='Food'):
+    return Transaction.objects.create(user=user, type='expense', amount=Decimal(amount), category=category)
+
+
+class UserDeleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(email='user@example.com', password_hash='')
+        cls.other = User.objects.create(email='other@example.com', password_hash='')
+        Category.objects.create(user=cls.user, name='Food')
+        UserSettings.objects.create(user=cls.user, budgets={'Food': 100})
+        FinancialGoal.objects.create(user=cls.user, title='Отпуск', target_amount=1000)
+        add(cls.user, '10.00')
+        add(cls.user, '20.00', category='Transport')
+        add(cls.other, '5.00')
+
+    def assertUserDeleted(self, user_id):
+        self.assertFalse(User.objects.filter(pk=user_id).exists())
+        for model in (Transaction, Category, FinancialGoal, DailyRollup, MonthlyCategoryTotal, DataVersion, Job):
+            self.assertFalse(model.objects.filter(user_id=user_id).exists(), model.__name__)
+        # Данные другого пользователя не затронуты
+        self.assertEqual(Transaction.objects.filter(user=self.other).count(), 1)
+        self.assertEqual(
+            list(DailyRollup.objects.filter(user=self.other).values_list('total', 'count')), [(Decimal('5.00'), 1)]
+        )
+
+    def test_model_delete(self):
+        user_id = self.user.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertUserDeleted(user_id)
+
+    def test_api_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/users/{self.user.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertUserDeleted(self.user.id)
+
+    @override_settings(BACKGROUND_JOBS=True)
+    def test_delete_with_background_jobs(self):
+        user_id = self.user.id
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertUserDeleted(user_id)
+
+    def test_writes_after_delete_bump_versions(self):
+        before = versioning.current(self.other.id)
+        self.user.delete()
+        add(self.other, '1.00')
+        self.assertEqual(versioning.current(self.other.id), before + 1)
+
+    def test_delete_queries_do_not_grow_with_transactions(self):
+        def delete_user(count):
+            user = User.objects.create(email=f'bulk{count}@example.com', password_hash='')
+            Transaction.objects.bulk_create([
+                Transaction(user=user, type='expense', amount=Decimal('1.00'), category=f'C{index % 5}')
+                for index in range(count)
+            ])
+            with CaptureQueriesContext(connection) as queries:
+                user.delete()
+            self.assertFalse(DailyRollup.objects.filter(user_id=user.id).exists())
+            return len(queries)
+
+        # Транзакции удаляются пачками по 100 (Collector), поэтому сравниваем в пределах одной пачки
+        self.assertEqual(delete_user(10), delete_user(90))
@@ -1,6 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, metrics, views
 
 router = DefaultRouter()
 router.register(r'users', views.UserViewSet, basename='user')
@@ -9,8 +10,17 @@ router.register(r'settings', views.UserSettingsViewSet, basename='settings')
 router.register(r'goals', views.FinancialGoalViewSet, basename='goal')
 router.register(r'categories', views.CategoryViewSet, basename='category')
 
+# Под ASGI — асинхронные версии с параллельными запросами к БД
+if settings.ASYNC_VIEWS:
+    analytics_view, insights_view = async_views.analytics, async_views.insights
+else:
+    analytics_view, insights_view = views.analytics, views.insights
+
 urlpatterns = [
     path('', include(router.urls)),
-    path('analytics/<int:user_id>/', views.analytics, name='analytics'),
-    path('insights/<int:user_id>/', views.insights, name='insights'),
+    path('analytics/<int:user_id>/', analytics_view, name='analytics'),
+    path('insights/<int:user_id>/', insights_view, name='insights'),
+    path('budgets/<int:user_id>/status/', views.budget_status, name='budget-status'),
+    path('dashboard/<int:user_id>/', views.dashboard, name='dashboard'),
+    path('_metrics', metrics.metrics_view, name='metrics'),
 ]
@@ -0,0 +1,31 @@
+"""
+Долговременная версия данных пользователя.
+
+Версия увеличивается в той же транзакции БД, что и изменение данных,
+поэтому по ней можно проверять свежесть сохраненных расчетов.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from . import counters
+from .models import DataVersion
+
+
+def bump(user_ids):
+    """Увеличивает версию данных пользователей"""
+    now = timezone.now()
+    for user_id in sorted(user_ids):
+        counters.increment(
+            DataVersion, {'user_id': user_id},
+            {'version': F('version') + 1, 'changed_at': now},
+            create={'version': 1, 'changed_at': now},
+        )
+
+
+def current(user_id, using=None):
+    """Текущая версия данных пользователя (0, если данные не менялись)"""
+    return (
+        DataVersion.objects.using(using).filter(user_id=user_id)
+        .values_list('version', flat=True)
+        .first()
+    ) or 0
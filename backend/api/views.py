@@ -1,17 +1,23 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import api_view, action
+from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Sum, Q, Count
+from django.urls import reverse
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
 from django.utils import timezone
-from datetime import datetime, timedelta
-from decimal import Decimal
 
+from . import aggregation, authentication, budgets, conditional, db, exporters, fastpath, importers, reports, response_cache
 from .models import User, UserSettings, Transaction, FinancialGoal, Insight, Category
 from .serializers import (
     UserSerializer, UserSettingsSerializer, TransactionSerializer,
     FinancialGoalSerializer, InsightSerializer, CategorySerializer
 )
+from .dashboard import Dashboard, parse_fields
+from .pagination import TransactionCursorPagination
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -22,66 +28,303 @@ class UserViewSet(viewsets.ModelViewSet):
     def register(self, request):
         email = request.data.get('email')
         password = request.data.get('password')
+        if not email or not password:
+            return Response({'error': 'email and password are required'}, status=status.HTTP_400_BAD_REQUEST)
         
         if User.objects.filter(email=email).exists():
             return Response({'error': 'User already exists'}, status=status.HTTP_400_BAD_REQUEST)
         
-        user = User.objects.create(
-            email=email,
-            password_hash=password,  # В продакшене использовать хеширование
-            name=email.split('@')[0]
-        )
+        user = User(email=email, name=email.split('@')[0])
+        authentication.set_password(user, password)
+        user.save()
         
         # Создать настройки по умолчанию
         UserSettings.objects.create(user=user)
         
-        return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
+        data = dict(UserSerializer(user).data, token=authentication.issue_token(user))
+        return Response(data, status=status.HTTP_201_CREATED)
 
     @action(detail=False, methods=['post'])
     def login(self, request):
-        email = request.data.get('email')
-        password = request.data.get('password')
-        
-        try:
-            user = User.objects.get(email=email, password_hash=password)
-            return Response(UserSerializer(user).data)
-        except User.DoesNotExist:
+        """Данные пользователя и токен доступа"""
+        user = authentication.authenticate(request.data.get('email'), request.data.get('password'))
+        if user is None:
             return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+        return Response(dict(UserSerializer(user).data, token=authentication.issue_token(user)))
+
+
+# Наибольшее число элементов в пакетном запросе к транзакциям
+BATCH_LIMIT = 1000
+
+
+def _batch_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
 
 
 class TransactionViewSet(viewsets.ModelViewSet):
     serializer_class = TransactionSerializer
 
+    @property
+    def paginator(self):
+        """Курсорная пагинация включается параметром ?pagination=cursor"""
+        if not hasattr(self, '_paginator'):
+            params = self.request.query_params if self.request else {}
+            if params.get('pagination') == 'cursor' or 'cursor' in params:
+                self._paginator = TransactionCursorPagination()
+            else:
+                self._paginator = self.pagination_class() if self.pagination_class else None
+        return self._paginator
+
     def get_queryset(self):
         user_id = self.request.query_params.get('user_id')
         if user_id:
             return Transaction.objects.filter(user_id=user_id)
         return Transaction.objects.none()
 
+    @conditional.user_query_view(replica=True)
+    def list(self, request, *args, **kwargs):
+        """Список строится из .values() без создания моделей и полевой сериализации DRF"""
+        serialize = fastpath.row_serializer(self.get_serializer_class())
+        if serialize is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset()).values(*serialize.values_fields)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serialize(page))
+        return Response(serialize(queryset))
+
+    @conditional.user_query_view()
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         """Переопределяем create для лучшей обработки ошибок"""
+        if isinstance(request.data, list):
+            return self.create_many(request)
+
         user_id = request.data.get('user_id')
-        if not user_id:
+        if not user_id and request.auth is None:
             return Response(
                 {'error': 'user_id is required'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        try:
-            user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
+        user = authentication.request_user(request, user_id)
+        if user is None:
             return Response(
                 {'error': f'User with id {user_id} not found'}, 
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        serializer = self.get_serializer(data=request.data)
+        serializer = self.get_serializer(
+            data=request.data, context=dict(self.get_serializer_context(), user_id=user.id)
+        )
         serializer.is_valid(raise_exception=True)
-        serializer.save(user=user)
+        with db.write_transaction():
+            serializer.save(user_id=user.id)
         
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def batch_user(self, request, items):
+        """
+        Пользователь пачки: из ?user_id=, токена или общего user_id элементов.
+        Возвращает (user, None) или (None, Response с ошибкой).
+        """
+        if not isinstance(items, list) or not items:
+            return None, Response({'error': 'A non-empty list is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > BATCH_LIMIT:
+            return None, Response(
+                {'error': f'At most {BATCH_LIMIT} items per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        item_user_ids = {
+            str(item['user_id']) for item in items if isinstance(item, dict) and item.get('user_id')
+        }
+        user_id = request.query_params.get('user_id')
+        if user_id:
+            item_user_ids.add(str(user_id))
+        if len(item_user_ids) > 1:
+            return None, Response(
+                {'error': 'All items must belong to one user'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        user_id = next(iter(item_user_ids), None)
+        if not user_id and request.auth is None:
+            return None, Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = authentication.request_user(request, user_id)
+        if user is None:
+            return None, Response(
+                {'error': f'User with id {user_id} not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return user, None
+
+    def create_many(self, request):
+        """
+        Создание списка транзакций: одна проверка сериализатором many=True
+        и один bulk_create в одной транзакции. При ошибке в любом элементе
+        ничего не создается, ошибки возвращаются по позициям элементов.
+        """
+        items = request.data
+        user, error = self.batch_user(request, items)
+        if error is not None:
+            return error
+
+        serializer = self.get_serializer(
+            data=items, many=True, context=dict(self.get_serializer_context(), user_id=user.id)
+        )
+        if not serializer.is_valid():
+            return Response(
+                {'error': 'Invalid items', 'errors': serializer.errors},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Дата по умолчанию (timezone.now) — datetime; bulk_create не приводит
+        # ее к дате, поэтому элементам без date подставляем локальную дату
+        today = timezone.localdate()
+        with db.write_transaction():
+            created = Transaction.objects.bulk_create([
+                Transaction(user_id=user.id, **{'date': today, **attrs}) for attrs in serializer.validated_data
+            ])
+        return Response(self.get_serializer(created, many=True).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['patch', 'delete'])
+    def batch(self, request):
+        """
+        PATCH — частичное изменение списка [{id, ...поля}], DELETE — удаление
+        {"ids": [...]}. Транзакции пользователя читаются одним запросом,
+        записываются одним bulk_update/DELETE в одной транзакции; при ошибке
+        в любом элементе ничего не меняется.
+        """
+        if request.method == 'DELETE':
+            return self.delete_many(request)
+
+        items = request.data
+        user, error = self.batch_user(request, items)
+        if error is not None:
+            return error
+
+        ids = [_batch_id(item.get('id') if isinstance(item, dict) else None) for item in items]
+        found = Transaction.objects.filter(user_id=user.id, pk__in={pk for pk in ids if pk is not None}).in_bulk()
+
+        serializer = self.get_serializer(
+            data=items, many=True, partial=True,
+            context=dict(self.get_serializer_context(), user_id=user.id)
+        )
+        valid = serializer.is_valid()
+        errors = [dict(item_errors) for item_errors in serializer.errors] if not valid else [{} for _ in items]
+        for position, pk in enumerate(ids):
+            if pk not in found:
+                errors[position]['id'] = ['Transaction not found']
+            elif ids.index(pk) != position:
+                errors[position]['id'] = ['Duplicate id']
+        if any(errors):
+            return Response({'error': 'Invalid items', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        objs, fields = [], set()
+        for pk, attrs in zip(ids, serializer.validated_data):
+            obj = found[pk]
+            for field, value in attrs.items():
+                setattr(obj, field, value)
+            fields.update(attrs)
+            objs.append(obj)
+
+        with db.write_transaction():
+            if fields:
+                Transaction.objects.bulk_update(objs, fields)
+        return Response(self.get_serializer(objs, many=True).data)
+
+    def delete_many(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else request.data
+        user, error = self.batch_user(request, ids if isinstance(ids, list) else None)
+        if error is not None:
+            return error
+
+        pks = [_batch_id(pk) for pk in ids]
+        queryset = Transaction.objects.filter(user_id=user.id, pk__in={pk for pk in pks if pk is not None})
+        with db.write_transaction():
+            found = set(queryset.values_list('pk', flat=True))
+            errors = [{} if pk in found else {'id': ['Transaction not found']} for pk in pks]
+            if any(errors):
+                return Response({'error': 'Invalid items', 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
+            deleted, _ = queryset.delete()
+        return Response({'deleted': deleted})
+
+    def perform_update(self, serializer):
+        with db.write_transaction():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with db.write_transaction():
+            instance.delete()
+
+    @action(detail=False, methods=['post'], url_path='import',
+            parser_classes=[MultiPartParser, FormParser])
+    def import_file(self, request):
+        """Потоковый импорт транзакций из CSV или NDJSON файла"""
+        user_id = request.data.get('user_id')
+        uploaded = request.FILES.get('file')
+        if (not user_id and request.auth is None) or uploaded is None:
+            return Response(
+                {'error': 'user_id and file are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        file_format = importers.detect_format(uploaded, request.data.get('file_format'))
+        if file_format not in importers.FORMATS:
+            return Response(
+                {'error': f'Unsupported file_format {file_format}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = authentication.request_user(request, user_id)
+        if user is None:
+            return Response(
+                {'error': f'User with id {user_id} not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        report = importers.import_transactions(user, uploaded, file_format)
+        return Response(report, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'], renderer_classes=[exporters.ExportRenderer])
+    def export(self, request):
+        """Потоковая выгрузка всех транзакций пользователя в CSV или NDJSON"""
+        params = request.query_params
+        user_id = params.get('user_id')
+        output = params.get('output', 'csv')
+        if not user_id:
+            return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+        if output not in exporters.STREAMS:
+            return Response({'error': f'Unsupported output {output}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start_date = parse_date(params['from']) if params.get('from') else None
+            end_date = parse_date(params['to']) if params.get('to') else None
+        except ValueError:
+            start_date = end_date = None
+        if (params.get('from') and not start_date) or (params.get('to') and not end_date):
+            return Response({'error': 'from/to must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+
+        transaction_type = params.get('type')
+        if transaction_type and transaction_type not in dict(Transaction.TRANSACTION_TYPES):
+            return Response({'error': f'Unknown type {transaction_type}'}, status=status.HTTP_400_BAD_REQUEST)
+
+        rows = exporters.export_queryset(user_id, start_date, end_date, transaction_type)
+        stream = exporters.STREAMS[output](rows)
+        if isinstance(request._request, ASGIRequest):
+            stream = exporters.aiterate(stream)
+        response = StreamingHttpResponse(stream, content_type=exporters.CONTENT_TYPES[output])
+        response['Content-Disposition'] = f'attachment; filename="transactions-{user_id}.{output}"'
+        return response
+
 
 class UserSettingsViewSet(viewsets.ModelViewSet):
     serializer_class = UserSettingsSerializer
@@ -102,10 +345,17 @@ class CategoryViewSet(viewsets.ModelViewSet):
             return Category.objects.filter(user_id=user_id)
         return Category.objects.none()
 
+    @conditional.user_query_view(replica=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional.user_query_view()
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
-        user_id = self.request.data.get('user_id')
-        user = get_object_or_404(User, id=user_id)
-        serializer.save(user=user)
+        user = authentication.request_user_or_404(self.request, self.request.data.get('user_id'))
+        serializer.save(user_id=user.id)
 
 
 class FinancialGoalViewSet(viewsets.ModelViewSet):
@@ -117,297 +367,115 @@ class FinancialGoalViewSet(viewsets.ModelViewSet):
             return FinancialGoal.objects.filter(user_id=user_id)
         return FinancialGoal.objects.none()
 
+    @conditional.user_query_view(replica=True)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional.user_query_view()
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
     def perform_create(self, serializer):
-        user_id = self.request.data.get('user_id')
-        user = get_object_or_404(User, id=user_id)
-        serializer.save(user=user)
+        user = authentication.request_user_or_404(self.request, self.request.data.get('user_id'))
+        serializer.save(user_id=user.id)
 
     @action(detail=True, methods=['get'])
+    @conditional.user_query_view(daily=True, replica=True)
     def calculations(self, request, pk=None):
         """Расчеты для цели: среднее время достижения, рекомендуемое откладывание"""
         goal = self.get_object()
-        user = goal.user
-        
-        from django.db.models import Sum, Avg
-        from datetime import timedelta
-        
-        # Текущие транзакции для расчета среднего откладывания
-        now = timezone.now().date()
-        start_of_month = now.replace(day=1)
-        
-        # Среднее откладывание в месяц (из разницы доходов и расходов)
-        monthly_incomes = Transaction.objects.filter(
-            user=user, type='income', date__gte=start_of_month
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        monthly_expenses = Transaction.objects.filter(
-            user=user, type='expense', date__gte=start_of_month
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        current_savings_rate = monthly_incomes - monthly_expenses
-        
-        # Если есть категории с экономией
-        category_savings = goal.category_savings or {}
-        additional_savings = Decimal('0')
-        if category_savings:
-            # Суммируем планируемую экономию по категориям
-            for cat_id, amount in category_savings.items():
-                additional_savings += Decimal(str(amount))
-        
-        total_savings_rate = current_savings_rate + additional_savings
-        
-        # Осталось накопить
-        remaining = goal.target_amount - goal.current_amount
-        
-        # Прогноз даты достижения
-        if total_savings_rate > 0:
-            months_needed = remaining / total_savings_rate
-            projected_date = now + timedelta(days=int(months_needed * 30))
-        else:
-            months_needed = None
-            projected_date = None
-        
-        # Сравнение с дедлайном
-        deadline_status = None
-        if goal.deadline:
-            if projected_date and projected_date > goal.deadline:
-                deadline_status = 'late'
-            elif projected_date and projected_date <= goal.deadline:
-                deadline_status = 'on_time'
-            else:
-                deadline_status = 'unreachable'
-        
-        # Рекомендуемое откладывание в день/месяц
-        if goal.deadline and total_savings_rate > 0:
-            days_until_deadline = (goal.deadline - now).days
-            if days_until_deadline > 0:
-                recommended_daily = remaining / days_until_deadline
-                recommended_monthly = recommended_daily * 30
-            else:
-                recommended_daily = None
-                recommended_monthly = None
-        else:
-            recommended_daily = None
-            recommended_monthly = None
-        
-        return Response({
-            'current_savings_rate': float(current_savings_rate),
-            'total_savings_rate': float(total_savings_rate),
-            'remaining': float(remaining),
-            'months_needed': float(months_needed) if months_needed else None,
-            'projected_date': projected_date.isoformat() if projected_date else None,
-            'deadline_status': deadline_status,
-            'recommended_daily': float(recommended_daily) if recommended_daily else None,
-            'recommended_monthly': float(recommended_monthly) if recommended_monthly else None,
-            'is_reachable': total_savings_rate > 0
-        })
+        return response_cache.get_or_compute(
+            'goal_calculations', goal.user_id, {'goal': goal.pk},
+            lambda: self._calculations(goal)
+        )
+
+    @action(detail=False, methods=['get'], url_path='calculations', url_name='calculations-all')
+    @conditional.user_query_view(daily=True, replica=True)
+    def all_calculations(self, request):
+        """Расчеты для всех целей пользователя одним запросом: {id цели: расчеты}"""
+        try:
+            user_id = int(request.query_params['user_id'])
+        except (KeyError, ValueError):
+            return Response({'error': 'user_id is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        return response_cache.get_or_compute(
+            'goal_calculations_all', user_id, {},
+            lambda: Response(self._all_calculations(user_id))
+        )
+
+    def _all_calculations(self, user_id):
+        now = timezone.localdate()
+        goals = list(self.get_queryset())
+        if not goals:
+            # Без целей нужно отличить пользователя без целей от несуществующего
+            get_object_or_404(User, id=user_id)
+            return {}
+        totals = aggregation.month_totals(user_id, now)
+        return reports.goals_calculations(goals, totals, now)
+
+    def _calculations(self, goal):
+        now = timezone.localdate()
+        totals = aggregation.month_totals(goal.user_id, now)
+        return Response(reports.goal_calculations(goal, totals, now))
 
 
 @api_view(['GET'])
+@conditional.user_view(daily=True, replica=True)
+@response_cache.cached_user_view('analytics')
 def analytics(request, user_id):
     """Глубокая аналитика для пользователя"""
+    try:
+        date_range = reports.analytics_range(request.query_params, timezone.localdate(), user_id)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     user = get_object_or_404(User, id=user_id)
     period = request.query_params.get('period', 'all')
-    
-    # Фильтрация по периоду
-    now = timezone.now().date()
-    if period == 'month':
-        start_date = now.replace(day=1)
-        end_date = now
-    elif period == 'week':
-        start_date = now - timedelta(days=7)
-        end_date = now
-    else:
-        start_date = None
-        end_date = None
-
-    transactions_query = Transaction.objects.filter(user=user)
-    if start_date:
-        transactions_query = transactions_query.filter(date__gte=start_date, date__lte=end_date)
-
-    # Базовые метрики
-    expenses = transactions_query.filter(type='expense').aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    incomes = transactions_query.filter(type='income').aggregate(total=Sum('amount'))['total'] or Decimal('0')
-    balance = incomes - expenses
-
-    # По категориям
-    category_stats = (
-        transactions_query.filter(type='expense')
-        .values('category')
-        .annotate(total=Sum('amount'), count=Count('id'))
-        .order_by('-total')
-    )
-
-    # По датам (последние 30 дней)
-    date_stats = []
-    for i in range(30):
-        date = now - timedelta(days=i)
-        day_expenses = Transaction.objects.filter(
-            user=user, type='expense', date=date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        day_incomes = Transaction.objects.filter(
-            user=user, type='income', date=date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        date_stats.append({
-            'date': date.isoformat(),
-            'expenses': float(day_expenses),
-            'incomes': float(day_incomes)
-        })
-
-    # Тренды
-    current_month_spending = Transaction.objects.filter(
-        user=user, type='expense',
-        date__gte=now.replace(day=1)
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-    prev_month = now.replace(day=1) - timedelta(days=1)
-    prev_month_spending = Transaction.objects.filter(
-        user=user, type='expense',
-        date__gte=prev_month.replace(day=1),
-        date__lte=prev_month
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-    trend_percentage = 0
-    if prev_month_spending > 0:
-        trend_percentage = float(((current_month_spending - prev_month_spending) / prev_month_spending) * 100)
-
-    # Средний дневной расход
-    days_count = max(1, (now - start_date).days) if start_date else 30
-    avg_daily = float(expenses / days_count)
-
-    return Response({
-        'summary': {
-            'expenses': float(expenses),
-            'incomes': float(incomes),
-            'balance': float(balance),
-            'avg_daily': avg_daily
-        },
-        'categories': list(category_stats),
-        'date_stats': list(reversed(date_stats)),
-        'trends': {
-            'current_month': float(current_month_spending),
-            'prev_month': float(prev_month_spending),
-            'percentage': round(trend_percentage, 2)
-        }
-    })
+    return Response(reports.build_analytics(user, period, date_range=date_range))
 
 
 @api_view(['GET'])
+@conditional.user_view(daily=True, replica=True)
+@response_cache.cached_user_view('insights')
 def insights(request, user_id):
     """Расширенные инсайты для пользователя"""
     user = get_object_or_404(User, id=user_id)
     settings = get_object_or_404(UserSettings, user=user)
     
-    now = timezone.now().date()
-    start_of_month = now.replace(day=1)
-    days_in_month = (now.replace(month=now.month % 12 + 1, day=1) - timedelta(days=1)).day
-    current_day = now.day
-    days_remaining = days_in_month - current_day + 1
-
-    # Текущие траты месяца
-    current_spending = Transaction.objects.filter(
-        user=user, type='expense', date__gte=start_of_month
-    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-
-    # Доступно на месяц
-    available = Decimal(str(settings.monthly_income)) - Decimal(str(settings.fixed_expenses))
-    daily_limit = available / days_in_month if days_in_month > 0 else Decimal('0')
-    remaining_for_month = available - current_spending
-    daily_remaining = remaining_for_month / days_remaining if days_remaining > 0 else Decimal('0')
-
-    # Прогноз
-    avg_daily = current_spending / current_day if current_day > 0 else Decimal('0')
-    projected_spending = current_spending + (avg_daily * days_remaining)
-    forecast_balance = available - projected_spending
-
-    # Бюджеты
-    budgets = settings.budgets or {}
-    overspending = []
-    for category, budget_limit in budgets.items():
-        spent = Transaction.objects.filter(
-            user=user, type='expense', category=category, date__gte=start_of_month
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        if budget_limit > 0:
-            percentage = (spent / Decimal(str(budget_limit))) * 100
-            if percentage >= 80:
-                overspending.append({
-                    'category': category,
-                    'spent': float(spent),
-                    'budget': float(budget_limit),
-                    'percentage': float(percentage)
-                })
-
-    # Инсайты по целям
-    goals_insights = []
-    active_goals = FinancialGoal.objects.filter(user=user, status='active')
-    
-    for goal in active_goals:
-        remaining = goal.target_amount - goal.current_amount
-        
-        # Категории, которые тормозят цель
-        category_savings = goal.category_savings or {}
-        blocking_categories = []
-        
-        # Текущие траты по категориям цели
-        if category_savings:
-            for cat_id, planned_savings in category_savings.items():
-                try:
-                    category = Category.objects.get(id=cat_id, user=user)
-                    current_spending_cat = Transaction.objects.filter(
-                        user=user, type='expense', category=category.name, date__gte=start_of_month
-                    ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-                    
-                    if current_spending_cat > Decimal(str(planned_savings)):
-                        blocking_categories.append({
-                            'category': category.name,
-                            'current_spending': float(current_spending_cat),
-                            'planned_savings': float(planned_savings),
-                            'excess': float(current_spending_cat - Decimal(str(planned_savings)))
-                        })
-                except Category.DoesNotExist:
-                    pass
-        
-        # Расчет среднего откладывания
-        monthly_incomes = Transaction.objects.filter(
-            user=user, type='income', date__gte=start_of_month
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        monthly_expenses = Transaction.objects.filter(
-            user=user, type='expense', date__gte=start_of_month
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        current_savings_rate = monthly_incomes - monthly_expenses
-        total_planned_savings = sum(Decimal(str(v)) for v in category_savings.values())
-        total_savings_rate = current_savings_rate + total_planned_savings
-        
-        if total_savings_rate > 0:
-            months_needed = remaining / total_savings_rate
-        else:
-            months_needed = None
-        
-        goals_insights.append({
-            'goal_id': goal.id,
-            'goal_title': goal.title,
-            'remaining': float(remaining),
-            'current_savings_rate': float(current_savings_rate),
-            'total_savings_rate': float(total_savings_rate),
-            'months_needed': float(months_needed) if months_needed else None,
-            'is_reachable': total_savings_rate > 0,
-            'blocking_categories': blocking_categories
-        })
-
-    return Response({
-        'daily_limit': {
-            'limit': float(daily_limit),
-            'remaining': float(daily_remaining),
-            'days_remaining': days_remaining
-        },
-        'forecast': {
-            'balance': float(forecast_balance),
-            'projected_spending': float(projected_spending),
-            'current_spending': float(current_spending)
-        },
-        'overspending': overspending,
-        'goals_insights': goals_insights
+    # Версию уже прочитал условный GET: повторного запроса к DataVersion нет
+    version = response_cache.get_user_version(user.id)
+    return Response(reports.current_insights(user, settings, version=version))
+
+
+@api_view(['GET'])
+@conditional.user_view(daily=True)
+def budget_status(request, user_id):
+    """Траты текущего месяца по бюджетам категорий из месячных итогов"""
+    settings = get_object_or_404(UserSettings, user_id=user_id)
+    return Response(budgets.status(settings))
+
+
+@api_view(['GET'])
+@conditional.user_view(daily=True, replica=True)
+@response_cache.cached_user_view('dashboard')
+def dashboard(request, user_id):
+    """Данные стартовой страницы одним ответом; разделы выбираются параметром ?fields="""
+    try:
+        fields = parse_fields(request.query_params.get('fields'))
+        date_range = reports.analytics_range(request.query_params, timezone.localdate(), user_id)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    user = get_object_or_404(User, id=user_id)
+    page_size = TransactionCursorPagination().get_page_size(request)
+    transactions_url = request.build_absolute_uri(reverse('transaction-list')) + '?' + urlencode({
+        'user_id': user.id, 'pagination': 'cursor', 'page_size': page_size,
     })
+    board = Dashboard(
+        user,
+        period=request.query_params.get('period', 'all'),
+        date_range=date_range,
+        page_size=page_size,
+        transactions_url=transactions_url,
+    )
+    return Response(board.build(fields))
@@ -7,5 +7,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finance_api.settings')
+# Под ASGI analytics и insights выполняют запросы к БД параллельно
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
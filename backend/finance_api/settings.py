@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.metrics.QueryMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -83,11 +84,105 @@ except ImportError:
         }
     }
 
+# Реплика для тяжелых GET-запросов (аналитика, инсайты, расчеты, списки):
+# чтения идут на нее, пока она не отстает от primary по версии данных
+# пользователя (api.routers). Без REPLICA_DATABASE_URL все идет в default.
+# Локально: две SQLite, например REPLICA_DATABASE_URL=sqlite:///replica.sqlite3
+# и manage.py copy_replica
+REPLICA_DATABASE_URL = config('REPLICA_DATABASE_URL', default='')
+if REPLICA_DATABASE_URL:
+    import dj_database_url
+    DATABASES['replica'] = dj_database_url.parse(REPLICA_DATABASE_URL, conn_max_age=600)
+REPLICA_READS = bool(REPLICA_DATABASE_URL)
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+# SQLite на одном узле: WAL и прагмы на каждом соединении, BEGIN IMMEDIATE
+# и очередь записей процесса (api.backends.sqlite3, api.db.write_transaction).
+# Включается явно SQLITE_TUNED=True: режим WAL записывается в сам файл БД,
+# а db.sqlite3 из репозитория должен оставаться неизменным
+SQLITE_TUNED = config('SQLITE_TUNED', default=False, cast=bool)
+for _database in DATABASES.values():
+    if not SQLITE_TUNED or _database['ENGINE'] != 'django.db.backends.sqlite3':
+        continue
+    _database['ENGINE'] = 'api.backends.sqlite3'
+    _database.setdefault('OPTIONS', {}).update({
+        'transaction_mode': 'IMMEDIATE',
+        'pragmas': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+            # Отрицательное значение — размер в КиБ
+            'cache_size': -config('SQLITE_CACHE_SIZE_KB', default=65536, cast=int),
+            'mmap_size': config('SQLITE_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+            'temp_store': 'MEMORY',
+        },
+    })
+
+
+# Cache
+# Кэш ответов аналитики: locmem — в пределах одного процесса,
+# file — общий для всех воркеров на одной машине
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
+            'OPTIONS': {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int)},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'finance-api',
+            'OPTIONS': {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int)},
+        }
+    }
+
+# Время жизни закэшированных ответов analytics/insights/calculations, секунд
+RESPONSE_CACHE_TTL = config('RESPONSE_CACHE_TTL', default=300, cast=int)
+
+
+# Async views
+# ASYNC_VIEWS=True (по умолчанию в asgi.py) подключает асинхронные analytics/insights;
+# независимые запросы к БД идут параллельно в пуле из ANALYTICS_THREADS потоков,
+# у каждого потока свое соединение
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+ANALYTICS_THREADS = config('ANALYTICS_THREADS', default=4, cast=int)
+
+
+# Background jobs
+# BACKGROUND_JOBS=True: записи ставят пересчет инсайтов и прогрев кэша в очередь
+# в БД (api.jobs), которую выполняет manage.py runworker. JOBS_TIMEOUT — через
+# сколько секунд выполняющаяся задача считается брошенной, JOBS_DEBOUNCE —
+# задержка запуска, за которую серия записей сливается в одну задачу
+BACKGROUND_JOBS = config('BACKGROUND_JOBS', default=False, cast=bool)
+JOBS_TIMEOUT = config('JOBS_TIMEOUT', default=600, cast=int)
+JOBS_DEBOUNCE = config('JOBS_DEBOUNCE', default=2, cast=int)
+
+
+# Metrics
+# /api/_metrics доступен только с заголовком Authorization: Bearer <METRICS_TOKEN>
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = []
 
 
+# Tokens
+# Токен из login/register передается в Authorization: Bearer <token>;
+# пользователь токена кэшируется на PRINCIPAL_CACHE_TTL секунд (api.authentication).
+# С общим для процессов кэшем (CACHE_BACKEND=file) смена пароля и удаление
+# пользователя видны всем процессам сразу. С LocMemCache кэш у каждого процесса свой,
+# и другие процессы принимают старого пользователя и отозванные токены до
+# PRINCIPAL_CACHE_TTL секунд
+AUTH_TOKEN_TTL = config('AUTH_TOKEN_TTL', default=7 * 24 * 3600, cast=int)
+PRINCIPAL_CACHE_SIZE = config('PRINCIPAL_CACHE_SIZE', default=10000, cast=int)
+PRINCIPAL_CACHE_TTL = config('PRINCIPAL_CACHE_TTL', default=60, cast=int)
+
+
 # Internationalization
 LANGUAGE_CODE = 'ru-ru'
 TIME_ZONE = 'Asia/Tashkent'
@@ -107,15 +202,39 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Индексы с INCLUDE поддерживает только PostgreSQL; в SQLite они создаются без неключевых колонок
+SILENCED_SYSTEM_CHECKS = ['models.W040']
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 
 # REST Framework
+# orjson ускоряет рендеринг и разбор JSON; без него используется стандартный json
+try:
+    import orjson  # noqa: F401
+    JSON_RENDERER = 'api.renderers.ORJSONRenderer'
+    JSON_PARSER = 'api.renderers.ORJSONParser'
+except ImportError:
+    JSON_RENDERER = 'rest_framework.renderers.JSONRenderer'
+    JSON_PARSER = 'rest_framework.parsers.JSONParser'
+
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.authentication.TokenAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        JSON_RENDERER,
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        JSON_PARSER,
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100
 }
@@ -0,0 +1,11 @@
+"""
+Настройки для тестов (manage.py test выбирает их по умолчанию).
+
+Реплика — отдельная пустая SQLite (в тестах в памяти): api.tests.test_routers
+наполняет ее через copy_replica и включает чтение с нее через REPLICA_READS.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+DATABASES['replica'] = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'replica.sqlite3'}
+REPLICA_READS = False
@@ -6,7 +6,9 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'finance_api.settings')
+    # Тесты используют свои настройки (finance_api.test_settings): в них объявлена реплика
+    default = 'finance_api.test_settings' if sys.argv[1:2] == ['test'] else 'finance_api.settings'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', default)
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc:
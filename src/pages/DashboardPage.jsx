@@ -34,11 +34,25 @@ export default function DashboardPage() {
   const defaultCategories = ['Продукты', 'Транспорт', 'Развлечения', 'Здоровье', 'Коммунальные услуги', 'Одежда', 'Другое'];
   
   useEffect(() => {
-    checkOnboarding();
-    loadData();
-    loadCategories();
+    initialize();
   }, []);
 
+  // Настройки (с флагом онбординга), категории и транзакции приходят одним запросом к /dashboard/
+  const initialize = async () => {
+    const dashboard = await dataService.getDashboard();
+    if (!dashboard) {
+      checkOnboarding();
+      loadData();
+      loadCategories();
+      return;
+    }
+    if (!dashboard.settings.onboardingCompleted) {
+      navigate('/onboarding');
+    }
+    setCategories(mergeCategories(dashboard.categories));
+    loadData(dashboard.settings, dashboard.transactions);
+  };
+
   const checkOnboarding = async () => {
     const completed = await dataService.hasCompletedOnboarding();
     if (!completed) {
@@ -46,17 +60,16 @@ export default function DashboardPage() {
     }
   };
 
-  const loadData = async () => {
+  const loadData = async (settings = null, loaded = null) => {
     setLoading(true);
     try {
-      const data = await dataService.getTransactions();
+      const data = loaded || await dataService.getTransactions();
       setTransactions(data.sort((a, b) => {
         const aTime = a.created_at || a.timestamp || 0;
         const bTime = b.created_at || b.timestamp || 0;
         return new Date(bTime) - new Date(aTime);
       }));
-      const settings = await dataService.getUserSettings();
-      setUserSettings(settings);
+      setUserSettings(settings || await dataService.getUserSettings());
     } catch (error) {
       console.error('Error loading data:', error);
     } finally {
@@ -64,19 +77,23 @@ export default function DashboardPage() {
     }
   };
 
+  // Объединяем пользовательские категории с дефолтными
+  const mergeCategories = (userCategories) => {
+    const allCategories = [...defaultCategories];
+    if (Array.isArray(userCategories)) {
+      userCategories.forEach(cat => {
+        if (cat && cat.name && !allCategories.includes(cat.name)) {
+          allCategories.push(cat.name);
+        }
+      });
+    }
+    return allCategories;
+  };
+
   const loadCategories = async () => {
     try {
       const userCategories = await dataService.getCategories();
-      // Объединяем пользовательские категории с дефолтными
-      const allCategories = [...defaultCategories];
-      if (Array.isArray(userCategories)) {
-        userCategories.forEach(cat => {
-          if (cat && cat.name && !allCategories.includes(cat.name)) {
-            allCategories.push(cat.name);
-          }
-        });
-      }
-      setCategories(allCategories);
+      setCategories(mergeCategories(userCategories));
     } catch (error) {
       console.error('Error loading categories:', error);
       setCategories(defaultCategories);
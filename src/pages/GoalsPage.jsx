@@ -47,12 +47,12 @@ export default function GoalsPage() {
     }
   };
 
-  const loadGoalCalculations = async (goalId) => {
-    if (!goalId) return;
+  const loadGoalCalculations = async () => {
     try {
-      const calc = await dataService.getGoalCalculations(goalId);
-      if (calc && typeof calc === 'object') {
-        setGoalCalculations(prev => ({ ...prev, [goalId]: calc }));
+      // Расчеты всех целей приходят одним запросом после каждой загрузки целей
+      const calcs = await dataService.getAllGoalCalculations();
+      if (calcs && typeof calcs === 'object') {
+        setGoalCalculations(calcs);
       }
     } catch (error) {
       console.error('Error loading goal calculations:', error);
@@ -64,6 +64,7 @@ export default function GoalsPage() {
       const data = await dataService.getGoals();
       if (Array.isArray(data)) {
         setGoals(data);
+        await loadGoalCalculations();
       } else {
         setGoals([]);
       }
@@ -233,7 +234,6 @@ export default function GoalsPage() {
                           setExpandedGoal(null);
                         } else {
                           setExpandedGoal(goal.id);
-                          loadGoalCalculations(goal.id);
                         }
                       }}
                       className="btn btn-secondary"
@@ -322,7 +322,6 @@ export default function GoalsPage() {
                                     category_savings: savings
                                   });
                                   await loadGoals();
-                                  await loadGoalCalculations(goal.id);
                                   alert('Категории сохранены');
                                 } catch (error) {
                                   console.error('Error saving category savings:', error);
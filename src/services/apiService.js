@@ -188,10 +188,26 @@ class ApiService {
     });
   }
 
+  // Dashboard: несколько разделов одним запросом
+  async getDashboard(userId, fields = [], period = 'all', pageSize = null) {
+    const params = new URLSearchParams({ period });
+    if (fields.length > 0) {
+      params.set('fields', fields.join(','));
+    }
+    if (pageSize) {
+      params.set('page_size', pageSize);
+    }
+    return this.request(`/dashboard/${userId}/?${params}`);
+  }
+
   // Goal calculations
   async getGoalCalculations(goalId) {
     return this.request(`/goals/${goalId}/calculations/`);
   }
+
+  async getAllGoalCalculations(userId) {
+    return this.request(`/goals/calculations/?user_id=${userId}`);
+  }
 }
 
 export default new ApiService();
@@ -1,6 +1,9 @@
 // Data Service - работает с Django API с fallback на localStorage
 import apiService from './apiService';
 
+// Наибольший размер страницы транзакций в ответе /dashboard/
+const DASHBOARD_PAGE_SIZE = 500;
+
 class DataService {
   constructor() {
     this.userId = this.getUserId();
@@ -77,21 +80,25 @@ class DataService {
   }
 
   // User Settings
+  // Конвертируем формат из API в формат приложения
+  fromApiSettings(settings) {
+    return {
+      monthlyIncome: parseFloat(settings.monthly_income) || 0,
+      fixedExpenses: parseFloat(settings.fixed_expenses) || 0,
+      financialGoal: settings.financial_goal || '',
+      budgets: settings.budgets || {},
+      onboardingCompleted: settings.onboarding_completed || false,
+      id: settings.id,
+      userId: settings.user
+    };
+  }
+
   async getUserSettings() {
     if (this.useAPI && this.userId) {
       try {
         const settings = await apiService.getSettings(this.userId);
         if (settings) {
-          // Конвертируем формат из API в формат приложения
-          return {
-            monthlyIncome: parseFloat(settings.monthly_income) || 0,
-            fixedExpenses: parseFloat(settings.fixed_expenses) || 0,
-            financialGoal: settings.financial_goal || '',
-            budgets: settings.budgets || {},
-            onboardingCompleted: settings.onboarding_completed || false,
-            id: settings.id,
-            userId: settings.user
-          };
+          return this.fromApiSettings(settings);
         }
       } catch (error) {
         console.warn('API unavailable, using localStorage', error);
@@ -285,6 +292,29 @@ class DataService {
     localStorage.setItem(this.getKey('categories'), JSON.stringify(filtered));
   }
 
+  // Настройки, категории и транзакции стартовой страницы одним запросом к /dashboard/.
+  // null без API или без сохраненных настроек: тогда данные грузятся по отдельности.
+  // transactions — null, если транзакций больше одной страницы: тогда список грузится отдельно
+  async getDashboard() {
+    if (this.useAPI && this.userId) {
+      try {
+        const data = await apiService.getDashboard(
+          this.userId, ['settings', 'categories', 'transactions'], 'all', DASHBOARD_PAGE_SIZE
+        );
+        if (data.settings) {
+          return {
+            settings: this.fromApiSettings(data.settings),
+            categories: data.categories,
+            transactions: data.transactions.next ? null : data.transactions.results,
+          };
+        }
+      } catch (error) {
+        console.warn('API unavailable for dashboard', error);
+      }
+    }
+    return null;
+  }
+
   // Goal calculations
   async getGoalCalculations(goalId) {
     if (this.useAPI) {
@@ -297,6 +327,19 @@ class DataService {
     }
     return null;
   }
+
+  // Расчеты для всех целей одним запросом: {goalId: calc}
+  async getAllGoalCalculations() {
+    if (this.useAPI && this.userId) {
+      try {
+        return await apiService.getAllGoalCalculations(this.userId);
+      } catch (error) {
+        console.warn('API unavailable for goal calculations', error);
+        return null;
+      }
+    }
+    return null;
+  }
 }
 
 // Singleton instance